@@ -0,0 +1 @@
+"""Offline benchmarks of snap_python, see ``python -m benchmarks --help``."""
@@ -0,0 +1,87 @@
+"""Run the offline benchmarks: ``python -m benchmarks [--check] [--json results.json]``."""
+
+import argparse
+import json
+import pathlib
+import sys
+
+from benchmarks.suite import (
+    BENCHMARKS,
+    THRESHOLDS_PATH,
+    check_thresholds,
+    load_thresholds,
+    run,
+)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Benchmark snap_python against local fake snapd and store servers.",
+    )
+    parser.add_argument(
+        "names",
+        nargs="*",
+        help=f"Benchmarks to run (default: all). One of: {', '.join(BENCHMARKS)}.",
+    )
+    parser.add_argument(
+        "--scale",
+        type=float,
+        default=1.0,
+        help="Multiply the iteration count of every benchmark.",
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Exit with status 1 if a benchmark is slower than its threshold.",
+    )
+    parser.add_argument(
+        "--thresholds",
+        type=pathlib.Path,
+        default=THRESHOLDS_PATH,
+        help="JSON file of minimum ops/s per benchmark.",
+    )
+    parser.add_argument(
+        "--json", type=pathlib.Path, help="Also write the results to this file."
+    )
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(unknown)}")
+
+    results = run(args.names or None, args.scale)
+
+    width = max(len(result.name) for result in results)
+    print(
+        f"{'benchmark':<{width}}  {'ops/s':>10}  {'mean ms':>9}  {'p50 ms':>9}  {'p95 ms':>9}"
+    )
+    for result in results:
+        print(
+            f"{result.name:<{width}}  {result.ops_per_second:>10.1f}  "
+            f"{result.mean * 1000:>9.3f}  {result.p50 * 1000:>9.3f}  {result.p95 * 1000:>9.3f}"
+        )
+
+    if args.json is not None:
+        args.json.write_text(
+            json.dumps(
+                {
+                    result.name: {
+                        **result.model_dump(exclude={"name"}),
+                        "ops_per_second": result.ops_per_second,
+                    }
+                    for result in results
+                },
+                indent=2,
+            )
+        )
+
+    if args.check:
+        failures = check_thresholds(results, load_thresholds(args.thresholds))
+        for failure in failures:
+            print(f"REGRESSION {failure}", file=sys.stderr)
+        return 1 if failures else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,215 @@
+"""Local stand-ins for snapd and the snap store that replay the fixtures in ``tests/data``.
+
+Both speak just enough HTTP/1.1 (keep-alive, ``Content-Length`` bodies) for httpx, over a
+Unix socket or TCP, so the benchmarks exercise the same transport code as a real snapd.
+"""
+
+import asyncio
+import copy
+import json
+import pathlib
+import re
+from typing import Callable
+
+DATA_DIR = pathlib.Path(__file__).parent.parent / "tests" / "data"
+
+Handler = Callable[[re.Match, dict[str, str], bytes], tuple[int, bytes]]
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed"}
+
+
+def _error_body(status: int, message: str) -> bytes:
+    return json.dumps(
+        {
+            "type": "error",
+            "status-code": status,
+            "status": _REASONS.get(status, ""),
+            "result": {"message": message},
+        }
+    ).encode()
+
+
+class FakeHTTPServer:
+    """Minimal asyncio HTTP/1.1 server dispatching on (method, path regex).
+
+    :param routes: ``(method, pattern, handler)`` triples; the first match handles the request.
+        Handlers get the path match, the lower-cased headers and the body, and return
+        ``(status, body)``. Bodies are always sent as JSON.
+    :type routes: list[tuple[str, str, Handler]]
+    """
+
+    def __init__(self, routes: list[tuple[str, str, Handler]]):
+        self.routes = [
+            (method, re.compile(f"^{pattern}$"), handler)
+            for method, pattern, handler in routes
+        ]
+        self.requests_served = 0
+        self._server: asyncio.Server | None = None
+        self.url: str | None = None
+        self.socket_path: pathlib.Path | None = None
+
+    async def start_unix(self, path: pathlib.Path) -> "FakeHTTPServer":
+        """Listen on the Unix socket ``path``, like snapd does on ``/run/snapd.socket``."""
+        self.socket_path = path
+        self._server = await asyncio.start_unix_server(self._serve, path=str(path))
+        self.url = "http://localhost"
+        return self
+
+    async def start_tcp(
+        self, host: str = "127.0.0.1", port: int = 0
+    ) -> "FakeHTTPServer":
+        """Listen on TCP; with ``port=0`` a free port is picked and exposed in :attr:`url`."""
+        self._server = await asyncio.start_server(self._serve, host=host, port=port)
+        port = self._server.sockets[0].getsockname()[1]
+        self.url = f"http://{host}:{port}"
+        return self
+
+    async def aclose(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self) -> "FakeHTTPServer":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    def _dispatch(
+        self, method: str, path: str, headers: dict[str, str], body: bytes
+    ) -> tuple[int, bytes]:
+        path_matched = False
+        for route_method, pattern, handler in self.routes:
+            match = pattern.match(path)
+            if match is None:
+                continue
+            path_matched = True
+            if route_method == method:
+                return handler(match, headers, body)
+        if path_matched:
+            return 405, _error_body(405, f"method {method} not allowed")
+        return 404, _error_body(404, f"no route for {path}")
+
+    async def _serve(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    return
+                method, target, _ = request_line.decode("latin-1").split(" ", 2)
+                headers: dict[str, str] = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = b""
+                if "content-length" in headers:
+                    body = await reader.readexactly(int(headers["content-length"]))
+
+                status, content = self._dispatch(
+                    method, target.split("?", 1)[0], headers, body
+                )
+                self.requests_served += 1
+                writer.write(
+                    (
+                        f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+                        "Content-Type: application/json\r\n"
+                        f"Content-Length: {len(content)}\r\n"
+                        "\r\n"
+                    ).encode("latin-1")
+                    + content
+                )
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    return
+        except (ConnectionError, asyncio.IncompleteReadError):
+            return
+        finally:
+            writer.close()
+
+
+def _static(content: bytes) -> Handler:
+    return lambda match, headers, body: (200, content)
+
+
+def _in_progress_change(change: dict) -> dict:
+    """Turn a ready change into the same change halfway through."""
+    doing = copy.deepcopy(change)
+    result = doing["result"]
+    result.update(status="Doing", ready=False)
+    result.pop("ready-time", None)
+    tasks = result["tasks"]
+    for task in tasks[len(tasks) // 2 :]:
+        task.update(status="Do")
+        task["progress"]["done"] = 0
+        task.pop("ready-time", None)
+    return doing
+
+
+def fake_snapd_routes(
+    data_dir: pathlib.Path = DATA_DIR, polls_until_ready: int = 5
+) -> list[tuple[str, str, Handler]]:
+    """Routes of a snapd with the installed snaps and change of the fixtures.
+
+    Every change id reports the recorded install change as in progress for its first
+    ``polls_until_ready - 1`` requests, and as ready afterwards.
+    """
+    installed_snaps = (data_dir / "installed_snaps.json").read_bytes()
+    change = json.loads((data_dir / "install_change_response.json").read_bytes())
+    done = json.dumps(change).encode()
+    doing = json.dumps(_in_progress_change(change)).encode()
+    polls: dict[str, int] = {}
+
+    def get_change(match: re.Match, headers: dict[str, str], body: bytes):
+        change_id = match["id"]
+        polls[change_id] = polls.get(change_id, 0) + 1
+        return 200, done if polls[change_id] >= polls_until_ready else doing
+
+    return [
+        ("GET", "/", _static(b'{"type": "sync", "status-code": 200, "status": "OK"}')),
+        ("GET", "/v2/snaps", _static(installed_snaps)),
+        ("GET", "/v2/changes/(?P<id>[^/]+)", get_change),
+    ]
+
+
+def fake_store_routes(
+    data_dir: pathlib.Path = DATA_DIR,
+) -> list[tuple[str, str, Handler]]:
+    """Routes of a snap store answering with the recorded store responses."""
+    return [
+        (
+            "GET",
+            "/v2/snaps/find",
+            _static((data_dir / "featured_snaps_response.json").read_bytes()),
+        ),
+        (
+            "GET",
+            "/v2/snaps/info/[^/]+",
+            _static((data_dir / "store_tui_info_response.json").read_bytes()),
+        ),
+        (
+            "GET",
+            "/api/v1/snaps/names",
+            _static((data_dir / "arch_search_response.json").read_bytes()),
+        ),
+    ]
+
+
+async def start_fake_snapd(
+    socket_path: pathlib.Path | None = None, polls_until_ready: int = 5
+) -> FakeHTTPServer:
+    """Start a fake snapd on the Unix socket ``socket_path``, or on a TCP port if None."""
+    server = FakeHTTPServer(fake_snapd_routes(polls_until_ready=polls_until_ready))
+    if socket_path is not None:
+        return await server.start_unix(socket_path)
+    return await server.start_tcp()
+
+
+async def start_fake_store() -> FakeHTTPServer:
+    """Start a fake snap store on a free TCP port."""
+    return await FakeHTTPServer(fake_store_routes()).start_tcp()
@@ -0,0 +1,357 @@
+"""Benchmarks of snap_python's own overhead, run against the fake servers in :mod:`fake_servers`."""
+
+import asyncio
+import gc
+import json
+import pathlib
+import statistics
+import tempfile
+import time
+from contextlib import AsyncExitStack
+from typing import Awaitable, Callable
+
+from pydantic import BaseModel
+
+from benchmarks.fake_servers import DATA_DIR, start_fake_snapd, start_fake_store
+from snap_python.client import SnapClient
+from snap_python.progress import ProgressTracker
+from snap_python.retry_policy import RetryPolicy
+from snap_python.schemas.changes import ChangesResponse
+from snap_python.schemas.common import VALID_SNAP_ARCHITECTURES
+from snap_python.schemas.snaps import (
+    InstalledSnapListResponse,
+    InstalledSnapRecordListResponse,
+    installed_snap_record_type,
+)
+from snap_python.schemas.store.info import ChannelMapItem, InfoResponse
+from snap_python.schemas.store.search import SearchResult
+from snap_python.schemas.store.track import (
+    CompactTrackMap,
+    channel_map_to_arch_track_map,
+    channel_map_to_current_track_map,
+)
+from snap_python.trusted import view_json
+
+THRESHOLDS_PATH = pathlib.Path(__file__).parent / "thresholds.json"
+
+# polls a change needs before the fake snapd reports it ready
+POLLS_PER_CHANGE = 5
+
+
+class BenchmarkResult(BaseModel):
+    name: str
+    iterations: int
+    total: float
+    mean: float
+    p50: float
+    p95: float
+
+    @property
+    def ops_per_second(self) -> float:
+        return self.iterations / self.total if self.total else float("inf")
+
+
+class BenchmarkEnvironment:
+    """Fake snapd (Unix socket and TCP) and fake store, with clients connected to them."""
+
+    async def __aenter__(self) -> "BenchmarkEnvironment":
+        self._stack = AsyncExitStack()
+        tmp_dir = pathlib.Path(self._stack.enter_context(tempfile.TemporaryDirectory()))
+        self.snapd_uds = await self._stack.enter_async_context(
+            await start_fake_snapd(
+                tmp_dir / "snapd.socket", polls_until_ready=POLLS_PER_CHANGE
+            )
+        )
+        self.snapd_tcp = await self._stack.enter_async_context(
+            await start_fake_snapd(polls_until_ready=POLLS_PER_CHANGE)
+        )
+        self.store = await self._stack.enter_async_context(await start_fake_store())
+
+        # a real snapd would not need retries here, and they would hide regressions
+        self.uds_client = SnapClient(
+            snapd_socket_location=str(self.snapd_uds.socket_path),
+            store_base_url=self.store.url,
+            retry_policy=RetryPolicy.disabled(),
+            store_retry_policy=RetryPolicy.disabled(),
+        )
+        self.tcp_client = SnapClient(
+            tcp_location=self.snapd_tcp.url,
+            store_base_url=self.store.url,
+            retry_policy=RetryPolicy.disabled(),
+            store_retry_policy=RetryPolicy.disabled(),
+        )
+        self._stack.push_async_callback(self.uds_client.aclose)
+        self._stack.push_async_callback(self.tcp_client.aclose)
+
+        self.channel_map = large_channel_map()
+        self.track_map = channel_map_to_current_track_map(self.channel_map)
+        self.compact_track_map = CompactTrackMap.from_track_map(self.track_map)
+        self.installed_snaps_long = (
+            DATA_DIR / "installed_snaps_long.json"
+        ).read_bytes()
+        self.installed_snaps = InstalledSnapListResponse.model_validate_json(
+            self.installed_snaps_long
+        ).result
+        self.change_snapshots = large_change_snapshots()
+        self.progress_tracker = ProgressTracker()
+        self._change_ids = 0
+        self._snapshot_index = 0
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self._stack.aclose()
+
+    def next_change_id(self) -> str:
+        self._change_ids += 1
+        return str(self._change_ids)
+
+    def next_change_snapshot(self) -> ChangesResponse:
+        snapshot = self.change_snapshots[self._snapshot_index]
+        self._snapshot_index = (self._snapshot_index + 1) % len(self.change_snapshots)
+        return snapshot
+
+
+def large_channel_map(tracks: int = 10) -> list[ChannelMapItem]:
+    """Build a channel map of a popular snap: every risk of ``tracks`` tracks on every arch.
+
+    The recorded channel maps only have a handful of entries, so their items are repeated
+    over extra tracks and architectures.
+    """
+    info = InfoResponse.model_validate_json(
+        (DATA_DIR / "convertermulti_info_response.json").read_bytes()
+    )
+    items = []
+    for track_index in range(tracks):
+        track = "latest" if track_index == 0 else f"{track_index}.0"
+        for arch in VALID_SNAP_ARCHITECTURES:
+            for template in info.channel_map:
+                channel = template.channel.model_copy(
+                    update={
+                        "track": track,
+                        "architecture": arch,
+                        "name": f"{track}/{template.channel.risk}",
+                    }
+                )
+                items.append(template.model_copy(update={"channel": channel}))
+    return items
+
+
+def large_change_snapshots(
+    tasks: int = 200, snapshots: int = 50
+) -> list[ChangesResponse]:
+    """Build successive snapshots of an in-progress change with ``tasks`` tasks.
+
+    The tasks of the recorded install change are repeated, and each snapshot has a few more
+    of them done than the previous one.
+    """
+    change = json.loads((DATA_DIR / "install_change_response.json").read_bytes())
+    result = change["result"]
+    templates = result["tasks"]
+    result.update(status="Doing", ready=False)
+    result.pop("ready-time", None)
+    result["tasks"] = [
+        {**templates[index % len(templates)], "id": str(index)}
+        for index in range(tasks)
+    ]
+    responses = []
+    for snapshot in range(snapshots):
+        done = tasks * snapshot // snapshots
+        for index, task in enumerate(result["tasks"]):
+            total = templates[index % len(templates)]["progress"]["total"]
+            task["status"] = "Done" if index < done else "Do"
+            task["progress"] = {
+                "label": "",
+                "done": total if index < done else 0,
+                "total": total,
+            }
+        responses.append(ChangesResponse.model_validate(change))
+    return responses
+
+
+async def bench_list_installed_snaps_uds(env: BenchmarkEnvironment) -> None:
+    await env.uds_client.snaps.list_installed_snaps()
+
+
+async def bench_list_installed_snaps_tcp(env: BenchmarkEnvironment) -> None:
+    await env.tcp_client.snaps.list_installed_snaps()
+
+
+async def bench_get_changes_by_id(env: BenchmarkEnvironment) -> None:
+    await env.uds_client.get_changes_by_id("42")
+
+
+async def bench_poll_change_until_ready(env: BenchmarkEnvironment) -> None:
+    change_id = env.next_change_id()
+    while not (await env.uds_client.get_changes_by_id(change_id)).ready:
+        pass
+
+
+async def bench_store_find(env: BenchmarkEnvironment) -> None:
+    await env.uds_client.store.find(query="hello")
+
+
+async def bench_get_all_snaps_for_arch(env: BenchmarkEnvironment) -> None:
+    await env.uds_client.store.get_all_snaps_for_arch("amd64")
+
+
+# the fields most callers of list_installed_snaps read
+SUMMARY_FIELDS = ("name", "revision", "tracking_channel", "status")
+
+
+def _summarize_installed(installed) -> list[tuple]:
+    return [
+        (snap.name, snap.revision, snap.tracking_channel, snap.status)
+        for snap in installed.result
+    ]
+
+
+async def bench_parse_installed_snaps_validated(env: BenchmarkEnvironment) -> None:
+    _summarize_installed(
+        InstalledSnapListResponse.model_validate_json(env.installed_snaps_long)
+    )
+
+
+async def bench_parse_installed_snaps_trusted(env: BenchmarkEnvironment) -> None:
+    _summarize_installed(view_json(InstalledSnapListResponse, env.installed_snaps_long))
+
+
+async def bench_parse_installed_snaps_projected(env: BenchmarkEnvironment) -> None:
+    record_type = installed_snap_record_type(SUMMARY_FIELDS)
+    _summarize_installed(
+        InstalledSnapRecordListResponse[record_type].model_validate_json(
+            env.installed_snaps_long
+        )
+    )
+
+
+async def bench_channel_map_to_current_track_map(env: BenchmarkEnvironment) -> None:
+    channel_map_to_current_track_map(env.channel_map)
+
+
+async def bench_channel_map_to_arch_track_map(env: BenchmarkEnvironment) -> None:
+    channel_map_to_arch_track_map(env.channel_map)
+
+
+async def bench_compact_track_map_from_channel_map(env: BenchmarkEnvironment) -> None:
+    CompactTrackMap.from_channel_map(env.channel_map)
+
+
+async def bench_risk_map_architectures_model(env: BenchmarkEnvironment) -> None:
+    for risks in env.track_map.values():
+        for risk_map in risks.values():
+            risk_map.architectures
+
+
+async def bench_risk_map_architectures_compact(env: BenchmarkEnvironment) -> None:
+    for risks in env.compact_track_map.tracks.values():
+        for risk_map in risks.values():
+            risk_map.architectures
+
+
+async def bench_search_results_from_installed_snaps(env: BenchmarkEnvironment) -> None:
+    SearchResult.from_installed_snaps(env.installed_snaps)
+
+
+async def bench_change_progress_overall(env: BenchmarkEnvironment) -> None:
+    env.next_change_snapshot().result.overall_progress
+
+
+async def bench_change_progress_tracker(env: BenchmarkEnvironment) -> None:
+    env.progress_tracker.update(env.next_change_snapshot())
+
+
+Benchmark = Callable[[BenchmarkEnvironment], Awaitable[None]]
+
+# name -> (benchmark, default number of iterations)
+BENCHMARKS: dict[str, tuple[Benchmark, int]] = {
+    "list_installed_snaps[uds]": (bench_list_installed_snaps_uds, 200),
+    "list_installed_snaps[tcp]": (bench_list_installed_snaps_tcp, 200),
+    "get_changes_by_id[uds]": (bench_get_changes_by_id, 1000),
+    "poll_change_until_ready[uds]": (bench_poll_change_until_ready, 200),
+    "store_find": (bench_store_find, 1000),
+    "get_all_snaps_for_arch": (bench_get_all_snaps_for_arch, 10),
+    "channel_map_to_current_track_map": (bench_channel_map_to_current_track_map, 200),
+    "channel_map_to_arch_track_map": (bench_channel_map_to_arch_track_map, 200),
+    "compact_track_map_from_channel_map": (
+        bench_compact_track_map_from_channel_map,
+        200,
+    ),
+    "risk_map_architectures[model]": (bench_risk_map_architectures_model, 1000),
+    "risk_map_architectures[compact]": (bench_risk_map_architectures_compact, 1000),
+    "change_progress[overall_progress]": (bench_change_progress_overall, 1000),
+    "change_progress[tracker]": (bench_change_progress_tracker, 1000),
+    "search_results_from_installed_snaps": (
+        bench_search_results_from_installed_snaps,
+        500,
+    ),
+    "parse_installed_snaps[validated]": (bench_parse_installed_snaps_validated, 500),
+    "parse_installed_snaps[trusted]": (bench_parse_installed_snaps_trusted, 500),
+    "parse_installed_snaps[projected]": (bench_parse_installed_snaps_projected, 500),
+}
+
+
+async def run_benchmark(
+    env: BenchmarkEnvironment, name: str, iterations: int, warmup: int = 2
+) -> BenchmarkResult:
+    """Time ``iterations`` runs of the benchmark ``name``, after ``warmup`` untimed runs."""
+    benchmark, _ = BENCHMARKS[name]
+    for _ in range(warmup):
+        await benchmark(env)
+
+    timings = []
+    gc.collect()
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await benchmark(env)
+        timings.append(time.perf_counter() - start)
+
+    timings.sort()
+    return BenchmarkResult(
+        name=name,
+        iterations=iterations,
+        total=sum(timings),
+        mean=statistics.fmean(timings),
+        p50=timings[len(timings) // 2],
+        p95=timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+    )
+
+
+async def run_suite(
+    names: list[str] | None = None, scale: float = 1.0
+) -> list[BenchmarkResult]:
+    """Run the benchmarks ``names`` (default: all), scaling their iteration counts by ``scale``."""
+    results = []
+    async with BenchmarkEnvironment() as env:
+        for name in names or list(BENCHMARKS):
+            _, iterations = BENCHMARKS[name]
+            results.append(
+                await run_benchmark(env, name, max(1, round(iterations * scale)))
+            )
+    return results
+
+
+def load_thresholds(path: pathlib.Path = THRESHOLDS_PATH) -> dict[str, float]:
+    """Load the minimum acceptable operations per second of each benchmark."""
+    with open(path) as f:
+        return {
+            name: limits["min_ops_per_second"] for name, limits in json.load(f).items()
+        }
+
+
+def check_thresholds(
+    results: list[BenchmarkResult], thresholds: dict[str, float]
+) -> list[str]:
+    """Return a description of every benchmark slower than its threshold."""
+    failures = []
+    for result in results:
+        minimum = thresholds.get(result.name)
+        if minimum is not None and result.ops_per_second < minimum:
+            failures.append(
+                f"{result.name}: {result.ops_per_second:.1f} ops/s is below the "
+                f"threshold of {minimum:.1f} ops/s"
+            )
+    return failures
+
+
+def run(names: list[str] | None = None, scale: float = 1.0) -> list[BenchmarkResult]:
+    return asyncio.run(run_suite(names, scale))
@@ -0,0 +1,105 @@
+import asyncio
+import functools
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Generic, Hashable, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+_MISSING = object()
+
+
+class TTLCache(Generic[K, V]):
+    """Small in-memory cache whose entries expire ``ttl`` seconds after they are set.
+
+    When ``maxsize`` is set, the least recently used entry is evicted once the cache is full.
+    Cached values are returned as-is, so callers must not mutate them.
+
+    :param ttl: Number of seconds an entry stays valid.
+    :type ttl: float
+    :param maxsize: Maximum number of entries, or None for no limit.
+    :type maxsize: int | None
+    :param clock: Function returning the current time in seconds.
+    :type clock: Callable[[], float]
+    """
+
+    def __init__(
+        self,
+        ttl: float,
+        maxsize: int | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if ttl <= 0:
+            raise ValueError("ttl must be positive")
+        if maxsize is not None and maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._clock = clock
+        self._entries: OrderedDict[K, tuple[float, V]] = OrderedDict()
+
+    def get(self, key: K, default=None) -> V | None:
+        """Return the value for ``key`` if present and not expired, otherwise ``default``."""
+        entry = self._entries.get(key, _MISSING)
+        if entry is _MISSING:
+            return default
+        expires_at, value = entry
+        if expires_at <= self._clock():
+            del self._entries[key]
+            return default
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: K, value: V) -> None:
+        """Store ``value`` under ``key``, evicting the least recently used entry if full."""
+        self._entries[key] = (self._clock() + self.ttl, value)
+        self._entries.move_to_end(key)
+        if self.maxsize is not None:
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: K) -> None:
+        """Remove ``key`` from the cache, if present."""
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove every entry from the cache."""
+        self._entries.clear()
+
+    def __contains__(self, key: K) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SingleFlight(Generic[K, V]):
+    """Deduplicate concurrent calls for the same key.
+
+    While a fetch for a key is in flight, other callers asking for the same key wait for
+    that fetch instead of starting their own. If a caller is cancelled, the fetch keeps
+    running for the others.
+    """
+
+    def __init__(self) -> None:
+        self._in_flight: dict[K, asyncio.Future] = {}
+
+    def _forget(self, key: K, future: asyncio.Future) -> None:
+        if self._in_flight.get(key) is future:
+            del self._in_flight[key]
+        if not future.cancelled():
+            # mark the exception as retrieved if every caller went away
+            future.exception()
+
+    async def do(self, key: K, fetch: Callable[[], Awaitable[V]]) -> V:
+        """Return the result of ``fetch()``, sharing it with concurrent calls for ``key``."""
+        future = self._in_flight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(fetch())
+            self._in_flight[key] = future
+            future.add_done_callback(functools.partial(self._forget, key))
+        return await asyncio.shield(future)
+
+    def __len__(self) -> int:
+        return len(self._in_flight)
@@ -1,14 +1,18 @@
-import asyncio
 import logging
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Iterable, Type
 
 import httpx
-from retry import retry
 
+from snap_python.components.changes import ChangeWaiter
 from snap_python.components.config import ConfigEndpoints
 from snap_python.components.snaps import SnapsEndpoints
-from snap_python.components.store import StoreEndpoints
+from snap_python.components.store import DEFAULT_STORE_TIMEOUT, StoreEndpoints
+from snap_python.instrumentation import NO_INSTRUMENTATION, Instrumentation, ModelT
+from snap_python.progress import ProgressUpdate
+from snap_python.retry_policy import RetryPolicy
 from snap_python.schemas.changes import ChangesResponse
+from snap_python.schemas.store.refresh import RefreshPlan
+from snap_python.trusted import trusted_parsing_enabled
 from snap_python.utils import AbstractSnapsClient
 
 SNAPD_SOCKET = "/run/snapd.socket"
@@ -18,7 +22,13 @@ logger.setLevel(logging.DEBUG)
 
 
 class SnapClient(AbstractSnapsClient):
-    """Core class for interacting with the Snap Store and Snapd."""
+    """Core class for interacting with the Snap Store and Snapd.
+
+    ``snaps_cache_ttl`` enables the installed snaps cache of :attr:`snaps`. It is only cleared
+    by changes this client makes or waits on; run
+    :meth:`~snap_python.components.snaps.SnapsEndpoints.invalidate_on_notices` in a task to
+    also see changes made by other clients before the cached entries expire.
+    """
 
     def __init__(
         self,
@@ -28,6 +38,17 @@ class SnapClient(AbstractSnapsClient):
         store_base_url: str = "https://api.snapcraft.io",
         store_headers: dict[str, str] = None,
         prompt_for_authentication: bool = False,
+        retry_policy: RetryPolicy | None = None,
+        store_retry_policy: RetryPolicy | None = None,
+        store_client: httpx.AsyncClient | None = None,
+        store_limits: httpx.Limits | None = None,
+        store_timeout: httpx.Timeout | float = DEFAULT_STORE_TIMEOUT,
+        store_http2: bool = False,
+        store_info_cache_ttl: float | None = None,
+        snaps_cache_ttl: float | None = None,
+        snapd_transport: httpx.AsyncBaseTransport | None = None,
+        instrumentation: Instrumentation | None = None,
+        trusted_parsing: bool = False,
     ):
         if tcp_location and snapd_socket_location:
             raise ValueError(
@@ -35,10 +56,10 @@ class SnapClient(AbstractSnapsClient):
             )
         if tcp_location is not None:
             self._base_url = tcp_location
-            self._transport = httpx.AsyncHTTPTransport()
+            self._transport = snapd_transport or httpx.AsyncHTTPTransport()
         else:
             self._base_url = "http://localhost"
-            self._transport = httpx.AsyncHTTPTransport(
+            self._transport = snapd_transport or httpx.AsyncHTTPTransport(
                 uds=snapd_socket_location or SNAPD_SOCKET
             )
         if store_headers is None:
@@ -48,25 +69,64 @@ class SnapClient(AbstractSnapsClient):
         if prompt_for_authentication:
             self.snapd_headers = {"X-Allow-Interaction": "true"}
 
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.instrumentation = instrumentation or NO_INSTRUMENTATION
+        self.trusted_parsing = trusted_parsing
         self.version = version
         self.store_base_url = store_base_url
         self.store_headers = store_headers
         self.snapd_client = httpx.AsyncClient(
-            transport=self._transport, headers=self.snapd_headers
+            transport=self._transport,
+            headers=self.snapd_headers,
+            event_hooks=self.instrumentation.event_hooks(),
+        )
+        self.change_waiter = ChangeWaiter(self)
+        self.snaps = SnapsEndpoints(self, cache_ttl=snaps_cache_ttl)
+        self.change_waiter.add_ready_callback(
+            lambda _changes: self.snaps.invalidate_cache()
         )
-        self.snaps = SnapsEndpoints(self)
         self.store = StoreEndpoints(
             base_url=self.store_base_url,
             version=self.version,
             headers=self.store_headers,
+            retry_policy=store_retry_policy,
+            client=store_client,
+            limits=store_limits,
+            timeout=store_timeout,
+            http2=store_http2,
+            info_cache_ttl=store_info_cache_ttl,
+            instrumentation=self.instrumentation,
+            trusted_parsing=trusted_parsing,
         )
         self.config = ConfigEndpoints(self)
 
-    @retry(httpx.HTTPError, tries=3, delay=1, backoff=1)
+    def parse_json(self, model: Type[ModelT], data: bytes | str) -> ModelT:
+        """
+        Validate a snapd response into ``model``.
+
+        When the client was created with ``trusted_parsing=True``, or inside
+        :func:`snap_python.trusted.trusted_parsing`, a lazily validated view is returned instead.
+
+        :param model: The model the response is expected to match.
+        :type model: Type[BaseModel]
+        :param data: The raw JSON response body.
+        :type data: bytes | str
+
+        :returns: The validated model, or a :class:`~snap_python.trusted.ModelView` of it.
+        :rtype: BaseModel
+        """
+        return self.instrumentation.validate_json(
+            model, data, trusted=self.trusted_parsing or trusted_parsing_enabled()
+        )
+
     async def request(self, method: str, endpoint: str, **kwargs) -> httpx.Response:
         r"""
         Sends an HTTP request to the specified endpoint using the given method and parameters.
 
+        Transient failures are retried according to ``self.retry_policy`` (only connection
+        failures for non-idempotent methods, see :meth:`RetryPolicy.for_method`), and the
+        request is reported to ``self.instrumentation``.
+
         :param method: The HTTP method to use for the request (e.g., 'GET', 'POST').
         :type method: str
         :param endpoint: The API endpoint to send the request to.
@@ -79,17 +139,19 @@ class SnapClient(AbstractSnapsClient):
         :raises httpx.HTTPStatusError: If the response contains an HTTP status code indicating an error.
         """
 
-        response = await self.snapd_client.request(
-            method, f"{self._base_url}/{self.version}/{endpoint}", **kwargs
-        )
-        response.raise_for_status()
-        return response
+        url = f"{self._base_url}/{self.version}/{endpoint}"
+        async with self.instrumentation.trace("snapd", method, url) as trace:
+            trace.response = await self._request(method, url, **kwargs)
+        return trace.response
 
-    @retry(httpx.HTTPError, tries=3, delay=1, backoff=1)
     async def request_raw(self, method: str, endpoint: str, **kwargs) -> httpx.Response:
         r"""
         Sends an HTTP request using the specified method and endpoint.
 
+        Transient failures are retried according to ``self.retry_policy`` (only connection
+        failures for non-idempotent methods, see :meth:`RetryPolicy.for_method`), and the
+        request is reported to ``self.instrumentation``.
+
         :param method: The HTTP method to use for the request (e.g., 'GET', 'POST').
         :type method: str
         :param endpoint: The endpoint URL to send the request to.
@@ -102,11 +164,27 @@ class SnapClient(AbstractSnapsClient):
         :raises httpx.HTTPStatusError: If the response contains an HTTP status code indicating an error.
         """
 
-        response = await self.snapd_client.request(method, endpoint, **kwargs)
+        async with self.instrumentation.trace("snapd", method, endpoint) as trace:
+            trace.response = await self._request(method, endpoint, **kwargs)
+        return trace.response
 
+    async def _request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        return await self.retry_policy.for_method(method).call(
+            self._send, method, url, **kwargs
+        )
+
+    async def _send(self, method: str, url: str, **kwargs) -> httpx.Response:
+        response = await self.snapd_client.request(method, url, **kwargs)
         response.raise_for_status()
         return response
 
+    async def aclose(self) -> None:
+        """
+        Close the snapd client and the store client, unless the store client was provided by the caller.
+        """
+        await self.snapd_client.aclose()
+        await self.store.aclose()
+
     async def ping(self) -> httpx.Response:
         """
         Reserved for human-readable content describing the service.
@@ -118,7 +196,6 @@ class SnapClient(AbstractSnapsClient):
 
         return response
 
-    @retry(httpx.HTTPError, tries=3, delay=0.5)
     async def get_changes_by_id(self, change_id: str) -> ChangesResponse:
         """
         Asynchronously retrieves changes by their ID.
@@ -141,7 +218,7 @@ class SnapClient(AbstractSnapsClient):
             )
             response = e.response
 
-        return ChangesResponse.model_validate_json(response.content)
+        return self.parse_json(ChangesResponse, response.content)
 
     async def get_changes_by_id_generator(
         self, change_id: str
@@ -149,10 +226,9 @@ class SnapClient(AbstractSnapsClient):
         """
         Asynchronous generator to fetch changes by change ID.
 
-        This generator continuously requests changes from the server using the provided
-        change ID and yields the response as a ChangesResponse object. It includes error
-        handling for HTTP status errors and adds a small delay between requests to avoid
-        overwhelming the server.
+        Yields the change as a ChangesResponse object every time snapd reports an update
+        to it, and stops after yielding the ready change. See :class:`ChangeWaiter` for how
+        updates are detected.
 
         :param change_id: The ID of the change to fetch.
         :type change_id: str
@@ -160,24 +236,83 @@ class SnapClient(AbstractSnapsClient):
         :yields: The response object containing the changes.
         :rtype: ChangesResponse
 
-        :raises httpx.HTTPStatusError: If the request fails with an HTTP status error.
+        :raises httpx.HTTPError: If the change cannot be retrieved.
         """
-        while True:
-            try:
-                response = await self.request("GET", f"changes/{change_id}")
-            except httpx.HTTPStatusError as e:
-                logger.warning(
-                    "Bad response status code for get_changes_by_id: %s",
-                    e.response.status_code,
-                )
-                response = e.response
-
-            change_response = ChangesResponse.model_validate_json(response.content)
+        async for change_response in self.change_waiter.watch(change_id):
             yield change_response
 
-            await asyncio.sleep(
-                0.01
-            )  # Add a delay to avoid spamming the server with requests
+    async def watch_change_progress(
+        self, change_id: str
+    ) -> AsyncGenerator[ProgressUpdate, None]:
+        """
+        Yield the progress deltas of a change every time it advances, until it is ready.
+
+        See :meth:`ChangeWaiter.watch_progress`.
+
+        :param change_id: The ID of the change to watch.
+        :type change_id: str
+
+        :yields: What changed in the progress of the change, with its rate and ETA.
+        :rtype: ProgressUpdate
+
+        :raises httpx.HTTPError: If the change cannot be retrieved.
+        """
+        async for update in self.change_waiter.watch_progress(change_id):
+            yield update
+
+    async def wait_for_change(
+        self, change_id: str, action: str | None = None
+    ) -> ChangesResponse:
+        """
+        Wait for a change to be ready.
+
+        :param change_id: The ID of the change to wait for.
+        :type change_id: str
+        :param action: Name of the action that created the change, used in error messages.
+        :type action: str, optional
+
+        :returns: The ready change.
+        :rtype: ChangesResponse
+
+        :raises SnapdAPIError: If ``action`` is provided and the change reports an error.
+        """
+        return await self.change_waiter.wait(change_id, action=action)
+
+    async def wait_for_changes(
+        self, change_ids: Iterable[str]
+    ) -> list[ChangesResponse]:
+        """
+        Wait for several changes to be ready.
+
+        All changes being waited on through this client share one watcher, which fetches
+        every change with a single request per tick instead of one request per change.
+
+        :param change_ids: The IDs of the changes to wait for.
+        :type change_ids: Iterable[str]
+
+        :returns: The ready changes, in the order of ``change_ids``.
+        :rtype: list[ChangesResponse]
+
+        :raises httpx.HTTPError: If the changes cannot be retrieved.
+        """
+        return await self.change_waiter.wait_many(change_ids)
+
+    async def changes_as_completed(
+        self, change_ids: Iterable[str]
+    ) -> AsyncGenerator[ChangesResponse, None]:
+        """
+        Yield changes as they become ready, using the same shared watcher as :meth:`wait_for_changes`.
+
+        :param change_ids: The IDs of the changes to wait for.
+        :type change_ids: Iterable[str]
+
+        :yields: Each change once it is ready.
+        :rtype: ChangesResponse
+
+        :raises httpx.HTTPError: If the changes cannot be retrieved.
+        """
+        async for change_response in self.change_waiter.as_completed(change_ids):
+            yield change_response
 
     async def get_system_info(self) -> dict:
         """
@@ -190,3 +325,22 @@ class SnapClient(AbstractSnapsClient):
         """
         response = await self.request("GET", "system-info")
         return response.json()
+
+    async def plan_refreshes(self, arch: str | None = None) -> RefreshPlan:
+        """
+        Ask the store which installed snaps have a new revision available.
+
+        Lists the installed snaps and sends them to the store in as few refresh requests as
+        possible. See :meth:`StoreEndpoints.plan_refreshes`.
+
+        :param arch: The architecture of the device. Defaults to the one reported by snapd.
+        :type arch: str, optional
+
+        :returns: The refresh candidates, the up-to-date snaps and any errors.
+        :rtype: RefreshPlan
+        """
+        installed = await self.snaps.list_installed_snaps()
+        if arch is None:
+            system_info = await self.get_system_info()
+            arch = system_info["result"]["architecture"]
+        return await self.store.plan_refreshes(installed, arch)
@@ -0,0 +1,419 @@
+import asyncio
+import logging
+from typing import AsyncGenerator, Callable, Iterable
+
+import httpx
+
+from snap_python.progress import ProgressTracker, ProgressUpdate
+from snap_python.schemas.changes import ChangesListResponse, ChangesResponse
+from snap_python.schemas.notices import NoticesResponse
+from snap_python.trusted import as_model
+from snap_python.utils import AbstractSnapsClient, SnapdAPIError, going_to_reload_daemon
+
+logger = logging.getLogger("snap_python.components.changes")
+
+# statuses snapd versions without the notices API answer /v2/notices with
+NOTICES_UNSUPPORTED_STATUSES = frozenset({400, 404})
+
+
+class ChangeWaiter:
+    """Wait for snapd changes to progress and complete.
+
+    When snapd supports the ``/v2/notices`` endpoint, the waiter long-polls for
+    ``change-update`` notices and only re-fetches a change after snapd reports that
+    it was updated. Otherwise (or while the daemon is restarting) it falls back to
+    polling with an adaptive backoff.
+
+    :param client: The client used to talk to snapd.
+    :type client: AbstractSnapsClient
+    :param use_notices: Whether to try the notices API at all.
+    :type use_notices: bool
+    :param notice_timeout: How long a single notices long-poll may wait, in seconds.
+    :type notice_timeout: float
+    :param min_poll_interval: Initial delay between polls when falling back to polling.
+    :type min_poll_interval: float
+    :param max_poll_interval: Maximum delay between polls when falling back to polling.
+    :type max_poll_interval: float
+    :param poll_backoff: Multiplier applied to the poll delay after every unchanged poll.
+    :type poll_backoff: float
+    """
+
+    def __init__(
+        self,
+        client: AbstractSnapsClient,
+        use_notices: bool = True,
+        notice_timeout: float = 30.0,
+        min_poll_interval: float = 0.05,
+        max_poll_interval: float = 1.0,
+        poll_backoff: float = 1.5,
+    ) -> None:
+        self._client = client
+        self.notices_supported = use_notices
+        self.notice_timeout = notice_timeout
+        self.min_poll_interval = min_poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.poll_backoff = poll_backoff
+        # change id -> futures waiting for that change, served by one watcher task
+        self._pending: dict[str, list[asyncio.Future]] = {}
+        self._watch_task: asyncio.Task | None = None
+        self._wakeup: asyncio.Event | None = None
+        self._ready_callbacks: list[Callable[[ChangesResponse], None]] = []
+
+    def add_ready_callback(self, callback: Callable[[ChangesResponse], None]) -> None:
+        """Register ``callback`` to be called with every change this waiter sees become ready."""
+        self._ready_callbacks.append(callback)
+
+    def _notify_ready(self, changes: ChangesResponse) -> None:
+        for callback in self._ready_callbacks:
+            callback(changes)
+
+    async def get_change_notices(
+        self,
+        change_ids: list[str],
+        after: str | None = None,
+        timeout: float | None = None,
+    ) -> NoticesResponse:
+        """
+        Retrieve ``change-update`` notices for the given changes.
+
+        :param change_ids: The IDs of the changes to retrieve notices for.
+        :type change_ids: list[str]
+        :param after: Only return notices repeated after this timestamp.
+        :type after: str, optional
+        :param timeout: Long-poll for up to this many seconds if no notices match.
+        :type timeout: float, optional
+
+        :returns: The notices response.
+        :rtype: NoticesResponse
+
+        :raises httpx.HTTPStatusError: If the request results in an HTTP error.
+        """
+        params = {"types": "change-update", "keys": ",".join(change_ids)}
+        if after is not None:
+            params["after"] = after
+        request_kwargs = {}
+        if timeout:
+            params["timeout"] = f"{timeout:g}s"
+            # leave room for snapd to answer once the long-poll expires
+            request_kwargs["timeout"] = httpx.Timeout(5.0, read=timeout + 5.0)
+        response = await self._client.request(
+            "GET", "notices", params=params, **request_kwargs
+        )
+        return self._client.parse_json(NoticesResponse, response.content)
+
+    async def get_changes(self, select: str = "all") -> ChangesListResponse:
+        """
+        Retrieve all changes matching ``select`` in a single request.
+
+        :param select: Which changes to return: "all", "in-progress" or "ready".
+        :type select: str
+
+        :returns: The changes list response.
+        :rtype: ChangesListResponse
+
+        :raises httpx.HTTPStatusError: If the request results in an HTTP error.
+        """
+        response = await self._client.request(
+            "GET", "changes", params={"select": select}
+        )
+        return self._client.parse_json(ChangesListResponse, response.content)
+
+    async def _latest_notice(self, change_ids: list[str]) -> str | None:
+        """Return the newest ``last-repeated`` timestamp for the changes.
+
+        Notices are disabled for the lifetime of the waiter only when snapd answers that the
+        endpoint is unsupported. Other errors (e.g. a 500 while snapd is busy) fall back to
+        polling until the next long-poll, which tries notices again.
+        """
+        try:
+            notices = await self.get_change_notices(change_ids)
+        except httpx.HTTPStatusError as e:
+            status_code = e.response.status_code
+            if status_code in NOTICES_UNSUPPORTED_STATUSES:
+                logger.debug(
+                    "snapd notices unavailable (%s), falling back to polling",
+                    status_code,
+                )
+                self.notices_supported = False
+            else:
+                logger.debug("Getting change notices failed (%s)", status_code)
+            return None
+        return max((n.last_repeated for n in notices.result), default=None)
+
+    async def _wait_for_notice(
+        self, change_ids: list[str], after: str | None, timeout: float | None = None
+    ) -> tuple[bool, str | None]:
+        """Long-poll for an update to any of the changes.
+
+        :param timeout: How long to wait for a notice. Defaults to ``notice_timeout``.
+
+        :returns: Whether the long-poll succeeded, and the ``after`` value to use next.
+        """
+        if timeout is None:
+            timeout = self.notice_timeout
+        try:
+            notices = await self.get_change_notices(
+                change_ids, after=after, timeout=timeout
+            )
+        except httpx.HTTPError as e:
+            logger.debug("Waiting for change notices failed: %s", e)
+            return False, after
+        latest = max((n.last_repeated for n in notices.result), default=None)
+        return True, latest or after
+
+    async def _get_change(
+        self, change_id: str, previous: ChangesResponse | None
+    ) -> ChangesResponse | None:
+        try:
+            return await self._client.get_changes_by_id(change_id)
+        except httpx.HTTPError:
+            if going_to_reload_daemon(previous):
+                logger.debug("Waiting for daemon to reload")
+                return None
+            raise
+
+    async def watch(
+        self, change_id: str, follow_progress: bool = True
+    ) -> AsyncGenerator[ChangesResponse, None]:
+        """
+        Yield the state of a change every time it is updated, until it is ready.
+
+        snapd only records a ``change-update`` notice when a change is spawned or changes
+        status, not when its tasks make progress. When following progress, each notices
+        long-poll is therefore cut short at the current poll interval, so progress is picked
+        up as promptly as with plain polling while status changes still wake the watcher
+        immediately.
+
+        :param change_id: The ID of the change to watch.
+        :type change_id: str
+        :param follow_progress: Whether to re-fetch the change while it makes progress. If
+            False, only status changes (e.g. becoming ready) are waited for.
+        :type follow_progress: bool
+
+        :yields: The current state of the change. The last item yielded is ready.
+        :rtype: ChangesResponse
+
+        :raises httpx.HTTPError: If the change cannot be retrieved and the daemon is not reloading.
+        """
+        after = None
+        if self.notices_supported:
+            after = await self._latest_notice([change_id])
+
+        previous = None
+        interval = self.min_poll_interval
+        while True:
+            changes = await self._get_change(change_id, previous)
+            if changes is not None:
+                if changes.ready:
+                    self._notify_ready(changes)
+                yield changes
+                if changes.ready:
+                    return
+                previous = changes
+
+                if self.notices_supported:
+                    timeout = interval if follow_progress else self.notice_timeout
+                    notified, latest = await self._wait_for_notice(
+                        [change_id], after, timeout
+                    )
+                    if notified:
+                        if latest != after:
+                            interval = self.min_poll_interval
+                        else:
+                            # the long-poll expired without a status change
+                            interval = min(
+                                interval * self.poll_backoff, self.max_poll_interval
+                            )
+                        after = latest
+                        continue
+
+            await asyncio.sleep(interval)
+            interval = min(interval * self.poll_backoff, self.max_poll_interval)
+
+    async def watch_progress(
+        self, change_id: str, tracker: ProgressTracker | None = None
+    ) -> AsyncGenerator[ProgressUpdate, None]:
+        """
+        Yield what changed in the progress of a change every time it advances, until it is ready.
+
+        Updates of a change that did not advance are skipped, so progress bars are only
+        redrawn when there is something new to show.
+
+        :param change_id: The ID of the change to watch.
+        :type change_id: str
+        :param tracker: The tracker comparing successive snapshots. Pass a shared tracker to
+            combine the rate of several streams; a new one is used by default.
+        :type tracker: ProgressTracker, optional
+
+        :yields: The progress update. The last item yielded is ready.
+        :rtype: ProgressUpdate
+
+        :raises httpx.HTTPError: If the change cannot be retrieved and the daemon is not reloading.
+        """
+        if tracker is None:
+            tracker = ProgressTracker()
+        async for changes in self.watch(change_id):
+            update = tracker.update(changes)
+            if update is not None:
+                yield update
+
+    async def wait(self, change_id: str, action: str | None = None) -> ChangesResponse:
+        """
+        Wait for a change to be ready.
+
+        :param change_id: The ID of the change to wait for.
+        :type change_id: str
+        :param action: Name of the action that created the change, used in error messages. If None, errors reported
+            by the change before it is ready are not raised.
+        :type action: str, optional
+
+        :returns: The ready change.
+        :rtype: ChangesResponse
+
+        :raises SnapdAPIError: If ``action`` is provided and the change reports an error.
+        """
+        async for changes in self.watch(change_id, follow_progress=False):
+            if changes.ready:
+                return changes
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Progress: %s", changes.result.overall_progress)
+            if action is not None and changes.result.err:
+                raise SnapdAPIError(f"Error in snap {action}: {changes.result.err}")
+        return changes
+
+    def _subscribe(self, change_id: str) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        self._pending.setdefault(change_id, []).append(future)
+        if self._watch_task is None or self._watch_task.done():
+            self._wakeup = asyncio.Event()
+            self._watch_task = asyncio.create_task(self._watch_pending())
+        else:
+            self._wakeup.set()
+        return future
+
+    def _resolve(self, change_id: str, changes: ChangesResponse) -> None:
+        for future in self._pending.pop(change_id, []):
+            if not future.done():
+                future.set_result(changes)
+
+    def _fail_pending(self, error: Exception | None) -> None:
+        """Fail every pending future with ``error``, or cancel them if it is None."""
+        pending, self._pending = self._pending, {}
+        for futures in pending.values():
+            for future in futures:
+                if future.done():
+                    continue
+                if error is None:
+                    future.cancel()
+                else:
+                    future.set_exception(error)
+
+    def _drop_abandoned(self) -> None:
+        for change_id, futures in list(self._pending.items()):
+            futures[:] = [future for future in futures if not future.done()]
+            if not futures:
+                del self._pending[change_id]
+
+    async def _next_update(self, after: str | None, interval: float) -> str | None:
+        if self.notices_supported:
+            notified, after = await self._wait_for_notice(list(self._pending), after)
+            if notified:
+                return after
+        await asyncio.sleep(interval)
+        return after
+
+    async def _wait_for_tick(self, after: str | None, interval: float) -> str | None:
+        """Wait until a pending change may have been updated, or a new change was subscribed."""
+        tick = asyncio.ensure_future(self._next_update(after, interval))
+        wakeup = asyncio.ensure_future(self._wakeup.wait())
+        try:
+            await asyncio.wait({tick, wakeup}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            tick.cancel()
+            wakeup.cancel()
+        self._wakeup.clear()
+        if tick.done() and not tick.cancelled():
+            return tick.result()
+        return after
+
+    async def _watch_pending(self) -> None:
+        """Poll every pending change with one request per tick until none are left."""
+        previous = None
+        after = None
+        interval = self.min_poll_interval
+        try:
+            if self.notices_supported:
+                after = await self._latest_notice(list(self._pending))
+            while self._pending:
+                try:
+                    changes = await self.get_changes(select="all")
+                except httpx.HTTPError:
+                    if not going_to_reload_daemon(previous):
+                        raise
+                    logger.debug("Waiting for daemon to reload")
+                    changes = None
+
+                if changes is not None:
+                    previous = changes
+                    by_id = {change.id: change for change in changes.result}
+                    for change_id in list(self._pending):
+                        change = by_id.get(change_id)
+                        if change is None:
+                            # unknown or pruned change, let snapd report it
+                            response = await self._client.get_changes_by_id(change_id)
+                        else:
+                            response = ChangesResponse(
+                                status_code=changes.status_code,
+                                type=changes.type,
+                                status=changes.status,
+                                result=as_model(change),
+                                maintenance=as_model(changes.maintenance),
+                            )
+                        if response.ready:
+                            self._notify_ready(response)
+                            self._resolve(change_id, response)
+
+                self._drop_abandoned()
+                if not self._pending:
+                    break
+                after = await self._wait_for_tick(after, interval)
+                interval = min(interval * self.poll_backoff, self.max_poll_interval)
+        except asyncio.CancelledError:
+            self._fail_pending(None)
+            raise
+        except Exception as e:
+            logger.debug("Watching changes %s failed: %s", list(self._pending), e)
+            self._fail_pending(e)
+
+    async def wait_many(self, change_ids: Iterable[str]) -> list[ChangesResponse]:
+        """
+        Wait for several changes to be ready, polling all of them with one request per tick.
+
+        :param change_ids: The IDs of the changes to wait for.
+        :type change_ids: Iterable[str]
+
+        :returns: The ready changes, in the order of ``change_ids``.
+        :rtype: list[ChangesResponse]
+        """
+        futures = [self._subscribe(change_id) for change_id in change_ids]
+        return list(await asyncio.gather(*futures))
+
+    async def as_completed(
+        self, change_ids: Iterable[str]
+    ) -> AsyncGenerator[ChangesResponse, None]:
+        """
+        Yield changes as they become ready, polling all of them with one request per tick.
+
+        :param change_ids: The IDs of the changes to wait for.
+        :type change_ids: Iterable[str]
+
+        :yields: Each change once it is ready.
+        :rtype: ChangesResponse
+        """
+        futures = [self._subscribe(change_id) for change_id in change_ids]
+        try:
+            for next_ready in asyncio.as_completed(futures):
+                yield await next_ready
+        finally:
+            for future in futures:
+                future.cancel()
@@ -1,4 +1,3 @@
-import asyncio
 import logging
 
 import httpx
@@ -30,7 +29,7 @@ class ConfigEndpoints:
                 "GET", f"{self.common_endpoint}/{snap}/conf"
             )
 
-        return ConfigResponse.model_validate_json(response.content)
+        return self._client.parse_json(ConfigResponse, response.content)
 
     async def set_configuration(
         self, snap: str, configuration: dict, wait: bool = True
@@ -40,15 +39,7 @@ class ConfigEndpoints:
             "PUT", f"{self.common_endpoint}/{snap}/conf", json=configuration
         )
 
-        async_response = AsyncResponse.model_validate_json(response.content)
+        async_response = self._client.parse_json(AsyncResponse, response.content)
         if not wait:
             return async_response
-        while True:
-            changes = await self._client.get_changes_by_id(async_response.change)
-
-            if changes.ready:
-                break
-
-            await asyncio.sleep(0.1)
-
-        return changes
+        return await self._client.wait_for_change(async_response.change)
@@ -5,33 +5,136 @@ from typing import Any
 
 import httpx
 
+from snap_python.cache import TTLCache
 from snap_python.schemas.changes import ChangesResponse
-from snap_python.schemas.common import AsyncResponse, BaseErrorResult
+from snap_python.schemas.common import AsyncResponse
+from snap_python.schemas.notices import NoticesResponse
 from snap_python.schemas.snaps import (
     AppsResponse,
     InstalledSnapListResponse,
+    InstalledSnapRecordListResponse,
     SingleInstalledSnapResponse,
+    installed_snap_record_type,
 )
-from snap_python.utils import AbstractSnapsClient, SnapdAPIError, going_to_reload_daemon
+from snap_python.trusted import as_model
+from snap_python.upload import DEFAULT_CHUNK_SIZE, SnapUpload, UploadProgressCallback
+from snap_python.utils import AbstractSnapsClient, SnapdAPIError
 
 logger = logging.getLogger("snap_python.components.snaps")
 
 
+_INSTALLED_SNAPS_KEY = ("installed",)
+
+
 class SnapsEndpoints:
-    def __init__(self, client: AbstractSnapsClient) -> None:
+    def __init__(
+        self, client: AbstractSnapsClient, cache_ttl: float | None = None
+    ) -> None:
+        """
+        :param client: The client used to talk to snapd.
+        :type client: AbstractSnapsClient
+        :param cache_ttl: If set, cache installed snap information for this many seconds. The cache is cleared
+            whenever this client starts or completes a change, see :meth:`invalidate_cache`. Changes made by
+            anyone else (``snap refresh`` in a shell, snapd's automatic refreshes, other processes) are not
+            seen until the cached entries expire, unless :meth:`invalidate_on_notices` is running.
+        :type cache_ttl: float, optional
+        """
         self._client = client
         self.common_endpoint = "snaps"
+        self._cache: TTLCache | None = TTLCache(cache_ttl) if cache_ttl else None
+        # bumped on invalidation so responses fetched before it are not cached
+        self._cache_generation = 0
+
+    def invalidate_cache(self) -> None:
+        """Drop all cached installed snap information."""
+        self._cache_generation += 1
+        if self._cache is not None:
+            self._cache.clear()
+
+    def _cache_get(self, key: tuple):
+        if self._cache is None:
+            return None
+        return self._cache.get(key)
+
+    def _cache_set(self, key: tuple, value, generation: int) -> None:
+        if self._cache is not None and generation == self._cache_generation:
+            self._cache.set(key, value)
+
+    async def _request_change(self, *args, **kwargs) -> httpx.Response:
+        """Send a request that starts a change, invalidating the cache."""
+        try:
+            return await self._client.request(*args, **kwargs)
+        finally:
+            self.invalidate_cache()
+
+    async def invalidate_on_notices(self, timeout: float = 30.0) -> None:
+        """
+        Invalidate the cache whenever snapd reports a change update, including changes started by other clients.
 
-    async def list_installed_snaps(self) -> InstalledSnapListResponse:
+        Runs until cancelled, e.g. ``asyncio.create_task(client.snaps.invalidate_on_notices())``. It is not
+        started automatically: without it, a cache enabled with ``cache_ttl`` may serve snaps that
+        other clients changed for up to ``cache_ttl`` seconds.
+
+        :param timeout: How long a single notices long-poll may wait, in seconds.
+        :type timeout: float
+
+        :raises httpx.HTTPStatusError: If snapd does not support notices.
+        """
+        after = None
+        while True:
+            params = {"types": "change-update", "timeout": f"{timeout:g}s"}
+            if after is not None:
+                params["after"] = after
+            try:
+                response = await self._client.request(
+                    "GET",
+                    "notices",
+                    params=params,
+                    timeout=httpx.Timeout(5.0, read=timeout + 5.0),
+                )
+            except httpx.TransportError as e:
+                # e.g. snapd restarting, anything may have changed meanwhile
+                logger.debug("Waiting for change notices failed: %s", e)
+                self.invalidate_cache()
+                await asyncio.sleep(1.0)
+                continue
+            notices = self._client.parse_json(NoticesResponse, response.content)
+            if notices.result:
+                after = max(notice.last_repeated for notice in notices.result)
+                self.invalidate_cache()
+
+    async def list_installed_snaps(
+        self, fields: list[str] | None = None
+    ) -> InstalledSnapListResponse | InstalledSnapRecordListResponse:
         """
         Asynchronously retrieves a list of installed snaps.
 
+        If caching is enabled, the cached response is shared between callers and must not be modified.
+
+        With ``fields``, only those fields of each snap are parsed, into compact records (see
+        :func:`~snap_python.schemas.snaps.installed_snap_record_type`) instead of full
+        :class:`~snap_python.schemas.snaps.InstalledSnap` models. This is much cheaper on hosts
+        with many installed snaps. Projected responses are built from the cache when it is
+        populated, but are not cached themselves.
+
+        :param fields: The :class:`~snap_python.schemas.snaps.InstalledSnap` fields to parse,
+            e.g. ``["name", "revision", "tracking_channel", "status"]``.
+        :type fields: list[str], optional
+
         :returns: The response containing the list of installed snaps.
-        :rtype: InstalledSnapListResponse
+        :rtype: InstalledSnapListResponse | InstalledSnapRecordListResponse
 
+        :raises ValueError: If invalid fields are provided.
         :raises httpx.HTTPStatusError: If the response status code does not indicate success.
         """
+        if fields is not None:
+            return await self._list_installed_snap_records(tuple(fields))
 
+        cached = self._cache_get(_INSTALLED_SNAPS_KEY)
+        if cached is not None:
+            return cached[0]
+
+        generation = self._cache_generation
         response: httpx.Response = await self._client.request(
             "GET", self.common_endpoint
         )
@@ -42,7 +145,47 @@ class SnapsEndpoints:
                 response=response,
                 message=f"Invalid status code in response: {response.status_code}",
             )
-        return InstalledSnapListResponse.model_validate_json(response.content)
+        installed_snaps = self._client.parse_json(
+            InstalledSnapListResponse, response.content
+        )
+        self._cache_set(
+            _INSTALLED_SNAPS_KEY,
+            (installed_snaps, {snap.name for snap in installed_snaps.result}),
+            generation,
+        )
+        return installed_snaps
+
+    async def _list_installed_snap_records(
+        self, fields: tuple[str, ...]
+    ) -> InstalledSnapRecordListResponse:
+        record_type = installed_snap_record_type(fields)
+        response_type = InstalledSnapRecordListResponse[record_type]
+
+        cached = self._cache_get(_INSTALLED_SNAPS_KEY)
+        if cached is not None:
+            installed_snaps = cached[0]
+            return response_type.model_construct(
+                status_code=installed_snaps.status_code,
+                type=installed_snaps.type,
+                status=installed_snaps.status,
+                result=[
+                    record_type(
+                        **{field: as_model(getattr(snap, field)) for field in fields}
+                    )
+                    for snap in installed_snaps.result
+                ],
+            )
+
+        response: httpx.Response = await self._client.request(
+            "GET", self.common_endpoint
+        )
+        if response.status_code > 299:
+            raise httpx.HTTPStatusError(
+                request=response.request,
+                response=response,
+                message=f"Invalid status code in response: {response.status_code}",
+            )
+        return self._client.parse_json(response_type, response.content)
 
     async def get_snap_info(self, snap: str) -> SingleInstalledSnapResponse:
         """
@@ -56,6 +199,11 @@ class SnapsEndpoints:
 
         :raises httpx.HTTPStatusError: If the response status code does not indicate success.
         """
+        cached = self._cache_get(("info", snap))
+        if cached is not None:
+            return cached
+
+        generation = self._cache_generation
         try:
             response: httpx.Response = await self._client.request(
                 "GET", f"{self.common_endpoint}/{snap}"
@@ -68,7 +216,11 @@ class SnapsEndpoints:
             )
             response = e.response
 
-        return SingleInstalledSnapResponse.model_validate_json(response.content)
+        snap_info = self._client.parse_json(
+            SingleInstalledSnapResponse, response.content
+        )
+        self._cache_set(("info", snap), snap_info, generation)
+        return snap_info
 
     async def is_snap_installed(self, snap: str) -> bool:
         """
@@ -80,12 +232,35 @@ class SnapsEndpoints:
         :returns: True if the snap package is installed, False otherwise.
         :rtype: bool
         """
+        cached = self._cache_get(_INSTALLED_SNAPS_KEY)
+        if cached is not None:
+            return snap in cached[1]
 
         snap_info = await self.get_snap_info(snap)
         if snap_info.status == "OK":
             return True
         return False
 
+    async def _sideload(
+        self,
+        filenames: list[str],
+        request_data: dict,
+        upload_progress: UploadProgressCallback | None = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        use_mmap: bool = False,
+    ) -> httpx.Response:
+        """Stream snap files to snapd as a multipart upload."""
+        with SnapUpload(
+            filenames,
+            fields=request_data,
+            chunk_size=chunk_size,
+            use_mmap=use_mmap,
+            progress=upload_progress,
+        ) as upload:
+            return await self._request_change(
+                "POST", self.common_endpoint, content=upload, headers=upload.headers
+            )
+
     async def install_snap(
         self,
         snap: str,
@@ -97,6 +272,7 @@ class SnapsEndpoints:
         revision: int = None,
         filename: str = None,
         wait: bool = False,
+        upload_progress: UploadProgressCallback | None = None,
     ) -> AsyncResponse | ChangesResponse:
         """
         Install or sideload a snap.
@@ -121,6 +297,8 @@ class SnapsEndpoints:
         :type filename: str, optional
         :param wait: Whether to wait for snap to install. If not waiting, will return async response with change id, defaults to False.
         :type wait: bool, optional
+        :param upload_progress: Called with ``(bytes_sent, total_bytes)`` while a sideloaded snap is uploaded.
+        :type upload_progress: Callable[[int, int], None], optional
 
         :raises FileNotFoundError: If the specified snap file does not exist.
         :raises ValueError: If attempting to sideload without the dangerous flag set to True.
@@ -147,37 +325,17 @@ class SnapsEndpoints:
                 raise ValueError(
                     "Cannot sideload snap without dangerous flag set to True"
                 )
-            raw_response: httpx.Response = await self._client.request(
-                "POST",
-                f"{self.common_endpoint}",
-                data=request_data,
-                files={"snap": open(filename, "rb")},
+            raw_response = await self._sideload(
+                [filename], request_data, upload_progress=upload_progress
             )
         else:
             # install from default snap store
-            raw_response: httpx.Response = await self._client.request(
+            raw_response: httpx.Response = await self._request_change(
                 "POST", f"{self.common_endpoint}/{snap}", json=request_data
             )
-        response = AsyncResponse.model_validate_json(raw_response.content)
+        response = self._client.parse_json(AsyncResponse, raw_response.content)
         if wait:
-            changes_id = response.change
-            previous_changes = None
-            while True:
-                try:
-                    changes = await self._client.get_changes_by_id(changes_id)
-                    logger.debug("Progress: %s", changes.result.overall_progress)
-                except httpx.HTTPError:
-                    if going_to_reload_daemon(previous_changes):
-                        logger.debug("Waiting for daemon to reload")
-                        changes = previous_changes
-
-                if changes.ready:
-                    break
-                if changes.result.err:
-                    raise SnapdAPIError(f"Error in snap install: {changes.result.err}")
-                await asyncio.sleep(0.1)
-                previous_changes = changes
-            return changes
+            return await self._client.wait_for_change(response.change, action="install")
         return response
 
     async def remove_snap(
@@ -210,29 +368,13 @@ class SnapsEndpoints:
             "terminate": terminate,
         }
 
-        raw_response: httpx.Response = await self._client.request(
+        raw_response: httpx.Response = await self._request_change(
             "POST", f"{self.common_endpoint}/{snap}", json=request_data
         )
-        response = AsyncResponse.model_validate_json(raw_response.content)
+        response = self._client.parse_json(AsyncResponse, raw_response.content)
 
         if wait:
-            changes_id = response.change
-            previous_changes = None
-            while True:
-                try:
-                    changes = await self._client.get_changes_by_id(changes_id)
-                except httpx.HTTPError:
-                    if going_to_reload_daemon(previous_changes):
-                        logger.debug("Waiting for daemon to reload")
-                        await asyncio.sleep(0.1)
-                        continue
-                if changes.ready:
-                    break
-                if changes.result.err:
-                    raise SnapdAPIError(f"Error in snap remove: {changes.result.err}")
-                await asyncio.sleep(0.1)
-                previous_changes = changes
-            return changes
+            return await self._client.wait_for_change(response.change, action="remove")
 
         return response
 
@@ -248,6 +390,7 @@ class SnapsEndpoints:
         revision: int = None,
         filename: str = None,
         wait: bool = False,
+        upload_progress: UploadProgressCallback | None = None,
     ) -> AsyncResponse | ChangesResponse:
         """
         Refreshes a snap package.
@@ -272,6 +415,8 @@ class SnapsEndpoints:
         :type filename: str, optional
         :param wait: Whether to wait for the refresh operation to complete. Defaults to False.
         :type wait: bool, optional
+        :param upload_progress: Called with ``(bytes_sent, total_bytes)`` while a sideloaded snap is uploaded.
+        :type upload_progress: Callable[[int, int], None], optional
 
         :returns: The response from the refresh operation.
         :rtype: AsyncResponse | ChangesResponse
@@ -299,40 +444,186 @@ class SnapsEndpoints:
                 raise ValueError(
                     "Cannot sideload snap without dangerous flag set to True"
                 )
-            raw_response: httpx.Response = await self._client.request(
-                "POST",
-                f"{self.common_endpoint}",
-                data=request_data,
-                files={"snap": open(filename, "rb")},
+            raw_response = await self._sideload(
+                [filename], request_data, upload_progress=upload_progress
             )
         else:
             # install from default snap store
-            raw_response: httpx.Response = await self._client.request(
+            raw_response: httpx.Response = await self._request_change(
                 "POST", f"{self.common_endpoint}/{snap}", json=request_data
             )
-        response = AsyncResponse.model_validate_json(raw_response.content)
+        response = self._client.parse_json(AsyncResponse, raw_response.content)
+        if wait:
+            return await self._client.wait_for_change(response.change, action="refresh")
+        return response
+
+    async def sideload_snaps(
+        self,
+        filenames: list[str],
+        classic: bool = False,
+        devmode: bool = False,
+        jailmode: bool = False,
+        wait: bool = False,
+        upload_progress: UploadProgressCallback | None = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        use_mmap: bool = False,
+    ) -> AsyncResponse | ChangesResponse:
+        """
+        Sideload one or more snap files in a single request.
+
+        The files are streamed in ``chunk_size`` pieces instead of being loaded into memory, and are installed with
+        the dangerous flag set.
+
+        :param filenames: Paths to the snap files to sideload.
+        :type filenames: list[str]
+        :param classic: Install with classic confinement, defaults to False.
+        :type classic: bool, optional
+        :param devmode: Install with devmode, defaults to False.
+        :type devmode: bool, optional
+        :param jailmode: Install snap with jailmode, defaults to False.
+        :type jailmode: bool, optional
+        :param wait: Whether to wait for the snaps to install. If not waiting, will return async response with change id, defaults to False.
+        :type wait: bool, optional
+        :param upload_progress: Called with ``(bytes_sent, total_bytes)`` while the files are uploaded.
+        :type upload_progress: Callable[[int, int], None], optional
+        :param chunk_size: Number of bytes read from disk at a time, defaults to 1 MiB.
+        :type chunk_size: int, optional
+        :param use_mmap: Read the files through mmap instead of buffered reads, defaults to False.
+        :type use_mmap: bool, optional
+
+        :raises ValueError: If no files are provided.
+        :raises FileNotFoundError: If one of the snap files does not exist.
+        :raises SnapdAPIError: If there is an error during the snap install.
+
+        :returns: If wait is True, will return ChangesResponse. Otherwise, will return AsyncResponse.
+        :rtype: AsyncResponse | ChangesResponse
+        """
+        if not filenames:
+            raise ValueError("At least one snap file must be provided")
+        request_data = {
+            "action": "install",
+            "classic": classic,
+            "dangerous": True,
+            "devmode": devmode,
+            "jailmode": jailmode,
+        }
+        raw_response = await self._sideload(
+            filenames,
+            request_data,
+            upload_progress=upload_progress,
+            chunk_size=chunk_size,
+            use_mmap=use_mmap,
+        )
+        response = self._client.parse_json(AsyncResponse, raw_response.content)
+        if wait:
+            return await self._client.wait_for_change(response.change, action="install")
+        return response
+
+    async def _multi_snap_action(
+        self, action: str, request_data: dict, wait: bool
+    ) -> AsyncResponse | ChangesResponse:
+        """POST a multi-snap action to /v2/snaps, creating a single change for all snaps."""
+        raw_response: httpx.Response = await self._request_change(
+            "POST", self.common_endpoint, json={"action": action, **request_data}
+        )
+        response = self._client.parse_json(AsyncResponse, raw_response.content)
         if wait:
-            changes_id = response.change
-            previous_changes = None
-            while True:
-                try:
-                    changes = await self._client.get_changes_by_id(changes_id)
-                    logger.debug("Progress: %s", changes.result.overall_progress)
-                except httpx.HTTPError:
-                    if going_to_reload_daemon(previous_changes):
-                        logger.debug("Waiting for daemon to reload")
-                        await asyncio.sleep(0.1)
-                        continue
-
-                if changes.ready:
-                    break
-                if changes.result.err:
-                    raise SnapdAPIError(f"Error in snap remove: {changes.result.err}")
-                await asyncio.sleep(0.1)
-                previous_changes = changes
-            return changes
+            return await self._client.wait_for_change(response.change, action=action)
         return response
 
+    async def install_snaps(
+        self,
+        snaps: list[str],
+        classic: bool = False,
+        transaction: str | None = None,
+        wait: bool = False,
+    ) -> AsyncResponse | ChangesResponse:
+        """
+        Install several snaps from the store in a single change.
+
+        snapd does not accept per-snap options (channel, revision, devmode, ...) for multi-snap operations.
+
+        :param snaps: Names of the snaps to install.
+        :type snaps: list[str]
+        :param classic: Install with classic confinement, defaults to False.
+        :type classic: bool, optional
+        :param transaction: "per-snap" or "all-snaps". With "all-snaps", a failure rolls back every snap. Defaults to snapd's default ("per-snap").
+        :type transaction: str, optional
+        :param wait: Whether to wait for the snaps to install. If not waiting, will return async response with change id, defaults to False.
+        :type wait: bool, optional
+
+        :raises ValueError: If no snaps are provided.
+        :raises SnapdAPIError: If there is an error during the install.
+
+        :returns: If wait is True, will return ChangesResponse. Otherwise, will return AsyncResponse.
+        :rtype: AsyncResponse | ChangesResponse
+        """
+        if not snaps:
+            raise ValueError("At least one snap must be provided")
+        request_data = {"snaps": list(snaps)}
+        if classic:
+            request_data["classic"] = classic
+        if transaction:
+            request_data["transaction"] = transaction
+        return await self._multi_snap_action("install", request_data, wait)
+
+    async def remove_snaps(
+        self,
+        snaps: list[str],
+        purge: bool = False,
+        wait: bool = False,
+    ) -> AsyncResponse | ChangesResponse:
+        """
+        Remove several snaps in a single change.
+
+        :param snaps: Names of the snaps to remove.
+        :type snaps: list[str]
+        :param purge: If True, purges the snaps without saving a snapshot. Defaults to False.
+        :type purge: bool, optional
+        :param wait: If True, waits for the removal to complete. Defaults to False.
+        :type wait: bool, optional
+
+        :raises ValueError: If no snaps are provided.
+        :raises SnapdAPIError: If there is an error during the removal.
+
+        :returns: If wait is True, will return ChangesResponse. Otherwise, will return AsyncResponse.
+        :rtype: AsyncResponse | ChangesResponse
+        """
+        if not snaps:
+            raise ValueError("At least one snap must be provided")
+        request_data = {"snaps": list(snaps)}
+        if purge:
+            request_data["purge"] = purge
+        return await self._multi_snap_action("remove", request_data, wait)
+
+    async def refresh_snaps(
+        self,
+        snaps: list[str] | None = None,
+        transaction: str | None = None,
+        wait: bool = False,
+    ) -> AsyncResponse | ChangesResponse:
+        """
+        Refresh several snaps in a single change.
+
+        :param snaps: Names of the snaps to refresh. If None or empty, all snaps with pending updates are refreshed.
+        :type snaps: list[str], optional
+        :param transaction: "per-snap" or "all-snaps". With "all-snaps", a failure rolls back every snap. Defaults to snapd's default ("per-snap").
+        :type transaction: str, optional
+        :param wait: Whether to wait for the refresh to complete. Defaults to False.
+        :type wait: bool, optional
+
+        :raises SnapdAPIError: If there is an error during the refresh.
+
+        :returns: If wait is True, will return ChangesResponse. Otherwise, will return AsyncResponse.
+        :rtype: AsyncResponse | ChangesResponse
+        """
+        request_data = {}
+        if snaps:
+            request_data["snaps"] = list(snaps)
+        if transaction:
+            request_data["transaction"] = transaction
+        return await self._multi_snap_action("refresh", request_data, wait)
+
     async def disable_snap(
         self,
         snap: str,
@@ -355,34 +646,13 @@ class SnapsEndpoints:
             "action": "disable",
         }
 
-        raw_response: httpx.Response = await self._client.request(
+        raw_response: httpx.Response = await self._request_change(
             "POST", f"{self.common_endpoint}/{snap}", json=request_data
         )
-        response = AsyncResponse.model_validate_json(raw_response.content)
+        response = self._client.parse_json(AsyncResponse, raw_response.content)
 
         if wait:
-            changes_id = response.change
-            previous_changes = None
-            while True:
-                try:
-                    changes = await self._client.get_changes_by_id(changes_id)
-                except httpx.HTTPError:
-                    if going_to_reload_daemon(previous_changes):
-                        logger.debug("Waiting for daemon to reload")
-                        await asyncio.sleep(0.1)
-                        continue
-                    raise
-                if changes.ready:
-                    break
-                if isinstance(changes.result, BaseErrorResult):
-                    raise SnapdAPIError(
-                        f"Error in snap disable: {changes.result.message}"
-                    )
-                if changes.result.err:
-                    raise SnapdAPIError(f"Error in snap disable: {changes.result.err}")
-                await asyncio.sleep(0.1)
-                previous_changes = changes
-            return changes
+            return await self._client.wait_for_change(response.change, action="disable")
 
         return response
 
@@ -408,34 +678,13 @@ class SnapsEndpoints:
             "action": "enable",
         }
 
-        raw_response: httpx.Response = await self._client.request(
+        raw_response: httpx.Response = await self._request_change(
             "POST", f"{self.common_endpoint}/{snap}", json=request_data
         )
-        response = AsyncResponse.model_validate_json(raw_response.content)
+        response = self._client.parse_json(AsyncResponse, raw_response.content)
 
         if wait:
-            changes_id = response.change
-            previous_changes = None
-            while True:
-                try:
-                    changes = await self._client.get_changes_by_id(changes_id)
-                except httpx.HTTPError:
-                    if going_to_reload_daemon(previous_changes):
-                        logger.debug("Waiting for daemon to reload")
-                        await asyncio.sleep(0.1)
-                        continue
-                    raise
-                if changes.ready:
-                    break
-                if isinstance(changes.result, BaseErrorResult):
-                    raise SnapdAPIError(
-                        f"Error in snap enable: {changes.result.message}"
-                    )
-                if changes.result.err:
-                    raise SnapdAPIError(f"Error in snap enable: {changes.result.err}")
-                await asyncio.sleep(0.1)
-                previous_changes = changes
-            return changes
+            return await self._client.wait_for_change(response.change, action="enable")
 
         return response
 
@@ -465,4 +714,4 @@ class SnapsEndpoints:
         )
         if response.status_code != 200:
             raise SnapdAPIError(f"Failed to retrieve apps for snap: {snap}")
-        return AppsResponse.model_validate_json(response.content)
+        return self._client.parse_json(AppsResponse, response.content)
@@ -1,11 +1,17 @@
-import functools
+import asyncio
+import logging
+import math
 import uuid
-from typing import Optional
+from collections import deque
+from typing import Any, AsyncIterator, Awaitable, Optional, Type
 
-import retry
-from httpx import AsyncClient, Response
+from httpx import AsyncClient, HTTPError, Limits, Response, Timeout
 
+from snap_python.cache import SingleFlight, TTLCache
+from snap_python.instrumentation import NO_INSTRUMENTATION, Instrumentation, ModelT
+from snap_python.retry_policy import RetryPolicy
 from snap_python.schemas.common import VALID_SNAP_ARCHITECTURES
+from snap_python.schemas.snaps import InstalledSnap, InstalledSnapListResponse
 from snap_python.schemas.store.categories import (
     VALID_CATEGORY_FIELDS,
     CategoryResponse,
@@ -13,14 +19,19 @@ from snap_python.schemas.store.categories import (
 )
 from snap_python.schemas.store.info import (
     VALID_SNAP_INFO_FIELDS,
+    ErrorListItem,
     InfoResponse,
 )
 from snap_python.schemas.store.refresh import (
     VALID_SNAP_REFRESH_FIELDS,
+    RefreshCandidate,
+    RefreshPlan,
     RefreshRevisionResponse,
 )
 from snap_python.schemas.store.search import (
     VALID_SEARCH_CATEGORY_FIELDS,
+    ArchCatalog,
+    ArchSearchItem,
     ArchSearchResponse,
     PaginatedSnapSearchResponse,
     SearchResponse,
@@ -29,6 +40,20 @@ from snap_python.schemas.store.track import (
     TrackRiskMap,
     channel_map_to_current_track_map,
 )
+from snap_python.streaming import iter_json_array_items
+from snap_python.trusted import as_model, trusted_parsing_enabled
+
+logger = logging.getLogger("snap_python.components.store")
+
+DEFAULT_STORE_TIMEOUT = Timeout(5.0)
+# snap-id -> name mappings practically never change
+SNAP_ID_CACHE_TTL = 24 * 60 * 60
+REFRESH_CONTEXT_CACHE_TTL = 5 * 60
+# revisions requested per refresh call by get_many_snap_revision_info
+REFRESH_BATCH_SIZE = 100
+DEFAULT_STORE_LIMITS = Limits(
+    max_connections=100, max_keepalive_connections=20, keepalive_expiry=30.0
+)
 
 
 class StoreEndpoints:
@@ -40,16 +65,123 @@ class StoreEndpoints:
     """
 
     def __init__(
-        self, base_url: str, version: str, headers: dict[str, str] = None
+        self,
+        base_url: str,
+        version: str,
+        headers: dict[str, str] = None,
+        retry_policy: RetryPolicy | None = None,
+        client: AsyncClient | None = None,
+        limits: Limits | None = None,
+        timeout: Timeout | float = DEFAULT_STORE_TIMEOUT,
+        http2: bool = False,
+        info_cache_ttl: float | None = None,
+        cache_maxsize: int = 1024,
+        instrumentation: Instrumentation | None = None,
+        trusted_parsing: bool = False,
     ) -> None:
-        self.store_client = AsyncClient()
-        self.store_client.request = functools.partial(
-            self.store_client.request, timeout=5
-        )
+        """
+        :param base_url: The base URL of the store, e.g. https://api.snapcraft.io
+        :type base_url: str
+        :param version: The store API version, e.g. v2
+        :type version: str
+        :param headers: Headers to send with every store request.
+        :type headers: dict[str, str], optional
+        :param retry_policy: Policy used to retry transient store failures.
+        :type retry_policy: RetryPolicy, optional
+        :param client: A shared ``httpx.AsyncClient`` to use instead of creating one. The client is
+            not modified and ``limits``, ``timeout`` and ``http2`` are ignored; ``headers`` are sent per request.
+        :type client: httpx.AsyncClient, optional
+        :param limits: Connection pool limits for the store client.
+        :type limits: httpx.Limits, optional
+        :param timeout: Default timeout for store requests (connect/read/write/pool).
+        :type timeout: httpx.Timeout | float, optional
+        :param http2: Enable HTTP/2 for the store client. Requires ``httpx[http2]`` to be installed.
+        :type http2: bool, optional
+        :param info_cache_ttl: If set, cache ``get_snap_info`` responses (per snap and field set) for this many seconds.
+            Snap name and snap-id lookups are always memoised.
+        :type info_cache_ttl: float, optional
+        :param cache_maxsize: Maximum number of entries kept in each cache.
+        :type cache_maxsize: int, optional
+        :param instrumentation: Receives metrics about every store request. Time to first byte is
+            only measured when the store client is created here.
+        :type instrumentation: Instrumentation, optional
+        :param trusted_parsing: Return lazily validated views of responses instead of fully
+            validated models. See :func:`snap_python.trusted.view_json`.
+        :type trusted_parsing: bool, optional
+        """
+        self.trusted_parsing = trusted_parsing
+        self.instrumentation = instrumentation or NO_INSTRUMENTATION
+        self._owns_client = client is None
+        if client is None:
+            self.store_client = AsyncClient(
+                headers=headers,
+                limits=limits or DEFAULT_STORE_LIMITS,
+                timeout=timeout,
+                http2=http2,
+                event_hooks=self.instrumentation.event_hooks(),
+            )
+            self._headers: dict[str, str] = {}
+        else:
+            self.store_client = client
+            self._headers = dict(headers or {})
         self.base_url = f"{base_url}/{version}"
         self._raw_base_url = base_url
-        if headers is not None:
-            self.store_client.headers.update(headers)
+        self.retry_policy = retry_policy or RetryPolicy()
+        self._snap_names: TTLCache[str, str] = TTLCache(
+            SNAP_ID_CACHE_TTL, maxsize=cache_maxsize
+        )
+        self._info_cache: TTLCache[tuple, InfoResponse] | None = None
+        if info_cache_ttl:
+            self._info_cache = TTLCache(info_cache_ttl, maxsize=cache_maxsize)
+        self._refresh_contexts: TTLCache[str, dict] = TTLCache(
+            REFRESH_CONTEXT_CACHE_TTL, maxsize=cache_maxsize
+        )
+        self._single_flight: SingleFlight[tuple, object] = SingleFlight()
+
+    def clear_cache(self) -> None:
+        """Drop all cached snap information and snap-id lookups."""
+        self._snap_names.clear()
+        self._refresh_contexts.clear()
+        if self._info_cache is not None:
+            self._info_cache.clear()
+
+    def _merge_headers(self, kwargs: dict) -> dict:
+        if self._headers:
+            kwargs["headers"] = {**self._headers, **(kwargs.get("headers") or {})}
+        return kwargs
+
+    async def _get(self, url: str, **kwargs) -> Response:
+        """GET ``url`` with the store client, retrying transient failures."""
+        async with self.instrumentation.trace("store", "GET", url) as trace:
+            trace.response = await self.retry_policy.call(
+                self.store_client.get, url, **self._merge_headers(kwargs)
+            )
+        return trace.response
+
+    async def _post(self, url: str, **kwargs) -> Response:
+        """POST to ``url`` with the store client, retrying transient failures."""
+        async with self.instrumentation.trace("store", "POST", url) as trace:
+            trace.response = await self.retry_policy.call(
+                self.store_client.post, url, **self._merge_headers(kwargs)
+            )
+        return trace.response
+
+    def parse_json(self, model: Type[ModelT], data: bytes | str) -> ModelT:
+        """Validate a store response into ``model``, or view it lazily in trusted mode."""
+        return self.instrumentation.validate_json(
+            model, data, trusted=self.trusted_parsing or trusted_parsing_enabled()
+        )
+
+    def parse(self, model: Type[ModelT], data: Any) -> ModelT:
+        """Validate decoded store data into ``model``, or view it lazily in trusted mode."""
+        return self.instrumentation.validate(
+            model, data, trusted=self.trusted_parsing or trusted_parsing_enabled()
+        )
+
+    async def aclose(self) -> None:
+        """Close the store client, unless it was provided by the caller."""
+        if self._owns_client:
+            await self.store_client.aclose()
 
     async def get_snap_details(self, snap_name: str, fields: list[str] | None = None):
         """
@@ -73,19 +205,38 @@ class StoreEndpoints:
                 )
             query["fields"] = ",".join(fields)
         route = f"/api/v1/snaps/details/{snap_name}"
-        response = await self.store_client.get(
-            f"{self._raw_base_url}{route}", params=query
-        )
+        response = await self._get(f"{self._raw_base_url}{route}", params=query)
         response.raise_for_status()
         return response.json()
 
     async def get_snap_name_from_snap_id(self, snap_id: str) -> str | None:
-        response = await self.store_client.get(
-            f"https://api.snapcraft.io/v2/assertions/snap-declaration/16/{snap_id}"
-        )
-        response.raise_for_status()
-        response_json = response.json()
-        return response_json.get("headers", {}).get("snap-name", None)
+        """
+        Resolve a snap-id to the snap name, using the snap-declaration assertion.
+
+        Results are memoised, and concurrent lookups of the same snap-id share one request.
+
+        :param snap_id: The snap-id.
+        :type snap_id: str
+
+        :returns: The snap name, or None if the assertion has no name.
+        :rtype: str | None
+        """
+        snap_name = self._snap_names.get(snap_id)
+        if snap_name is not None:
+            return snap_name
+
+        async def fetch() -> str | None:
+            response = await self._get(
+                f"https://api.snapcraft.io/v2/assertions/snap-declaration/16/{snap_id}"
+            )
+            response.raise_for_status()
+            response_json = response.json()
+            return response_json.get("headers", {}).get("snap-name", None)
+
+        snap_name = await self._single_flight.do(("snap-id", snap_id), fetch)
+        if snap_name is not None:
+            self._snap_names.set(snap_id, snap_name)
+        return snap_name
 
     async def get_snap_info(
         self,
@@ -122,12 +273,23 @@ class StoreEndpoints:
                     f"Invalid fields. Allowed fields: {VALID_SNAP_INFO_FIELDS}"
                 )
             query["fields"] = ",".join(fields)
-        route = f"/v2/snaps/info/{snap_name}"
-        response = await self.store_client.get(
-            f"{self._raw_base_url}{route}", params=query
-        )
-        response.raise_for_status()
-        return InfoResponse.model_validate_json(response.content)
+        cache_key = ("info", snap_name, query.get("fields"))
+        if self._info_cache is not None:
+            cached = self._info_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        async def fetch() -> InfoResponse:
+            route = f"/v2/snaps/info/{snap_name}"
+            response = await self._get(f"{self._raw_base_url}{route}", params=query)
+            response.raise_for_status()
+            return self.parse_json(InfoResponse, response.content)
+
+        info = await self._single_flight.do(cache_key, fetch)
+        self._snap_names.set(info.snap_id, info.name)
+        if self._info_cache is not None:
+            self._info_cache.set(cache_key, info)
+        return info
 
     async def get_categories(
         self, type: str | None = None, fields: list[str] | None = None
@@ -155,9 +317,9 @@ class StoreEndpoints:
         if type is not None:
             query["type"] = type
         route = "/snaps/categories"
-        response = await self.store_client.get(f"{self.base_url}{route}", params=query)
+        response = await self._get(f"{self.base_url}{route}", params=query)
         response.raise_for_status()
-        return CategoryResponse.model_validate_json(response.content)
+        return self.parse_json(CategoryResponse, response.content)
 
     async def get_category_by_name(
         self, name: str, fields: list[str] | None = None
@@ -184,9 +346,9 @@ class StoreEndpoints:
             query["fields"] = ",".join(fields)
 
         route = f"/snaps/category/{name}"
-        response = await self.store_client.get(f"{self.base_url}{route}", params=query)
+        response = await self._get(f"{self.base_url}{route}", params=query)
         response.raise_for_status()
-        return SingleCategoryResponse.model_validate_json(response.content)
+        return self.parse_json(SingleCategoryResponse, response.content)
 
     async def find(
         self,
@@ -270,16 +432,18 @@ class StoreEndpoints:
             if key in query_dict:
                 query_dict[key] = str(query_dict[key]).lower()
 
-        response = await self.store_client.get(
+        response = await self._get(
             f"{self.base_url}{route}", params=query_dict, headers=extra_headers
         )
         response.raise_for_status()
-        return SearchResponse.model_validate_json(response.content)
+        return self.parse_json(SearchResponse, response.content)
 
-    @retry.retry(Exception, tries=3, delay=2, backoff=2)
     async def retry_get_snap_info(self, snap_name: str, fields: list[str]):
         """
-        Retry getting snap information.
+        Get snap information, retrying transient failures.
+
+        Kept for compatibility: :meth:`get_snap_info` already retries according to
+        ``self.retry_policy``.
 
         :param snap_name: The name of the snap.
         :type snap_name: str
@@ -326,14 +490,80 @@ class StoreEndpoints:
         route = "/api/v1/snaps/names"
         extra_headers = {"X-Ubuntu-Architecture": arch}
 
-        response = await self.store_client.get(
+        response = await self._get(
             f"{self._raw_base_url}{route}", headers=extra_headers, timeout=60
         )
         response.raise_for_status()
 
         response_json = response.json()
         response_json["arch"] = arch
-        return ArchSearchResponse.model_validate(response_json)
+        return self.parse(ArchSearchResponse, response_json)
+
+    async def get_all_snaps_for_arches(
+        self, arches: list[str] | None = None
+    ) -> ArchCatalog:
+        """
+        Get all snaps for several architectures, merged into one catalog.
+
+        The per-architecture listings are fetched concurrently.
+
+        :param arches: The architectures to fetch. Defaults to all valid architectures.
+        :type arches: list[str], optional
+
+        :returns: The merged catalog, which answers "which architectures ship this snap" in O(1).
+        :rtype: ArchCatalog
+
+        :raises ValueError: If invalid architecture is provided.
+        """
+        if arches is None:
+            arches = VALID_SNAP_ARCHITECTURES
+        for arch in arches:
+            if arch not in VALID_SNAP_ARCHITECTURES:
+                raise ValueError(f"Invalid architecture: {arch}")
+
+        responses = await asyncio.gather(
+            *(self.get_all_snaps_for_arch(arch) for arch in arches)
+        )
+        return ArchCatalog.from_responses(responses)
+
+    async def stream_all_snaps_for_arch(
+        self, arch: str, chunk_size: int = 64 * 1024
+    ) -> AsyncIterator[ArchSearchItem]:
+        """
+        Stream all snaps for a given architecture.
+
+        Unlike :meth:`get_all_snaps_for_arch`, the response body is parsed as it arrives and
+        each item is yielded as soon as it is complete, so memory use stays flat and callers
+        can start processing before the (multi-megabyte) body has finished downloading.
+
+        The request is not retried, since items may already have been handed to the caller.
+
+        :param arch: The architecture.
+        :type arch: str
+        :param chunk_size: Size of the chunks read from the network.
+        :type chunk_size: int
+
+        :returns: An async iterator over the snaps available for ``arch``.
+        :rtype: AsyncIterator[ArchSearchItem]
+
+        :raises ValueError: If invalid architecture is provided.
+        :raises StreamingJSONError: If the response does not contain the list of snaps.
+        """
+        if arch not in VALID_SNAP_ARCHITECTURES:
+            raise ValueError(f"Invalid architecture: {arch}")
+
+        route = "/api/v1/snaps/names"
+        kwargs = self._merge_headers(
+            {"headers": {"X-Ubuntu-Architecture": arch}, "timeout": 60}
+        )
+        async with self.store_client.stream(
+            "GET", f"{self._raw_base_url}{route}", **kwargs
+        ) as response:
+            response.raise_for_status()
+            async for item in iter_json_array_items(
+                response.aiter_bytes(chunk_size), "clickindex:package"
+            ):
+                yield self.parse(ArchSearchItem, item)
 
     async def snap_refresh(
         self, snap_name: str, payload: dict, extra_headers: dict = None
@@ -349,7 +579,7 @@ class StoreEndpoints:
         if extra_headers is None:
             extra_headers = {}
         query = {}
-        response = await self.store_client.post(
+        response = await self._post(
             f"{self.base_url}{route}", json=payload, headers=extra_headers, params=query
         )
 
@@ -358,8 +588,42 @@ class StoreEndpoints:
             pass
         return response
 
+    @staticmethod
+    def _refresh_headers(
+        arch: str, accept_delta_formats: list[str] | None = None
+    ) -> dict[str, str]:
+        headers = {"Snap-Device-Architecture": arch}
+        if accept_delta_formats:
+            headers["Snap-Accept-Delta-Format"] = ",".join(accept_delta_formats)
+        return headers
+
+    async def _get_refresh_context(self, snap_name: str) -> dict:
+        """Build the "context" entry the refresh endpoint needs to look up revisions of a snap.
+
+        Only the snap-id and any released revision are needed, so the result is memoised.
+        """
+        context = self._refresh_contexts.get(snap_name)
+        if context is not None:
+            return context
+
+        snap_info = await self.get_snap_info(snap_name=snap_name, fields=["revision"])
+        # I don't think this matters for the "context" field, so using info from the first available
+        channel_map_item = snap_info.channel_map[0]
+        context = {
+            "tracking-channel": "stable",
+            "snap-id": snap_info.snap_id,
+            "revision": channel_map_item.revision,
+        }
+        self._refresh_contexts.set(snap_name, context)
+        return context
+
     async def get_snap_revision_info(
-        self, snap_name: str, revision: int, arch: str, fields=None
+        self,
+        snap_name: str,
+        revision: int,
+        arch: str,
+        fields=None,
+        accept_delta_formats: list[str] | None = None,
     ) -> RefreshRevisionResponse:
         """Get information about a snap revision.
 
@@ -369,6 +633,8 @@ class StoreEndpoints:
         :type revision: int
         :param arch: The architecture of the snap to retrieve details about (e.g. amd64, arm64, riscv64, etc).
         :type arch: str
+        :param accept_delta_formats: Delta formats the caller can apply (e.g. ["xdelta3"]). When set, the store may list deltas in the download information.
+        :type accept_delta_formats: list[str], optional
 
         :returns: The snap revision information.
         :rtype: RefreshRevisionResponse
@@ -376,21 +642,11 @@ class StoreEndpoints:
 
         # cast revision to int
         revision = int(revision)
-        extra_headers = {"Snap-Device-Architecture": arch}
-        snap_info = await self.get_snap_info(snap_name=snap_name)
-
-        # I don't think this matters for the "context" field, so using info from the first available
-        channel_map_item = snap_info.channel_map[0]
+        extra_headers = self._refresh_headers(arch, accept_delta_formats)
+        context = await self._get_refresh_context(snap_name)
 
         payload = {
-            "context": [
-                {
-                    "tracking-channel": "stable",
-                    "snap-id": snap_info.snap_id,
-                    "revision": channel_map_item.revision,
-                    "instance-key": str(uuid.uuid4()),
-                }
-            ],
+            "context": [{**context, "instance-key": str(uuid.uuid4())}],
             "actions": [
                 {
                     "action": "download",
@@ -414,47 +670,21 @@ class StoreEndpoints:
             extra_headers=extra_headers,
         )
         response.raise_for_status()
-        return RefreshRevisionResponse.model_validate_json(response.content)
+        return self.parse_json(RefreshRevisionResponse, response.content)
 
-    async def get_many_snap_revision_info(
+    async def _get_revision_range_info(
         self,
         snap_name: str,
         from_revision: int,
         to_revision: int,
-        arch: str,
-        fields=None,
+        extra_headers: dict[str, str],
+        fields: list[str] | None,
     ) -> RefreshRevisionResponse:
-        """Get information about a snap revision.
-
-        :param snap_name: The name of the snap.
-        :type snap_name: str
-        :param revision: The revision of the snap.
-        :type revision: int
-        :param arch: The architecture of the snap to retrieve details about (e.g. amd64, arm64, riscv64, etc).
-        :type arch: str
-
-        :returns: The snap revision information.
-        :rtype: RefreshRevisionResponse
-        """
-
-        # cast revision to int
-        from_revision = int(from_revision)
-        to_revision = int(to_revision)
-        extra_headers = {"Snap-Device-Architecture": arch}
-        snap_info = await self.get_snap_info(snap_name=snap_name)
-
-        # I don't think this matters for the "context" field, so using info from the first available
-        channel_map_item = snap_info.channel_map[0]
+        """Request every revision from ``from_revision`` to ``to_revision`` in one refresh call."""
+        context = await self._get_refresh_context(snap_name)
 
         payload = {
-            "context": [
-                {
-                    "tracking-channel": "stable",
-                    "snap-id": snap_info.snap_id,
-                    "revision": channel_map_item.revision,
-                    "instance-key": str(uuid.uuid4()),
-                }
-            ],
+            "context": [{**context, "instance-key": str(uuid.uuid4())}],
             "actions": [],
         }
         for revision in range(from_revision, to_revision + 1):
@@ -466,12 +696,6 @@ class StoreEndpoints:
                     "instance-key": str(uuid.uuid4()),
                 }
             )
-
-        if fields is not None:
-            if not all(field in VALID_SNAP_REFRESH_FIELDS for field in fields):
-                raise ValueError(
-                    f"Invalid fields. Allowed fields: {VALID_SNAP_REFRESH_FIELDS}"
-                )
         payload["fields"] = fields
 
         response = await self.snap_refresh(
@@ -480,7 +704,332 @@ class StoreEndpoints:
             extra_headers=extra_headers,
         )
         response.raise_for_status()
-        return RefreshRevisionResponse.model_validate_json(response.content)
+        return self.parse_json(RefreshRevisionResponse, response.content)
+
+    async def _iter_revision_chunks(
+        self,
+        snap_name: str,
+        from_revision: int,
+        to_revision: int,
+        arch: str,
+        fields: list[str] | None,
+        accept_delta_formats: list[str] | None,
+        batch_size: int,
+        max_concurrency: int,
+    ) -> AsyncIterator[tuple[int, RefreshRevisionResponse]]:
+        """Yield ``(chunk index, response)`` pairs in the order the chunks complete.
+
+        A chunk that fails is reported as a response with an empty ``results`` list and the
+        failure in ``error_list``, so one bad chunk does not lose the others.
+        """
+        if fields is not None:
+            if not all(field in VALID_SNAP_REFRESH_FIELDS for field in fields):
+                raise ValueError(
+                    f"Invalid fields. Allowed fields: {VALID_SNAP_REFRESH_FIELDS}"
+                )
+        if batch_size < 1 or max_concurrency < 1:
+            raise ValueError("batch_size and max_concurrency must be at least 1")
+
+        # cast revision to int
+        from_revision = int(from_revision)
+        to_revision = int(to_revision)
+        extra_headers = self._refresh_headers(arch, accept_delta_formats)
+        # resolve the context once instead of in every chunk
+        await self._get_refresh_context(snap_name)
+
+        limit = asyncio.Semaphore(max_concurrency)
+
+        async def fetch_chunk(
+            index: int, chunk_start: int, chunk_end: int
+        ) -> tuple[int, RefreshRevisionResponse]:
+            async with limit:
+                try:
+                    response = await self._get_revision_range_info(
+                        snap_name, chunk_start, chunk_end, extra_headers, fields
+                    )
+                except HTTPError as e:
+                    logger.warning(
+                        "Failed to get revisions %d-%d of %s: %s",
+                        chunk_start,
+                        chunk_end,
+                        snap_name,
+                        e,
+                    )
+                    response = RefreshRevisionResponse(
+                        error_list=[
+                            ErrorListItem(
+                                code="revision-range-failed",
+                                message=f"revisions {chunk_start}-{chunk_end}: {e}",
+                            )
+                        ],
+                        results=[],
+                    )
+            return index, response
+
+        tasks = [
+            asyncio.create_task(
+                fetch_chunk(
+                    index, chunk_start, min(chunk_start + batch_size - 1, to_revision)
+                )
+            )
+            for index, chunk_start in enumerate(
+                range(from_revision, to_revision + 1, batch_size)
+            )
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def iter_many_snap_revision_info(
+        self,
+        snap_name: str,
+        from_revision: int,
+        to_revision: int,
+        arch: str,
+        fields=None,
+        accept_delta_formats: list[str] | None = None,
+        batch_size: int = REFRESH_BATCH_SIZE,
+        max_concurrency: int = 4,
+    ) -> AsyncIterator[RefreshRevisionResponse]:
+        """Get information about a range of snap revisions, one chunk at a time.
+
+        The range is split into chunks of ``batch_size`` revisions, which are requested with up
+        to ``max_concurrency`` requests in flight. Each chunk's response is yielded as soon as
+        it arrives, so chunks may come out of order. A chunk that fails after retries is
+        yielded with no results and the failure in ``error_list``.
+
+        :param snap_name: The name of the snap.
+        :type snap_name: str
+        :param from_revision: The first revision of the range.
+        :type from_revision: int
+        :param to_revision: The last revision of the range (inclusive).
+        :type to_revision: int
+        :param arch: The architecture of the snap to retrieve details about (e.g. amd64, arm64, riscv64, etc).
+        :type arch: str
+        :param accept_delta_formats: Delta formats the caller can apply (e.g. ["xdelta3"]).
+        :type accept_delta_formats: list[str], optional
+        :param batch_size: Maximum number of revisions per store request.
+        :type batch_size: int
+        :param max_concurrency: Maximum number of store requests in flight.
+        :type max_concurrency: int
+
+        :returns: An async iterator over the per-chunk responses.
+        :rtype: AsyncIterator[RefreshRevisionResponse]
+        """
+        async for _, response in self._iter_revision_chunks(
+            snap_name,
+            from_revision,
+            to_revision,
+            arch,
+            fields,
+            accept_delta_formats,
+            batch_size,
+            max_concurrency,
+        ):
+            yield response
+
+    async def get_many_snap_revision_info(
+        self,
+        snap_name: str,
+        from_revision: int,
+        to_revision: int,
+        arch: str,
+        fields=None,
+        accept_delta_formats: list[str] | None = None,
+        batch_size: int = REFRESH_BATCH_SIZE,
+        max_concurrency: int = 4,
+    ) -> RefreshRevisionResponse:
+        """Get information about a range of snap revisions.
+
+        Large ranges are split into chunks of ``batch_size`` revisions that are requested
+        concurrently (see :meth:`iter_many_snap_revision_info`), then merged back in revision
+        order. The ``error_list`` of the merged response collects the errors of every chunk,
+        including chunks that failed entirely.
+
+        :param snap_name: The name of the snap.
+        :type snap_name: str
+        :param from_revision: The first revision of the range.
+        :type from_revision: int
+        :param to_revision: The last revision of the range (inclusive).
+        :type to_revision: int
+        :param arch: The architecture of the snap to retrieve details about (e.g. amd64, arm64, riscv64, etc).
+        :type arch: str
+        :param accept_delta_formats: Delta formats the caller can apply (e.g. ["xdelta3"]). When set, the store may list deltas in the download information.
+        :type accept_delta_formats: list[str], optional
+        :param batch_size: Maximum number of revisions per store request.
+        :type batch_size: int
+        :param max_concurrency: Maximum number of store requests in flight.
+        :type max_concurrency: int
+
+        :returns: The snap revision information.
+        :rtype: RefreshRevisionResponse
+        """
+        chunks: dict[int, RefreshRevisionResponse] = {}
+        async for index, response in self._iter_revision_chunks(
+            snap_name,
+            from_revision,
+            to_revision,
+            arch,
+            fields,
+            accept_delta_formats,
+            batch_size,
+            max_concurrency,
+        ):
+            chunks[index] = response
+
+        results = []
+        error_list = []
+        for index in sorted(chunks):
+            # trusted parsing yields views, which the combined response cannot hold
+            results.extend(as_model(result) for result in chunks[index].results)
+            error_list.extend(
+                as_model(error) for error in chunks[index].error_list or []
+            )
+        return RefreshRevisionResponse(error_list=error_list or None, results=results)
+
+    async def plan_refreshes(
+        self,
+        installed: InstalledSnapListResponse,
+        arch: str,
+        fields: list[str] | None = None,
+        batch_size: int = REFRESH_BATCH_SIZE,
+        max_concurrency: int = 4,
+    ) -> RefreshPlan:
+        """Find out which installed snaps have a new revision available.
+
+        The installed snaps are sent to the store's refresh endpoint as the device "context",
+        with one "refresh" action per snap, the same way snapd asks for updates. Hosts with
+        many snaps are split into batches of ``batch_size`` snaps, requested concurrently.
+
+        Snaps without a snap-id or with a non-numeric revision (e.g. sideloaded "x1"
+        revisions) cannot be refreshed from the store and are listed in ``skipped``.
+
+        :param installed: The installed snaps, as returned by ``SnapsEndpoints.list_installed_snaps``.
+        :type installed: InstalledSnapListResponse
+        :param arch: The architecture of the device (e.g. amd64, arm64, riscv64, etc).
+        :type arch: str
+        :param fields: The fields to request for the available revisions. Defaults to revision, version and download.
+        :type fields: list[str], optional
+        :param batch_size: Maximum number of snaps per store request.
+        :type batch_size: int
+        :param max_concurrency: Maximum number of store requests in flight.
+        :type max_concurrency: int
+
+        :returns: The refresh candidates, the up-to-date snaps and any errors.
+        :rtype: RefreshPlan
+
+        :raises ValueError: If invalid fields are provided.
+        """
+        if fields is None:
+            fields = ["revision", "version", "download"]
+        if not all(field in VALID_SNAP_REFRESH_FIELDS for field in fields):
+            raise ValueError(
+                f"Invalid fields. Allowed fields: {VALID_SNAP_REFRESH_FIELDS}"
+            )
+        if batch_size < 1 or max_concurrency < 1:
+            raise ValueError("batch_size and max_concurrency must be at least 1")
+
+        plan = RefreshPlan()
+        refreshable: dict[str, InstalledSnap] = {}
+        for snap in installed.result:
+            if not snap.id or not str(snap.revision).isdigit():
+                plan.skipped.append(snap.name)
+                continue
+            refreshable[snap.name] = snap
+
+        def tracking_channel(snap: InstalledSnap) -> str:
+            return snap.tracking_channel or snap.channel or "latest/stable"
+
+        def context_entry(snap: InstalledSnap) -> dict:
+            return {
+                "snap-id": snap.id,
+                "instance-key": snap.name,
+                "revision": int(snap.revision),
+                "tracking-channel": tracking_channel(snap),
+            }
+
+        extra_headers = self._refresh_headers(arch)
+        limit = asyncio.Semaphore(max_concurrency)
+        # snaps whose batch failed: neither candidates nor known to be up to date
+        failed: set[str] = set()
+
+        async def refresh_batch(batch: list[InstalledSnap]) -> RefreshRevisionResponse:
+            payload = {
+                "context": [context_entry(snap) for snap in batch],
+                "actions": [
+                    {"action": "refresh", "instance-key": snap.name, "snap-id": snap.id}
+                    for snap in batch
+                ],
+                "fields": fields,
+            }
+            async with limit:
+                try:
+                    response = await self.snap_refresh(
+                        snap_name=batch[0].name,
+                        payload=payload,
+                        extra_headers=extra_headers,
+                    )
+                    response.raise_for_status()
+                except HTTPError as e:
+                    failed.update(snap.name for snap in batch)
+                    names = ", ".join(snap.name for snap in batch)
+                    return RefreshRevisionResponse(
+                        error_list=[
+                            ErrorListItem(
+                                code="refresh-batch-failed",
+                                message=f"{names}: {e}",
+                            )
+                        ],
+                        results=[],
+                    )
+            return self.parse_json(RefreshRevisionResponse, response.content)
+
+        snaps = list(refreshable.values())
+        responses = await asyncio.gather(
+            *(
+                refresh_batch(snaps[start : start + batch_size])
+                for start in range(0, len(snaps), batch_size)
+            )
+        )
+
+        for response in responses:
+            plan.error_list.extend(
+                as_model(error) for error in response.error_list or []
+            )
+            for result in response.results:
+                installed_snap = refreshable.get(result.instance_key)
+                if installed_snap is None:
+                    continue
+                if result.is_error:
+                    plan.errors[installed_snap.name] = as_model(result.error)
+                    continue
+                if result.snap is None or result.snap.revision in (
+                    None,
+                    int(installed_snap.revision),
+                ):
+                    continue
+                plan.candidates.append(
+                    RefreshCandidate(
+                        name=installed_snap.name,
+                        snap_id=installed_snap.id,
+                        tracking_channel=tracking_channel(installed_snap),
+                        installed_revision=int(installed_snap.revision),
+                        installed_version=installed_snap.version,
+                        revision=result.snap.revision,
+                        version=result.snap.version,
+                        download=as_model(result.snap.download),
+                    )
+                )
+
+        # the store only answers for snaps that have an update (or an error)
+        settled = {candidate.name for candidate in plan.candidates}
+        settled.update(plan.errors, failed)
+        plan.up_to_date = [name for name in refreshable if name not in settled]
+        return plan
 
     async def get_snap_search_paginated(
         self,
@@ -501,7 +1050,7 @@ class StoreEndpoints:
         if q:
             payload["q"] = q
 
-        response = await self.store_client.get(
+        response = await self._get(
             f"{self._raw_base_url}/api/v1/snaps/search",
             params=payload,
         )
@@ -511,7 +1060,70 @@ class StoreEndpoints:
         response_json["page"] = page
         response_json["limit"] = limit
 
-        return PaginatedSnapSearchResponse.model_validate(response_json)
+        return self.parse(PaginatedSnapSearchResponse, response_json)
+
+    async def iter_snap_search(
+        self,
+        q: str = "",
+        scope: str = "wide",
+        arch: str = "wide",
+        limit: int = 100,
+        confinement: str = "strict,classic",
+        prefetch: int = 4,
+    ) -> AsyncIterator[ArchSearchItem]:
+        """Iterate over every search result, fetching pages concurrently.
+
+        The first page gives the total number of results. After that, up to ``prefetch``
+        following pages are requested concurrently while earlier pages are consumed.
+        Items are yielded in page order. New pages are only requested as the caller consumes
+        items, so a slow consumer does not cause unbounded buffering.
+
+        :param q: The search query. An empty query lists every snap.
+        :type q: str
+        :param limit: Number of results per page, at most 100.
+        :type limit: int
+        :param prefetch: Maximum number of pages requested ahead of the consumer.
+        :type prefetch: int
+
+        :returns: An async iterator over the search results.
+        :rtype: AsyncIterator[ArchSearchItem]
+        """
+        if prefetch < 1:
+            raise ValueError("prefetch must be at least 1")
+
+        def fetch_page(page: int) -> Awaitable[PaginatedSnapSearchResponse]:
+            return self.get_snap_search_paginated(
+                q=q,
+                scope=scope,
+                arch=arch,
+                page=page,
+                limit=limit,
+                confinement=confinement,
+            )
+
+        first_page = await fetch_page(1)
+        for item in first_page.results:
+            yield item
+
+        last_page = math.ceil(first_page.total / limit)
+        next_page = 2
+        pending: deque[asyncio.Task] = deque()
+        try:
+            while next_page <= last_page or pending:
+                while next_page <= last_page and len(pending) < prefetch:
+                    pending.append(asyncio.create_task(fetch_page(next_page)))
+                    next_page += 1
+
+                page = await pending.popleft()
+                if not page.results:
+                    # the store reported more results than it serves
+                    break
+                for item in page.results:
+                    yield item
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
 
     async def get_track_risk_map(
         self, snap_name: str
@@ -0,0 +1,74 @@
+import asyncio
+import logging
+import pathlib
+import shutil
+
+logger = logging.getLogger("snap_python.delta")
+
+XDELTA3_FORMAT = "xdelta3"
+SUPPORTED_DELTA_FORMATS = [XDELTA3_FORMAT]
+
+
+class DeltaApplyError(Exception):
+    """Raised when a snap delta cannot be applied."""
+
+
+def find_xdelta3() -> str | None:
+    """Return the path of the ``xdelta3`` binary, or None if it is not installed."""
+    return shutil.which("xdelta3")
+
+
+def delta_formats_available() -> list[str]:
+    """Return the delta formats that can be applied on this machine.
+
+    Suitable for the ``Snap-Accept-Delta-Format`` header of store refresh requests.
+    """
+    return [XDELTA3_FORMAT] if find_xdelta3() is not None else []
+
+
+async def apply_delta(
+    delta_format: str,
+    source_path: pathlib.Path,
+    delta_path: pathlib.Path,
+    target_path: pathlib.Path,
+) -> None:
+    """Rebuild a snap from a locally held source revision and a delta.
+
+    The delta is applied by the ``xdelta3`` binary in a subprocess, so the event loop is not
+    blocked while the (potentially large) target file is written.
+
+    :param delta_format: Format of the delta, as reported by the store (e.g. "xdelta3").
+    :type delta_format: str
+    :param source_path: Path of the snap file the delta was computed from.
+    :type source_path: pathlib.Path
+    :param delta_path: Path of the downloaded delta.
+    :type delta_path: pathlib.Path
+    :param target_path: Path the rebuilt snap file is written to.
+    :type target_path: pathlib.Path
+
+    :raises DeltaApplyError: If the format is unsupported, ``xdelta3`` is missing or it fails.
+    """
+    if delta_format != XDELTA3_FORMAT:
+        raise DeltaApplyError(f"Unsupported delta format: {delta_format}")
+
+    xdelta3 = find_xdelta3()
+    if xdelta3 is None:
+        raise DeltaApplyError("xdelta3 is not installed")
+
+    process = await asyncio.create_subprocess_exec(
+        xdelta3,
+        "-d",
+        "-f",
+        "-s",
+        str(source_path),
+        str(delta_path),
+        str(target_path),
+        stdout=asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    _, stderr = await process.communicate()
+    if process.returncode != 0:
+        raise DeltaApplyError(
+            f"xdelta3 exited with {process.returncode}: {stderr.decode().strip()}"
+        )
+    logger.debug("Applied delta %s to %s", delta_path, source_path)
@@ -0,0 +1,240 @@
+import asyncio
+import logging
+import ssl
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Generic, Iterable, TypeVar
+
+import httpx
+from pydantic import BaseModel, ConfigDict, Field
+
+from snap_python.client import SnapClient
+from snap_python.components.store import DEFAULT_STORE_LIMITS, DEFAULT_STORE_TIMEOUT
+from snap_python.schemas.changes import ChangesResponse
+from snap_python.schemas.common import AsyncResponse
+from snap_python.schemas.snaps import InstalledSnapListResponse
+
+logger = logging.getLogger("snap_python.fleet")
+
+T = TypeVar("T")
+
+FleetOperation = Callable[[SnapClient], Awaitable[T]]
+
+
+class HostResult(BaseModel, Generic[T]):
+    """Outcome of running an operation on one host of a :class:`SnapFleet`."""
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    host: str
+    result: T | None = None
+    error: BaseException | None = None
+    elapsed: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class FleetSummary(BaseModel, Generic[T]):
+    """Results of running an operation on every host of a :class:`SnapFleet`."""
+
+    results: dict[str, T] = Field(default_factory=dict)
+    # host -> description of the failure
+    failures: dict[str, str] = Field(default_factory=dict)
+
+    @property
+    def succeeded(self) -> list[str]:
+        return list(self.results)
+
+    @property
+    def failed(self) -> list[str]:
+        return list(self.failures)
+
+
+class SnapFleet:
+    """Run snapd operations across many hosts concurrently.
+
+    Each host is a snapd ``tcp_location`` (e.g. ``http://10.0.0.5:8181``), for which a
+    :class:`SnapClient` is created on first use and kept for later operations. Everything runs on
+    the event loop: at most ``max_concurrency`` hosts are worked on at a time, and each host gets
+    ``host_timeout`` seconds per operation. All clients share a single store HTTP client, since
+    the store is the same for every host.
+
+    :param hosts: The snapd TCP locations of the hosts.
+    :type hosts: Iterable[str]
+    :param max_concurrency: Maximum number of hosts worked on at the same time.
+    :type max_concurrency: int
+    :param host_timeout: Seconds an operation may take on a single host, or None for no limit.
+    :type host_timeout: float | None
+    :param client_factory: Creates the client of a host. Defaults to a :class:`SnapClient` for
+        ``tcp_location=host`` that uses the fleet's shared store client.
+    :type client_factory: Callable[[str], SnapClient], optional
+    """
+
+    def __init__(
+        self,
+        hosts: Iterable[str],
+        max_concurrency: int = 100,
+        host_timeout: float | None = 60.0,
+        client_factory: Callable[[str], SnapClient] | None = None,
+    ):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.hosts = list(dict.fromkeys(hosts))
+        self.max_concurrency = max_concurrency
+        self.host_timeout = host_timeout
+        self._client_factory = client_factory or self._default_client_factory
+        self._clients: dict[str, SnapClient] = {}
+        self._store_client: httpx.AsyncClient | None = None
+        self._ssl_context: ssl.SSLContext | None = None
+
+    def _default_client_factory(self, host: str) -> SnapClient:
+        if self._store_client is None:
+            # building an SSL context takes tens of milliseconds, so every host's
+            # transport shares one instead of loading the CA bundle again
+            self._ssl_context = httpx.create_ssl_context()
+            self._store_client = httpx.AsyncClient(
+                verify=self._ssl_context,
+                limits=DEFAULT_STORE_LIMITS,
+                timeout=DEFAULT_STORE_TIMEOUT,
+            )
+        return SnapClient(
+            tcp_location=host,
+            store_client=self._store_client,
+            snapd_transport=httpx.AsyncHTTPTransport(verify=self._ssl_context),
+        )
+
+    def client(self, host: str) -> SnapClient:
+        """Return the client of ``host``, creating it on first use."""
+        client = self._clients.get(host)
+        if client is None:
+            client = self._clients[host] = self._client_factory(host)
+        return client
+
+    async def _run_on_host(self, host: str, operation: FleetOperation) -> HostResult:
+        start = time.monotonic()
+        try:
+            result = await asyncio.wait_for(
+                operation(self.client(host)), timeout=self.host_timeout
+            )
+        except asyncio.TimeoutError as e:
+            logger.debug("Operation timed out on %s", host)
+            return HostResult(host=host, error=e, elapsed=time.monotonic() - start)
+        except Exception as e:
+            logger.debug("Operation failed on %s: %s", host, e)
+            return HostResult(host=host, error=e, elapsed=time.monotonic() - start)
+        return HostResult(host=host, result=result, elapsed=time.monotonic() - start)
+
+    async def run(
+        self, operation: FleetOperation[T], hosts: Iterable[str] | None = None
+    ) -> AsyncIterator[HostResult[T]]:
+        """Run ``operation`` on every host and yield each host's result as it completes.
+
+        Failures and timeouts do not stop the run; they are reported in
+        :attr:`HostResult.error`. Hosts are started as earlier ones finish, so only
+        ``max_concurrency`` operations exist at any time, however large the fleet.
+
+        :param operation: Coroutine function called with the client of each host.
+        :type operation: Callable[[SnapClient], Awaitable[T]]
+        :param hosts: The hosts to run on. Defaults to the whole fleet.
+        :type hosts: Iterable[str], optional
+
+        :returns: An async iterator over the per-host results, in completion order.
+        :rtype: AsyncIterator[HostResult[T]]
+        """
+        remaining = iter(self.hosts if hosts is None else hosts)
+        pending: set[asyncio.Task] = set()
+
+        def start_next() -> None:
+            for host in remaining:
+                pending.add(asyncio.create_task(self._run_on_host(host, operation)))
+                return
+
+        try:
+            for _ in range(self.max_concurrency):
+                start_next()
+            while pending:
+                done, _ = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    pending.discard(task)
+                    start_next()
+                    yield task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def gather(
+        self, operation: FleetOperation[T], hosts: Iterable[str] | None = None
+    ) -> FleetSummary[T]:
+        """Run ``operation`` on every host and collect the results.
+
+        :param operation: Coroutine function called with the client of each host.
+        :type operation: Callable[[SnapClient], Awaitable[T]]
+        :param hosts: The hosts to run on. Defaults to the whole fleet.
+        :type hosts: Iterable[str], optional
+
+        :returns: The results of the hosts that succeeded and the failures of the others.
+        :rtype: FleetSummary[T]
+        """
+        summary: FleetSummary[T] = FleetSummary()
+        async for host_result in self.run(operation, hosts):
+            if host_result.ok:
+                summary.results[host_result.host] = host_result.result
+            else:
+                summary.failures[host_result.host] = (
+                    f"{type(host_result.error).__name__}: {host_result.error}"
+                )
+        return summary
+
+    def list_installed_snaps(
+        self, hosts: Iterable[str] | None = None
+    ) -> AsyncIterator[HostResult[InstalledSnapListResponse]]:
+        """List the installed snaps of every host."""
+        return self.run(lambda client: client.snaps.list_installed_snaps(), hosts)
+
+    def install_snap(
+        self, snap: str, hosts: Iterable[str] | None = None, **kwargs: Any
+    ) -> AsyncIterator[HostResult[AsyncResponse | ChangesResponse]]:
+        """Install ``snap`` on every host; ``kwargs`` are passed to ``SnapsEndpoints.install_snap``."""
+        return self.run(lambda client: client.snaps.install_snap(snap, **kwargs), hosts)
+
+    def refresh_snap(
+        self, snap: str, hosts: Iterable[str] | None = None, **kwargs: Any
+    ) -> AsyncIterator[HostResult[AsyncResponse | ChangesResponse]]:
+        """Refresh ``snap`` on every host; ``kwargs`` are passed to ``SnapsEndpoints.refresh_snap``."""
+        return self.run(lambda client: client.snaps.refresh_snap(snap, **kwargs), hosts)
+
+    def set_configuration(
+        self,
+        snap: str,
+        configuration: dict,
+        hosts: Iterable[str] | None = None,
+        wait: bool = True,
+    ) -> AsyncIterator[HostResult[AsyncResponse | ChangesResponse]]:
+        """Set the configuration of ``snap`` on every host."""
+        return self.run(
+            lambda client: client.config.set_configuration(
+                snap, configuration, wait=wait
+            ),
+            hosts,
+        )
+
+    async def aclose(self) -> None:
+        """Close the clients of every host and the shared store client."""
+        await asyncio.gather(
+            *(client.aclose() for client in self._clients.values()),
+            return_exceptions=True,
+        )
+        self._clients.clear()
+        if self._store_client is not None:
+            await self._store_client.aclose()
+            self._store_client = None
+
+    async def __aenter__(self) -> "SnapFleet":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
@@ -0,0 +1,480 @@
+import bisect
+import contextvars
+import logging
+import re
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Literal, Sequence, Type, TypeVar
+
+import httpx
+from pydantic import BaseModel
+
+from snap_python.trusted import ModelView, view_json
+
+logger = logging.getLogger("snap_python.instrumentation")
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+RequestSource = Literal["snapd", "store"]
+
+# (pattern, template) pairs applied to request paths, first match wins
+_ENDPOINT_TEMPLATES: list[tuple[re.Pattern, str]] = [
+    (re.compile(r"^/v2/snaps/info/[^/]+$"), "/v2/snaps/info/{name}"),
+    (re.compile(r"^/v2/snaps/category/[^/]+$"), "/v2/snaps/category/{name}"),
+    (re.compile(r"^/api/v1/snaps/details/[^/]+$"), "/api/v1/snaps/details/{name}"),
+    (
+        re.compile(r"^/v2/assertions/snap-declaration/16/[^/]+$"),
+        "/v2/assertions/snap-declaration/16/{snap_id}",
+    ),
+    (re.compile(r"^/v2/snaps/[^/]+/conf$"), "/v2/snaps/{name}/conf"),
+    (
+        re.compile(r"^/v2/snaps/(?!find$|refresh$|categories$)[^/]+$"),
+        "/v2/snaps/{name}",
+    ),
+    (re.compile(r"^/v2/changes/[^/]+$"), "/v2/changes/{id}"),
+]
+
+DEFAULT_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+def endpoint_template(url: str | httpx.URL) -> str:
+    """Return the path of ``url`` with snap names and ids replaced by placeholders.
+
+    >>> endpoint_template("http://localhost/v2/snaps/lpci")
+    '/v2/snaps/{name}'
+    """
+    path = url.path if isinstance(url, httpx.URL) else httpx.URL(url).path
+    for pattern, template in _ENDPOINT_TEMPLATES:
+        templated, count = pattern.subn(template, path)
+        if count:
+            return templated
+    return path
+
+
+class RequestEvent(BaseModel):
+    """Timing and size of one logical request, including all of its retries."""
+
+    source: RequestSource
+    method: str
+    endpoint: str
+    status_code: int | None = None
+    request_bytes: int | None = None
+    response_bytes: int | None = None
+    # seconds from sending the (last) attempt until the response headers arrived; only
+    # measured on HTTP clients created by snap_python
+    time_to_first_byte: float | None = None
+    duration: float
+    attempts: int = 1
+    error: str | None = None
+    start_time_ns: int
+
+    @property
+    def retries(self) -> int:
+        return max(0, self.attempts - 1)
+
+
+class ValidationEvent(BaseModel):
+    """Time spent validating a response into a pydantic model."""
+
+    model: str
+    duration: float
+    input_bytes: int | None = None
+    # whether a lazy view was built instead of validating the whole model
+    trusted: bool = False
+
+
+class RequestTrace:
+    """Mutable state of a request being traced, shared with retries and HTTP event hooks."""
+
+    __slots__ = ("attempts", "time_to_first_byte")
+
+    def __init__(self) -> None:
+        self.attempts = 0
+        self.time_to_first_byte: float | None = None
+
+
+_current_trace: contextvars.ContextVar[RequestTrace | None] = contextvars.ContextVar(
+    "snap_python_request_trace", default=None
+)
+
+_SENT_AT = "snap_python.sent_at"
+
+
+def record_attempt() -> None:
+    """Count an attempt of the request being traced in this context, if any."""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.attempts += 1
+
+
+async def _on_request(request: httpx.Request) -> None:
+    request.extensions[_SENT_AT] = time.perf_counter()
+
+
+async def _on_response(response: httpx.Response) -> None:
+    trace = _current_trace.get()
+    sent_at = response.request.extensions.get(_SENT_AT)
+    if trace is not None and sent_at is not None:
+        trace.time_to_first_byte = time.perf_counter() - sent_at
+
+
+def _body_size(content: Any) -> int | None:
+    return len(content) if isinstance(content, (bytes, bytearray)) else None
+
+
+class Instrumentation:
+    """Receives request and validation events. This base class ignores them.
+
+    Subclass it and override :meth:`on_request` and :meth:`on_validation` to collect metrics;
+    see :class:`HistogramCollector` and :class:`OpenTelemetryInstrumentation`.
+    """
+
+    #: Whether events are produced at all. The no-op default skips all measurements.
+    enabled: bool = False
+
+    def on_request(self, event: RequestEvent) -> None:
+        """Called once per logical request, after the last attempt finished."""
+
+    def on_validation(self, event: ValidationEvent) -> None:
+        """Called after a response was validated into a model."""
+
+    def event_hooks(self) -> dict[str, list]:
+        """Return httpx event hooks measuring time to first byte, for clients snap_python creates."""
+        if not self.enabled:
+            return {}
+        return {"request": [_on_request], "response": [_on_response]}
+
+    @asynccontextmanager
+    async def trace(
+        self, source: RequestSource, method: str, url: str | httpx.URL
+    ) -> AsyncIterator["_TraceHandle"]:
+        """Measure the request made inside the ``async with`` block.
+
+        Assign the final response to ``handle.response`` so its status and size are recorded.
+        """
+        handle = _TraceHandle()
+        if not self.enabled:
+            yield handle
+            return
+
+        trace = RequestTrace()
+        token = _current_trace.set(trace)
+        start_time_ns = time.time_ns()
+        start = time.perf_counter()
+        error = None
+        try:
+            yield handle
+        except BaseException as e:
+            error = f"{type(e).__name__}: {e}"
+            if isinstance(e, httpx.HTTPStatusError):
+                handle.response = e.response
+            raise
+        finally:
+            duration = time.perf_counter() - start
+            _current_trace.reset(token)
+            response = handle.response
+            request_bytes = None
+            response_bytes = None
+            status_code = None
+            if isinstance(response, httpx.Response):
+                status_code = response.status_code
+                try:
+                    request_bytes = _body_size(response.request.content)
+                except (httpx.RequestNotRead, RuntimeError):
+                    pass
+                try:
+                    response_bytes = _body_size(response.content)
+                except httpx.ResponseNotRead:
+                    pass
+            self._emit_request(
+                RequestEvent(
+                    source=source,
+                    method=method.upper(),
+                    endpoint=endpoint_template(url),
+                    status_code=status_code,
+                    request_bytes=request_bytes,
+                    response_bytes=response_bytes,
+                    time_to_first_byte=trace.time_to_first_byte,
+                    duration=duration,
+                    attempts=max(1, trace.attempts),
+                    error=error,
+                    start_time_ns=start_time_ns,
+                )
+            )
+
+    def validate_json(
+        self, model: Type[ModelT], data: bytes | str, trusted: bool = False
+    ) -> ModelT:
+        """Validate ``data`` with ``model.model_validate_json``, timing it when enabled.
+
+        With ``trusted``, a lazily validated :class:`~snap_python.trusted.ModelView` is
+        returned instead.
+        """
+        parse = view_json if trusted else model.model_validate_json
+        if not self.enabled:
+            return parse(model, data) if trusted else parse(data)
+        start = time.perf_counter()
+        result = parse(model, data) if trusted else parse(data)
+        self._emit_validation(
+            ValidationEvent(
+                model=model.__name__,
+                duration=time.perf_counter() - start,
+                input_bytes=len(data),
+                trusted=trusted,
+            )
+        )
+        return result
+
+    def validate(self, model: Type[ModelT], data: Any, trusted: bool = False) -> ModelT:
+        """Validate ``data`` with ``model.model_validate``, timing it when enabled.
+
+        With ``trusted``, a lazily validated :class:`~snap_python.trusted.ModelView` is
+        returned instead.
+        """
+        if not self.enabled:
+            return ModelView(model, data) if trusted else model.model_validate(data)
+        start = time.perf_counter()
+        result = ModelView(model, data) if trusted else model.model_validate(data)
+        self._emit_validation(
+            ValidationEvent(
+                model=model.__name__,
+                duration=time.perf_counter() - start,
+                trusted=trusted,
+            )
+        )
+        return result
+
+    def _emit_request(self, event: RequestEvent) -> None:
+        try:
+            self.on_request(event)
+        except Exception:
+            # metrics must never break the request they describe
+            logger.exception("Instrumentation failed to record %s", event.endpoint)
+
+    def _emit_validation(self, event: ValidationEvent) -> None:
+        try:
+            self.on_validation(event)
+        except Exception:
+            logger.exception("Instrumentation failed to record %s", event.model)
+
+
+class _TraceHandle:
+    __slots__ = ("response",)
+
+    def __init__(self) -> None:
+        self.response: httpx.Response | None = None
+
+
+NO_INSTRUMENTATION = Instrumentation()
+
+
+class MultiInstrumentation(Instrumentation):
+    """Forward events to several instrumentations, e.g. a histogram and OpenTelemetry."""
+
+    enabled = True
+
+    def __init__(self, instrumentations: Sequence[Instrumentation]):
+        self.instrumentations = list(instrumentations)
+
+    def on_request(self, event: RequestEvent) -> None:
+        for instrumentation in self.instrumentations:
+            instrumentation._emit_request(event)
+
+    def on_validation(self, event: ValidationEvent) -> None:
+        for instrumentation in self.instrumentations:
+            instrumentation._emit_validation(event)
+
+
+class Histogram:
+    """Fixed-bucket histogram of durations in seconds."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min: float | None = None
+        self.max: float | None = None
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    @property
+    def mean(self) -> float | None:
+        return self.total / self.count if self.count else None
+
+    def percentile(self, q: float) -> float | None:
+        """Estimate the ``q``-th percentile (0-100) as the upper bound of its bucket."""
+        if not self.count:
+            return None
+        rank = q / 100 * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank and bucket_count:
+                if index < len(self.buckets):
+                    return min(self.buckets[index], self.max)
+                return self.max
+        return self.max
+
+    def summary(self) -> dict[str, float | int | None]:
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "min": self.min,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "max": self.max,
+        }
+
+
+class EndpointStats:
+    """Aggregated request metrics for one (source, method, endpoint)."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.duration = Histogram(buckets)
+        self.time_to_first_byte = Histogram(buckets)
+        self.errors = 0
+        self.retries = 0
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.status_codes: dict[int, int] = {}
+
+    def add(self, event: RequestEvent) -> None:
+        self.duration.observe(event.duration)
+        if event.time_to_first_byte is not None:
+            self.time_to_first_byte.observe(event.time_to_first_byte)
+        if event.error is not None:
+            self.errors += 1
+        self.retries += event.retries
+        self.request_bytes += event.request_bytes or 0
+        self.response_bytes += event.response_bytes or 0
+        if event.status_code is not None:
+            self.status_codes[event.status_code] = (
+                self.status_codes.get(event.status_code, 0) + 1
+            )
+
+
+class HistogramCollector(Instrumentation):
+    """Keep request and validation metrics in memory, grouped by endpoint and model.
+
+    :param buckets: Upper bounds, in seconds, of the histogram buckets.
+    :type buckets: Sequence[float]
+    """
+
+    enabled = True
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.requests: dict[tuple[str, str, str], EndpointStats] = {}
+        self.validations: dict[str, Histogram] = {}
+
+    def on_request(self, event: RequestEvent) -> None:
+        key = (event.source, event.method, event.endpoint)
+        stats = self.requests.get(key)
+        if stats is None:
+            stats = self.requests[key] = EndpointStats(self.buckets)
+        stats.add(event)
+
+    def on_validation(self, event: ValidationEvent) -> None:
+        histogram = self.validations.get(event.model)
+        if histogram is None:
+            histogram = self.validations[event.model] = Histogram(self.buckets)
+        histogram.observe(event.duration)
+
+    def slowest(self, n: int = 10) -> list[tuple[tuple[str, str, str], EndpointStats]]:
+        """Return the ``n`` endpoints with the highest total time spent."""
+        return sorted(
+            self.requests.items(),
+            key=lambda item: item[1].duration.total,
+            reverse=True,
+        )[:n]
+
+    def reset(self) -> None:
+        self.requests.clear()
+        self.validations.clear()
+
+
+class OpenTelemetryInstrumentation(Instrumentation):
+    """Export request events as OpenTelemetry spans and histograms.
+
+    Requires the ``opentelemetry-api`` package; configure the SDK/exporters as usual. Spans
+    are created after the fact with the measured start and end times.
+
+    :param tracer_provider: Tracer provider to use. Defaults to the global one.
+    :param meter_provider: Meter provider to use. Defaults to the global one.
+    """
+
+    enabled = True
+
+    def __init__(self, tracer_provider=None, meter_provider=None):
+        try:
+            from opentelemetry import metrics, trace
+        except ImportError as e:
+            raise ImportError(
+                "OpenTelemetryInstrumentation requires the opentelemetry-api package"
+            ) from e
+
+        self._trace_api = trace
+        self._tracer = trace.get_tracer("snap_python", tracer_provider=tracer_provider)
+        meter = metrics.get_meter("snap_python", meter_provider=meter_provider)
+        self._duration = meter.create_histogram(
+            "snap_python.request.duration",
+            unit="s",
+            description="Duration of snapd and store requests, including retries",
+        )
+        self._time_to_first_byte = meter.create_histogram(
+            "snap_python.request.time_to_first_byte", unit="s"
+        )
+        self._validation = meter.create_histogram(
+            "snap_python.validation.duration",
+            unit="s",
+            description="Time spent validating responses into models",
+        )
+
+    def on_request(self, event: RequestEvent) -> None:
+        attributes = {
+            "snap_python.source": event.source,
+            "http.request.method": event.method,
+            "url.template": event.endpoint,
+            "snap_python.retries": event.retries,
+        }
+        if event.status_code is not None:
+            attributes["http.response.status_code"] = event.status_code
+        self._duration.record(event.duration, attributes)
+        if event.time_to_first_byte is not None:
+            self._time_to_first_byte.record(event.time_to_first_byte, attributes)
+
+        span = self._tracer.start_span(
+            f"{event.method} {event.endpoint}",
+            kind=self._trace_api.SpanKind.CLIENT,
+            start_time=event.start_time_ns,
+            attributes=attributes,
+        )
+        if event.error is not None:
+            span.set_status(
+                self._trace_api.Status(self._trace_api.StatusCode.ERROR, event.error)
+            )
+        span.end(end_time=event.start_time_ns + int(event.duration * 1e9))
+
+    def on_validation(self, event: ValidationEvent) -> None:
+        self._validation.record(event.duration, {"snap_python.model": event.model})
@@ -0,0 +1,229 @@
+import time
+from typing import Callable
+
+from pydantic import BaseModel
+
+from snap_python.schemas.changes import (
+    ChangesListResponse,
+    ChangesResponse,
+    ChangesResult,
+)
+from snap_python.schemas.common import BaseErrorResult
+from snap_python.trusted import ModelView, as_model
+
+
+class TaskProgressDelta(BaseModel):
+    """Progress of one task that changed since the previous snapshot of its change."""
+
+    task_id: str
+    label: str
+    status: str
+    done: int
+    total: int
+    # change of ``done`` since the previous snapshot; the whole of ``done`` for new tasks
+    done_delta: int
+
+
+class ProgressUpdate(BaseModel):
+    """What changed in the progress of a change between two snapshots."""
+
+    change_id: str
+    status: str
+    ready: bool
+    done: int
+    total: int
+    done_delta: int
+    # only the tasks whose progress or status changed
+    tasks: list[TaskProgressDelta]
+    # smoothed progress units per second, None until progress has been seen over time
+    rate: float | None = None
+    # seconds until the change is expected to be done at the current rate
+    eta: float | None = None
+    timestamp: float
+
+    @property
+    def fraction(self) -> float | None:
+        """Return the share of the work that is done, or None if the total is unknown."""
+        if self.total <= 0:
+            return None
+        return self.done / self.total
+
+
+class _ChangeProgress:
+    """Last seen progress of one change."""
+
+    __slots__ = ("tasks", "done", "total", "status", "timestamp", "rate")
+
+    def __init__(self) -> None:
+        # task id -> (done, total, status)
+        self.tasks: dict[str, tuple[int, int, str]] = {}
+        self.done = 0
+        self.total = 0
+        self.status = ""
+        self.timestamp: float | None = None
+        self.rate: float | None = None
+
+
+class ProgressTracker:
+    """Turn successive snapshots of changes into progress deltas.
+
+    Each snapshot is compared with the previous one of the same change in a single pass over
+    its tasks; the overall totals are kept up to date from the per-task differences instead
+    of being summed again. Any number of changes can be tracked at once, and a change is
+    forgotten once its ready snapshot has been seen.
+
+    :param smoothing: Weight of the newest measurement in the exponential moving average of
+        the rate, between 0 (never update) and 1 (no smoothing).
+    :type smoothing: float
+    :param clock: Returns the current time in seconds, used when no timestamp is given.
+    :type clock: Callable[[], float]
+    """
+
+    def __init__(
+        self,
+        smoothing: float = 0.3,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if not 0 < smoothing <= 1:
+            raise ValueError(f"smoothing must be in (0, 1], got {smoothing}")
+        self.smoothing = smoothing
+        self._clock = clock
+        self._changes: dict[str, _ChangeProgress] = {}
+
+    def __contains__(self, change_id: str) -> bool:
+        return change_id in self._changes
+
+    def __len__(self) -> int:
+        return len(self._changes)
+
+    def forget(self, change_id: str) -> None:
+        """Stop tracking ``change_id``; its next snapshot is treated as the first one."""
+        self._changes.pop(change_id, None)
+
+    def update(
+        self,
+        changes: ChangesResponse | ChangesResult | ModelView,
+        timestamp: float | None = None,
+    ) -> ProgressUpdate | None:
+        """Record a snapshot of a change and return what changed since the previous one.
+
+        :param changes: The change, as returned by snapd, or a trusted view of it.
+        :type changes: ChangesResponse | ChangesResult | ModelView
+        :param timestamp: When the snapshot was taken, in seconds on the tracker's clock.
+            Defaults to now.
+        :type timestamp: float, optional
+
+        :returns: The progress update, or None if nothing changed or snapd returned an error.
+        :rtype: ProgressUpdate | None
+        """
+        # every task is read below, so a trusted view is validated in one go
+        result = as_model(getattr(changes, "result", changes))
+        if isinstance(result, BaseErrorResult):
+            return None
+        if timestamp is None:
+            timestamp = self._clock()
+
+        state = self._changes.get(result.id)
+        first = state is None
+        if first:
+            state = self._changes[result.id] = _ChangeProgress()
+
+        task_states = state.tasks
+        previous_task_state = task_states.get
+        changed: list[TaskProgressDelta] = []
+        done_delta = 0
+        total_delta = 0
+        for task in result.tasks:
+            progress = task.progress
+            done = progress.done
+            total = progress.total
+            status = task.status
+            previous = previous_task_state(task.id)
+            if previous is None:
+                task_done_delta = done
+                total_delta += total
+            elif previous[0] == done and previous[2] == status and previous[1] == total:
+                # most tasks do not move between two snapshots
+                continue
+            else:
+                task_done_delta = done - previous[0]
+                total_delta += total - previous[1]
+            task_states[task.id] = (done, total, status)
+            done_delta += task_done_delta
+            changed.append(
+                TaskProgressDelta.model_construct(
+                    task_id=task.id,
+                    label=progress.label,
+                    status=status,
+                    done=done,
+                    total=total,
+                    done_delta=task_done_delta,
+                )
+            )
+        removed = len(task_states) > len(result.tasks)
+        if removed:
+            # tasks that disappeared from the change no longer count
+            task_ids = {task.id for task in result.tasks}
+            for task_id in [
+                task_id for task_id in task_states if task_id not in task_ids
+            ]:
+                previous_done, previous_total, _ = task_states.pop(task_id)
+                done_delta -= previous_done
+                total_delta -= previous_total
+
+        state.done += done_delta
+        state.total += total_delta
+        status_changed = result.status != state.status
+        state.status = result.status
+
+        if state.timestamp is not None and timestamp > state.timestamp:
+            rate = done_delta / (timestamp - state.timestamp)
+            state.rate = (
+                rate
+                if state.rate is None
+                else self.smoothing * rate + (1 - self.smoothing) * state.rate
+            )
+        state.timestamp = timestamp
+
+        if result.ready:
+            self.forget(result.id)
+        elif not (first or changed or status_changed or removed):
+            return None
+
+        eta = None
+        if state.rate and state.rate > 0 and state.total > 0:
+            eta = max(0.0, state.total - state.done) / state.rate
+        return ProgressUpdate.model_construct(
+            change_id=result.id,
+            status=result.status,
+            ready=result.ready,
+            done=state.done,
+            total=state.total if result.tasks else -1,
+            done_delta=done_delta,
+            tasks=changed,
+            rate=state.rate,
+            eta=0.0 if result.ready else eta,
+            timestamp=timestamp,
+        )
+
+    def update_many(
+        self, changes: ChangesListResponse, timestamp: float | None = None
+    ) -> list[ProgressUpdate]:
+        """Record a snapshot of every change in ``changes``, e.g. from ``GET /v2/changes``.
+
+        :param changes: The changes, as returned by snapd.
+        :type changes: ChangesListResponse
+        :param timestamp: When the snapshot was taken. Defaults to now.
+        :type timestamp: float, optional
+
+        :returns: The updates of the changes whose progress changed.
+        :rtype: list[ProgressUpdate]
+        """
+        if timestamp is None:
+            timestamp = self._clock()
+        updates = []
+        for result in changes.result:
+            update = self.update(result, timestamp)
+            if update is not None:
+                updates.append(update)
+        return updates
@@ -0,0 +1,241 @@
+import asyncio
+import copy
+import email.utils
+import functools
+import logging
+import random
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, TypeVar
+
+import httpx
+
+from snap_python.instrumentation import record_attempt
+
+logger = logging.getLogger("snap_python.retry_policy")
+
+T = TypeVar("T")
+
+DEFAULT_RETRY_EXCEPTIONS: tuple[type[BaseException], ...] = (httpx.TransportError,)
+DEFAULT_RETRY_STATUSES: frozenset[int] = frozenset({429, 502, 503, 504})
+
+IDEMPOTENT_METHODS: frozenset[str] = frozenset(
+    {"GET", "HEAD", "OPTIONS", "PUT", "DELETE", "TRACE"}
+)
+# failures that guarantee a non-idempotent request never reached the server
+NON_IDEMPOTENT_RETRY_EXCEPTIONS: tuple[type[BaseException], ...] = (
+    httpx.ConnectError,
+    httpx.ConnectTimeout,
+)
+# responses that guarantee a non-idempotent request was not processed
+NON_IDEMPOTENT_RETRY_STATUSES: frozenset[int] = frozenset({429, 503})
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """
+    Parse the value of a ``Retry-After`` header.
+
+    :param value: The header value, either a number of seconds or an HTTP date.
+    :type value: str | None
+
+    :returns: The number of seconds to wait, or None if the value could not be parsed.
+    :rtype: float | None
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class RetryPolicy:
+    """Asyncio-aware retry policy with jittered exponential backoff.
+
+    Failed attempts are retried when they raise one of ``retry_exceptions``, or when
+    they produce a response (returned, or attached to an ``httpx.HTTPStatusError``)
+    whose status code is in ``retry_statuses``. Waiting is done with ``asyncio.sleep``
+    so other coroutines keep running between attempts.
+
+    :param tries: Maximum number of attempts, including the first one.
+    :type tries: int
+    :param delay: Delay before the first retry, in seconds.
+    :type delay: float
+    :param backoff: Multiplier applied to the delay after every retry.
+    :type backoff: float
+    :param max_delay: Upper bound for a single delay, in seconds.
+    :type max_delay: float
+    :param jitter: Randomise each delay between half and all of its computed value.
+    :type jitter: bool
+    :param max_elapsed: Give up once this many seconds have passed since the first attempt.
+    :type max_elapsed: float | None
+    :param retry_exceptions: Exception types that are considered transient.
+    :type retry_exceptions: tuple[type[BaseException], ...]
+    :param retry_statuses: HTTP status codes that are considered transient.
+    :type retry_statuses: Iterable[int]
+    :param respect_retry_after: Use the ``Retry-After`` header of a response as the delay when present.
+    :type respect_retry_after: bool
+    """
+
+    def __init__(
+        self,
+        tries: int = 3,
+        delay: float = 0.5,
+        backoff: float = 2.0,
+        max_delay: float = 10.0,
+        jitter: bool = True,
+        max_elapsed: float | None = 30.0,
+        retry_exceptions: tuple[type[BaseException], ...] = DEFAULT_RETRY_EXCEPTIONS,
+        retry_statuses=DEFAULT_RETRY_STATUSES,
+        respect_retry_after: bool = True,
+    ) -> None:
+        if tries < 1:
+            raise ValueError("tries must be at least 1")
+        self.tries = tries
+        self.delay = delay
+        self.backoff = backoff
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.max_elapsed = max_elapsed
+        self.retry_exceptions = tuple(retry_exceptions)
+        self.retry_statuses = frozenset(retry_statuses)
+        self.respect_retry_after = respect_retry_after
+
+    @classmethod
+    def disabled(cls) -> "RetryPolicy":
+        """Return a policy that never retries."""
+        return cls(tries=1)
+
+    def for_method(self, method: str) -> "RetryPolicy":
+        """
+        Return the policy to use for a request with the HTTP method ``method``.
+
+        Idempotent requests use this policy as is. Other requests, such as the POSTs that
+        create snapd changes, may already have been accepted when a read times out or the
+        connection drops, so they are only retried on connection failures and on 429/503
+        responses, which guarantee the request was not processed.
+
+        :param method: The HTTP method of the request.
+        :type method: str
+
+        :returns: This policy, or a copy restricted to safe retries.
+        :rtype: RetryPolicy
+        """
+        if method.upper() in IDEMPOTENT_METHODS:
+            return self
+        restricted = copy.copy(self)
+        restricted.retry_exceptions = tuple(
+            exception
+            for exception in NON_IDEMPOTENT_RETRY_EXCEPTIONS
+            if issubclass(exception, self.retry_exceptions)
+        )
+        restricted.retry_statuses = self.retry_statuses & NON_IDEMPOTENT_RETRY_STATUSES
+        return restricted
+
+    def compute_delay(
+        self, attempt: int, response: httpx.Response | None = None
+    ) -> float:
+        """
+        Compute the delay before the next attempt.
+
+        :param attempt: The number of attempts made so far (starting at 1).
+        :type attempt: int
+        :param response: The response of the failed attempt, if any.
+        :type response: httpx.Response | None
+
+        :returns: The number of seconds to wait.
+        :rtype: float
+        """
+        if self.respect_retry_after and response is not None:
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            if retry_after is not None:
+                return min(retry_after, self.max_delay)
+
+        delay = min(self.delay * (self.backoff ** (attempt - 1)), self.max_delay)
+        if self.jitter:
+            delay = random.uniform(delay / 2, delay)
+        return delay
+
+    def is_retryable_response(self, response: Any) -> bool:
+        """Check whether a response carries a transient status code."""
+        return (
+            isinstance(response, httpx.Response)
+            and response.status_code in self.retry_statuses
+        )
+
+    async def call(
+        self, func: Callable[..., Awaitable[T]], *args: Any, **kwargs: Any
+    ) -> T:
+        """
+        Await ``func(*args, **kwargs)``, retrying transient failures according to this policy.
+
+        When the attempts or time budget are exhausted, the last exception is re-raised,
+        or the last response is returned.
+
+        :param func: The coroutine function to call.
+        :type func: Callable[..., Awaitable[T]]
+
+        :returns: The result of the first successful attempt.
+        :rtype: T
+        """
+        start = time.monotonic()
+        attempt = 0
+        while True:
+            attempt += 1
+            record_attempt()
+            response = None
+            try:
+                result = await func(*args, **kwargs)
+            except httpx.HTTPStatusError as e:
+                if not (
+                    self.is_retryable_response(e.response)
+                    or isinstance(e, self.retry_exceptions)
+                ):
+                    raise
+                error: BaseException | None = e
+                response = e.response
+            except self.retry_exceptions as e:
+                error = e
+            else:
+                if not self.is_retryable_response(result):
+                    return result
+                error = None
+                response = result
+
+            delay = self.compute_delay(attempt, response)
+            out_of_time = (
+                self.max_elapsed is not None
+                and time.monotonic() - start + delay > self.max_elapsed
+            )
+            if attempt >= self.tries or out_of_time:
+                if error is not None:
+                    raise error
+                return result
+
+            logger.debug(
+                "Attempt %d of %s failed (%s), retrying in %.2fs",
+                attempt,
+                getattr(func, "__qualname__", func),
+                error if error is not None else response.status_code,
+                delay,
+            )
+            await asyncio.sleep(delay)
+
+    def __call__(
+        self, func: Callable[..., Awaitable[T]]
+    ) -> Callable[..., Awaitable[T]]:
+        """Use the policy as a decorator for a coroutine function."""
+
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> T:
+            return await self.call(func, *args, **kwargs)
+
+        return wrapper
@@ -70,3 +70,11 @@ class ChangesResponse(BaseResponse):
         if isinstance(self.result, BaseErrorResult):
             return True
         return self.result.ready
+
+
+class ChangesListResponse(BaseResponse):
+    result: list[ChangesResult]
+    maintenance: MaintenanceInfo | None = None
+
+    def __len__(self):
+        return len(self.result)
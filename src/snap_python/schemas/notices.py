@@ -0,0 +1,42 @@
+from pydantic import AliasChoices, AwareDatetime, BaseModel, Field
+
+from snap_python.schemas.common import BaseResponse
+
+
+class Notice(BaseModel):
+    id: str
+    user_id: int | None = Field(
+        default=None,
+        validation_alias=AliasChoices("user-id", "user_id"),
+        serialization_alias="user-id",
+    )
+    type: str
+    key: str
+    first_occurred: AwareDatetime = Field(
+        validation_alias=AliasChoices("first-occurred", "first_occurred"),
+        serialization_alias="first-occurred",
+    )
+    last_occurred: AwareDatetime = Field(
+        validation_alias=AliasChoices("last-occurred", "last_occurred"),
+        serialization_alias="last-occurred",
+    )
+    # kept as the raw string, snapd compares "after" with nanosecond precision
+    last_repeated: str = Field(
+        validation_alias=AliasChoices("last-repeated", "last_repeated"),
+        serialization_alias="last-repeated",
+    )
+    occurrences: int
+    last_data: dict[str, str] | None = Field(
+        default=None,
+        validation_alias=AliasChoices("last-data", "last_data"),
+        serialization_alias="last-data",
+    )
+    expire_after: str | None = Field(
+        default=None,
+        validation_alias=AliasChoices("expire-after", "expire_after"),
+        serialization_alias="expire-after",
+    )
+
+
+class NoticesResponse(BaseResponse):
+    result: list[Notice]
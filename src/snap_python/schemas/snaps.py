@@ -1,4 +1,6 @@
-from typing import Optional
+import dataclasses
+import functools
+from typing import Annotated, Generic, Optional, TypeVar
 
 from pydantic import AliasChoices, AwareDatetime, BaseModel, Field
 
@@ -12,6 +14,8 @@ from snap_python.schemas.common import (
 )
 from snap_python.schemas.store.categories import Category
 
+RecordT = TypeVar("RecordT")
+
 
 class SnapHealth(BaseModel):
     status: str
@@ -88,6 +92,62 @@ class InstalledSnap(Snap, InstalledSnapFields):
     pass
 
 
+INSTALLED_SNAP_FIELDS = tuple(InstalledSnap.model_fields)
+
+
+@functools.cache
+def installed_snap_record_type(fields: tuple[str, ...]) -> type:
+    """Return a compact record type holding only ``fields`` of an :class:`InstalledSnap`.
+
+    The record is a frozen, slotted dataclass whose fields have the same types, aliases and
+    defaults as in :class:`InstalledSnap`, so pydantic can validate snapd's JSON straight into
+    it while skipping every other key. Record types are cached per field tuple.
+
+    :param fields: Names of :class:`InstalledSnap` fields, e.g. ``("name", "revision")``.
+    :type fields: tuple[str, ...]
+
+    :returns: The record dataclass.
+    :rtype: type
+
+    :raises ValueError: If a field is not a field of :class:`InstalledSnap`.
+    """
+    invalid = [field for field in fields if field not in InstalledSnap.model_fields]
+    if invalid:
+        raise ValueError(
+            f"Invalid fields: ({invalid}). Allowed fields: {INSTALLED_SNAP_FIELDS}"
+        )
+
+    record_fields = []
+    for name in fields:
+        info = InstalledSnap.model_fields[name]
+        annotation = Annotated[
+            info.annotation, Field(validation_alias=info.validation_alias)
+        ]
+        if info.default_factory is not None:
+            default = dataclasses.field(default_factory=info.default_factory)
+        elif info.is_required():
+            default = dataclasses.field()
+        else:
+            default = dataclasses.field(default=info.default)
+        record_fields.append((name, annotation, default))
+
+    return dataclasses.make_dataclass(
+        "InstalledSnapRecord", record_fields, frozen=True, slots=True, kw_only=True
+    )
+
+
+class InstalledSnapRecordListResponse(BaseResponse, Generic[RecordT]):
+    """Installed snaps parsed into records of a subset of their fields.
+
+    See :func:`installed_snap_record_type`.
+    """
+
+    result: list[RecordT]
+
+    def __len__(self):
+        return len(self.result)
+
+
 class SingleInstalledSnapResponse(BaseResponse):
     result: InstalledSnap | BaseErrorResult
 
@@ -88,7 +88,8 @@ class RefreshResultData(BaseModel):
     )
 
     name: str
-    snap: StoreRefreshSnap
+    # absent when the action failed, see ``error``
+    snap: StoreRefreshSnap | None = None
     instance_key: str = Field(
         ...,
         alias=AliasChoices("instance-key", "instance_key"),
@@ -101,8 +102,8 @@ class RefreshResultData(BaseModel):
     )
     result: str
 
-    snap_id: str = Field(
-        ..., alias=AliasChoices("snap-id", "snap_id"), serialization_alias="snap-id"
+    snap_id: Optional[str] = Field(
+        None, alias=AliasChoices("snap-id", "snap_id"), serialization_alias="snap-id"
     )
     error: RefreshResultError | None = None
 
@@ -120,3 +121,30 @@ class RefreshRevisionResponse(BaseModel):
         serialization_alias="error-list",
     )
     results: List[RefreshResultData]
+
+
+class RefreshCandidate(BaseModel):
+    """An installed snap for which the store offers a different revision."""
+
+    name: str
+    snap_id: str
+    tracking_channel: str
+    installed_revision: int
+    installed_version: Optional[str] = None
+    revision: int
+    version: Optional[str] = None
+    download: Optional[Download] = None
+
+
+class RefreshPlan(BaseModel):
+    """Outcome of asking the store which installed snaps can be refreshed."""
+
+    candidates: list[RefreshCandidate] = Field(default_factory=list)
+    up_to_date: list[str] = Field(default_factory=list)
+    # snaps the store cannot refresh, e.g. local installs without a snap-id
+    skipped: list[str] = Field(default_factory=list)
+    errors: dict[str, RefreshResultError] = Field(default_factory=dict)
+    error_list: list[ErrorListItem] = Field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.candidates)
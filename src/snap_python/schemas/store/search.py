@@ -10,8 +10,12 @@ from pydantic import (
     computed_field,
 )
 
-from snap_python.schemas.common import Revision
-from snap_python.schemas.snaps import InstalledSnap, Snap, StoreSnap, StoreSnapFields
+from snap_python.schemas.common import (
+    VALID_SNAP_ARCHITECTURES,
+    Revision,
+)
+from snap_python.schemas.snaps import InstalledSnap, StoreSnap
+from snap_python.trusted import as_model
 
 VALID_SEARCH_CATEGORY_FIELDS = [
     "base",
@@ -96,29 +100,66 @@ class SearchResult(BaseModel):
     snap_id: str = Field(alias=AliasChoices("snap-id", "snap_id"))
 
     @classmethod
-    def from_installed_snap(cls, installed_snap: InstalledSnap):
-        snap_info: dict = installed_snap.model_dump(mode="json")
-        revision_snap_fields = Revision.model_fields.keys()
-        revision_info = {}
-        for field in revision_snap_fields:
-            if field in snap_info:
-                revision_info[field] = snap_info.pop(field)
-
-        snap_id = snap_info.pop("id")
-        snap_name = snap_info.get("name")
-
-        # get set of acceptable fields for StoreSnap
-        store_snap_fields = set(StoreSnapFields.model_fields.keys()).union(
-            Snap.model_fields.keys()
+    def from_installed_snap(cls, installed_snap: InstalledSnap) -> "SearchResult":
+        """Convert an installed snap to the search result the store would return for it.
+
+        Only the fields the result needs are dumped from ``installed_snap``, in python mode,
+        and validated into the revision and snap details. The dump copies every value, so
+        the result never shares state with ``installed_snap``. A
+        :class:`~snap_python.trusted.ModelView` is validated into a model first.
+
+        :param installed_snap: The installed snap, as returned by snapd.
+        :type installed_snap: InstalledSnap | ModelView
+
+        :returns: The equivalent search result.
+        :rtype: SearchResult
+
+        :raises pydantic.ValidationError: If the snap has no id or name.
+        """
+        installed_snap = as_model(installed_snap)
+        snap_id = installed_snap.id
+        name = installed_snap.name
+        if snap_id is None or name is None:
+            # let pydantic report the missing fields
+            return cls.model_validate({"snap": {}, "snap-id": snap_id, "name": name})
+
+        # a python-mode dump copies every container and nested model, and skips the
+        # string round-trip of dates and enums that a JSON dump would need
+        values = installed_snap.model_dump(include=_COPIED_FIELDS)
+        revision = Revision.model_validate(
+            {field: values[field] for field in Revision.model_fields}
+        )
+        snap = StoreSnap.model_validate(
+            {field: values[field] for field in _STORE_SNAP_FIELDS}
         )
-        store_snap_info = {
-            key: value for key, value in snap_info.items() if key in store_snap_fields
-        }
+        # revision and snap are model instances already, so they are not validated again
+        return cls.model_validate(
+            {"name": name, "revision": revision, "snap": snap, "snap-id": snap_id}
+        )
+
+    @classmethod
+    def from_installed_snaps(
+        cls, installed_snaps: list[InstalledSnap]
+    ) -> list["SearchResult"]:
+        """Convert installed snaps with :meth:`from_installed_snap`, keeping their order.
 
-        snap_info = {"snap": store_snap_info, "snap-id": snap_id, "name": snap_name}
-        snap_info["revision"] = revision_info
+        :param installed_snaps: The installed snaps, as returned by snapd.
+        :type installed_snaps: list[InstalledSnap]
 
-        return cls.model_validate(snap_info)
+        :returns: One search result per installed snap.
+        :rtype: list[SearchResult]
+        """
+        convert = cls.from_installed_snap
+        return [convert(installed_snap) for installed_snap in installed_snaps]
+
+
+# the StoreSnap fields an installed snap knows about, besides its revision details
+_STORE_SNAP_FIELDS = tuple(
+    field
+    for field in StoreSnap.model_fields
+    if field in InstalledSnap.model_fields and field not in Revision.model_fields
+)
+_COPIED_FIELDS = frozenset(Revision.model_fields).union(_STORE_SNAP_FIELDS)
 
 
 class SearchResponse(BaseModel):
@@ -171,3 +212,73 @@ class PaginatedSnapSearchResponse(PaginatedResponse):
     results: list[ArchSearchItem] = Field(
         alias=AliasChoices(AliasPath("_embedded", "clickindex:package"), "results")
     )
+
+
+class ArchCatalog(BaseModel):
+    """Catalog of snaps across several architectures.
+
+    Each package maps to a bitmask of the architectures it is published for, where bit ``i``
+    stands for ``VALID_SNAP_ARCHITECTURES[i]``, so membership checks are O(1) dictionary and bit
+    lookups. ``items`` keeps one :class:`ArchSearchItem` per package, from the first
+    architecture (in the order fetched) that ships it.
+    """
+
+    architectures: list[str] = Field(default_factory=list)
+    packages: dict[str, int] = Field(default_factory=dict)
+    items: dict[str, ArchSearchItem] = Field(default_factory=dict)
+
+    @staticmethod
+    def arch_bit(arch: str) -> int:
+        """Return the bit that stands for ``arch`` in the package bitmasks."""
+        try:
+            return 1 << VALID_SNAP_ARCHITECTURES.index(arch)
+        except ValueError:
+            raise ValueError(f"Invalid architecture: {arch}") from None
+
+    def add(self, response: ArchSearchResponse) -> None:
+        """Merge the snaps of a single-architecture response into the catalog."""
+        bit = self.arch_bit(response.arch)
+        if response.arch not in self.architectures:
+            self.architectures.append(response.arch)
+        packages = self.packages
+        items = self.items
+        for item in response.results:
+            name = item.package_name
+            mask = packages.get(name)
+            if mask is None:
+                packages[name] = bit
+                # the catalog outlives the response, so it keeps models rather than views
+                items[name] = as_model(item)
+            else:
+                packages[name] = mask | bit
+
+    @classmethod
+    def from_responses(cls, responses: list[ArchSearchResponse]) -> "ArchCatalog":
+        catalog = cls()
+        for response in responses:
+            catalog.add(response)
+        return catalog
+
+    def has_arch(self, package_name: str, arch: str) -> bool:
+        """Return whether ``package_name`` is published for ``arch``."""
+        return bool(self.packages.get(package_name, 0) & self.arch_bit(arch))
+
+    def architectures_for(self, package_name: str) -> list[str]:
+        """Return the architectures ``package_name`` is published for."""
+        mask = self.packages.get(package_name, 0)
+        return [
+            arch
+            for index, arch in enumerate(VALID_SNAP_ARCHITECTURES)
+            if mask & (1 << index)
+        ]
+
+    def packages_for_arch(self, arch: str) -> list[str]:
+        """Return the names of the packages published for ``arch``."""
+        bit = self.arch_bit(arch)
+        return [name for name, mask in self.packages.items() if mask & bit]
+
+    def __contains__(self, package_name: str) -> bool:
+        return package_name in self.packages
+
+    def __len__(self) -> int:
+        return len(self.packages)
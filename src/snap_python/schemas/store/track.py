@@ -1,5 +1,6 @@
 import logging
-from typing import Optional
+from datetime import datetime
+from typing import Iterator, Optional
 
 from pydantic import (
     AwareDatetime,
@@ -57,28 +58,36 @@ class TrackRiskMap(BaseModel):
     @property
     def architectures(self) -> list[str]:
         """Return a list of architectures that have revisions."""
-        return [
-            arch for arch, details in self.model_dump().items() if details is not None
-        ]
+        return [arch for arch in _RISK_MAP_FIELDS if getattr(self, arch) is not None]
 
+    def has_architecture(self, arch: str) -> bool:
+        """Return whether ``arch`` has a revision at this risk."""
+        return arch in _RISK_MAP_FIELDS and getattr(self, arch) is not None
 
-def channel_map_to_current_track_map(
-    channel_map: list[ChannelMapItem],
-) -> dict[str, dict[str, TrackRiskMap]]:
-    """Convert a list of ChannelMapItem to a map of track -> risk -> TrackRiskMap."""
-    # track -> risk -> arch
-    current_track_map: dict[str, dict[str, TrackRiskMap]] = {}
+    def to_compact(self) -> "CompactRiskMap":
+        """Return the :class:`CompactRiskMap` holding the same revisions."""
+        return CompactRiskMap.from_model(self)
 
-    all_tracks = set(item.channel.track for item in channel_map)
-    logger.debug(f"Found tracks: {', '.join(all_tracks)}")
+    @classmethod
+    def from_compact(cls, compact: "CompactRiskMap") -> "TrackRiskMap":
+        """Build a TrackRiskMap from a :class:`CompactRiskMap` without validating it again."""
+        return compact.to_model()
 
-    for track in all_tracks:
-        current_track_map[track] = {}
 
-    for item in channel_map:
-        track = item.channel.track
-        risk = item.channel.risk
+_RISK_MAP_FIELDS = tuple(TrackRiskMap.model_fields)
+
+
+_VALID_ARCHITECTURES = frozenset(VALID_SNAP_ARCHITECTURES)
+
 
+def _iter_track_values(channel_map: list[ChannelMapItem]) -> Iterator[dict]:
+    """Yield the SnapTrackInfo field values of every usable channel map item, in one pass.
+
+    The fields of a ChannelMapItem already have the types SnapTrackInfo expects, so after
+    the checks below the values can be used without being validated again.
+    """
+    for item in channel_map:
+        channel = item.channel
         if not item.architectures:
             logger.error(
                 f"Warning: Channel {item} has no architectures defined. Skipping."
@@ -88,7 +97,7 @@ def channel_map_to_current_track_map(
         assert (
             item.revision is not None
         ), f"Channel {item} must have a revision defined."
-        assert item.channel is not None, f"Channel {item} must have a channel defined."
+        assert channel is not None, f"Channel {item} must have a channel defined."
         assert (
             item.confinement is not None
         ), f"Channel {item} must have a confinement defined."
@@ -96,32 +105,308 @@ def channel_map_to_current_track_map(
             item.created_at is not None
         ), f"Channel {item} must have a created_at defined."
         assert (
-            item.channel.released_at is not None
+            channel.released_at is not None
         ), f"Channel {item} must have a released_at defined."
 
-        if risk not in current_track_map[track]:
-            # validated at end
-            current_track_map[track][risk] = {}  # type: ignore
-
-        current_track_map[track][risk][item.channel.architecture] = SnapTrackInfo(  # type: ignore
-            name=item.channel.name,
-            architecture=item.channel.architecture,
-            base=item.base or "unset",
-            confinement=item.confinement,
-            created_at=item.created_at,
-            released_at=item.channel.released_at,
-            revision=item.revision,
-            risk=risk,
-            track=track,
-            version=item.version or "unset",
+        architecture = channel.architecture
+        if architecture not in _VALID_ARCHITECTURES:
+            # same check as SnapTrackInfo.validate_arch
+            raise ValueError(
+                f"Invalid architecture: {architecture}. Must be one of {', '.join(VALID_SNAP_ARCHITECTURES)}."
+            )
+
+        yield {
+            "name": channel.name,
+            "architecture": architecture,
+            "base": item.base or "unset",
+            "confinement": item.confinement,
+            "created_at": item.created_at,
+            "released_at": channel.released_at,
+            "revision": item.revision,
+            "risk": channel.risk,
+            "track": channel.track,
+            "version": item.version or "unset",
+        }
+
+
+def _iter_track_infos(channel_map: list[ChannelMapItem]) -> Iterator[SnapTrackInfo]:
+    """Build the SnapTrackInfo of every usable channel map item, in one pass."""
+    for values in _iter_track_values(channel_map):
+        yield SnapTrackInfo.model_construct(**values)
+
+
+def channel_map_to_current_track_map(
+    channel_map: list[ChannelMapItem],
+) -> dict[str, dict[str, TrackRiskMap]]:
+    """Convert a list of ChannelMapItem to a map of track -> risk -> TrackRiskMap.
+
+    Tracks and risks appear in the order of the channel map. Every track of the channel map
+    is present, even when none of its items has architectures and its risk map is empty.
+    """
+    # track -> risk -> arch
+    arch_maps: dict[str, dict[str, dict[str, SnapTrackInfo]]] = {
+        item.channel.track: {} for item in channel_map
+    }
+    for info in _iter_track_infos(channel_map):
+        risks = arch_maps.get(info.track)
+        if risks is None:
+            risks = arch_maps[info.track] = {}
+        arches = risks.get(info.risk)
+        if arches is None:
+            arches = risks[info.risk] = {}
+        arches[info.architecture] = info
+
+    logger.debug(f"Found tracks: {', '.join(arch_maps)}")
+    return {
+        track: {
+            risk: TrackRiskMap.model_construct(**arches)
+            for risk, arches in risks.items()
+        }
+        for track, risks in arch_maps.items()
+    }
+
+
+def channel_map_to_arch_track_map(
+    channel_map: list[ChannelMapItem],
+) -> dict[str, dict[str, dict[str, SnapTrackInfo]]]:
+    """Convert a list of ChannelMapItem to a map of architecture -> track -> risk -> SnapTrackInfo.
+
+    This is the reverse index of :func:`channel_map_to_current_track_map`, for looking up
+    everything released for one architecture. Architectures, tracks and risks appear in the
+    order of the channel map.
+    """
+    arch_map: dict[str, dict[str, dict[str, SnapTrackInfo]]] = {}
+    for info in _iter_track_infos(channel_map):
+        tracks = arch_map.get(info.architecture)
+        if tracks is None:
+            tracks = arch_map[info.architecture] = {}
+        risks = tracks.get(info.track)
+        if risks is None:
+            risks = tracks[info.track] = {}
+        risks[info.risk] = info
+    return arch_map
+
+
+# fixed ordinal of each architecture in the compact representation; bit ``i`` of a
+# CompactRiskMap mask stands for VALID_SNAP_ARCHITECTURES[i], as in ArchCatalog
+ARCHITECTURE_ORDINALS: dict[str, int] = {
+    arch: index for index, arch in enumerate(VALID_SNAP_ARCHITECTURES)
+}
+
+
+def _arch_ordinal(arch: str) -> int:
+    try:
+        return ARCHITECTURE_ORDINALS[arch]
+    except KeyError:
+        raise ValueError(
+            f"Invalid architecture: {arch}. Must be one of {', '.join(VALID_SNAP_ARCHITECTURES)}."
+        ) from None
+
+
+class CompactTrackInfo:
+    """Slots-based equivalent of :class:`SnapTrackInfo`, used by :class:`CompactRiskMap`."""
+
+    __slots__ = tuple(SnapTrackInfo.model_fields)
+
+    def __init__(
+        self,
+        name: str,
+        architecture: str,
+        base: str,
+        confinement: str,
+        created_at: datetime,
+        released_at: datetime,
+        revision: int,
+        risk: str,
+        track: str,
+        version: str,
+    ):
+        self.name = name
+        self.architecture = architecture
+        self.base = base
+        self.confinement = confinement
+        self.created_at = created_at
+        self.released_at = released_at
+        self.revision = revision
+        self.risk = risk
+        self.track = track
+        self.version = version
+
+    @classmethod
+    def from_model(cls, info: SnapTrackInfo) -> "CompactTrackInfo":
+        return cls(**{field: getattr(info, field) for field in cls.__slots__})
+
+    def to_model(self) -> SnapTrackInfo:
+        """Return the equivalent SnapTrackInfo, without validating it again."""
+        return SnapTrackInfo.model_construct(
+            **{field: getattr(self, field) for field in self.__slots__}
         )
 
-    # re validate the track map to ensure it has all required fields
-    for track, risk_map in current_track_map.items():
-        for risk in risk_map:
-            risk_map[risk] = TrackRiskMap.model_validate(risk_map[risk])
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, CompactTrackInfo):
+            return NotImplemented
+        return all(
+            getattr(self, field) == getattr(other, field) for field in self.__slots__
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f"CompactTrackInfo(name={self.name!r}, architecture={self.architecture!r}, "
+            f"revision={self.revision!r})"
+        )
+
+
+class CompactRiskMap:
+    """Array-backed equivalent of :class:`TrackRiskMap`.
+
+    ``entries[i]`` holds the revision of ``VALID_SNAP_ARCHITECTURES[i]`` (or None) and bit
+    ``i`` of ``mask`` is set when it is populated, so architecture queries are O(1) and
+    never serialise anything.
+    """
+
+    __slots__ = ("mask", "entries")
+
+    def __init__(self) -> None:
+        self.mask = 0
+        self.entries: list[Optional[CompactTrackInfo]] = [None] * len(
+            VALID_SNAP_ARCHITECTURES
+        )
+
+    def add(self, info: CompactTrackInfo) -> None:
+        """Store ``info`` as the revision of its architecture, replacing any previous one."""
+        ordinal = _arch_ordinal(info.architecture)
+        self.entries[ordinal] = info
+        self.mask |= 1 << ordinal
+
+    def get(self, arch: str) -> Optional[CompactTrackInfo]:
+        """Return the revision of ``arch``, or None if it has none at this risk."""
+        ordinal = ARCHITECTURE_ORDINALS.get(arch)
+        return None if ordinal is None else self.entries[ordinal]
+
+    def has_architecture(self, arch: str) -> bool:
+        """Return whether ``arch`` has a revision at this risk."""
+        ordinal = ARCHITECTURE_ORDINALS.get(arch)
+        return ordinal is not None and bool(self.mask >> ordinal & 1)
+
+    @property
+    def architectures(self) -> list[str]:
+        """Return the architectures that have revisions, in ordinal order."""
+        mask = self.mask
+        return [
+            arch
+            for index, arch in enumerate(VALID_SNAP_ARCHITECTURES)
+            if mask >> index & 1
+        ]
+
+    @classmethod
+    def from_model(cls, risk_map: TrackRiskMap) -> "CompactRiskMap":
+        compact = cls()
+        for arch in _RISK_MAP_FIELDS:
+            info = getattr(risk_map, arch)
+            if info is not None:
+                compact.add(CompactTrackInfo.from_model(info))
+        return compact
+
+    def to_model(self) -> TrackRiskMap:
+        """Return the equivalent TrackRiskMap, without validating it again."""
+        arches = {
+            info.architecture: info.to_model()
+            for info in self.entries
+            if info is not None
+        }
+        return TrackRiskMap.model_construct(**arches)
+
+    def __contains__(self, arch: str) -> bool:
+        return self.has_architecture(arch)
+
+    def __len__(self) -> int:
+        return bin(self.mask).count("1")
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, CompactRiskMap):
+            return NotImplemented
+        return self.mask == other.mask and self.entries == other.entries
+
+    def __repr__(self) -> str:
+        return f"CompactRiskMap({', '.join(self.architectures)})"
+
+
+class CompactTrackMap:
+    """Compact track -> risk -> :class:`CompactRiskMap` map of a snap's channel map.
+
+    Tracks and risks appear in the order of the channel map.
+    """
+
+    __slots__ = ("tracks",)
+
+    def __init__(
+        self, tracks: Optional[dict[str, dict[str, CompactRiskMap]]] = None
+    ) -> None:
+        self.tracks: dict[str, dict[str, CompactRiskMap]] = (
+            tracks if tracks is not None else {}
+        )
+
+    @classmethod
+    def from_channel_map(cls, channel_map: list[ChannelMapItem]) -> "CompactTrackMap":
+        """Build the compact map straight from a channel map, without any pydantic model."""
+        tracks: dict[str, dict[str, CompactRiskMap]] = {
+            item.channel.track: {} for item in channel_map
+        }
+        for values in _iter_track_values(channel_map):
+            risks = tracks.get(values["track"])
+            if risks is None:
+                risks = tracks[values["track"]] = {}
+            risk_map = risks.get(values["risk"])
+            if risk_map is None:
+                risk_map = risks[values["risk"]] = CompactRiskMap()
+            risk_map.add(CompactTrackInfo(**values))
+        return cls(tracks)
+
+    @classmethod
+    def from_track_map(
+        cls, track_map: dict[str, dict[str, TrackRiskMap]]
+    ) -> "CompactTrackMap":
+        """Build the compact map from the output of :func:`channel_map_to_current_track_map`."""
+        return cls(
+            {
+                track: {risk: risk_map.to_compact() for risk, risk_map in risks.items()}
+                for track, risks in track_map.items()
+            }
+        )
+
+    def to_track_map(self) -> dict[str, dict[str, TrackRiskMap]]:
+        """Return the equivalent output of :func:`channel_map_to_current_track_map`."""
+        return {
+            track: {risk: risk_map.to_model() for risk, risk_map in risks.items()}
+            for track, risks in self.tracks.items()
+        }
+
+    def get(self, track: str, risk: str) -> Optional[CompactRiskMap]:
+        """Return the risk map of ``track``/``risk``, or None if it has no revisions."""
+        risks = self.tracks.get(track)
+        return None if risks is None else risks.get(risk)
+
+    def has_architecture(self, track: str, risk: str, arch: str) -> bool:
+        """Return whether ``arch`` has a revision on ``track``/``risk``."""
+        risk_map = self.get(track, risk)
+        return risk_map is not None and risk_map.has_architecture(arch)
+
+    def __getitem__(self, track: str) -> dict[str, CompactRiskMap]:
+        return self.tracks[track]
+
+    def __contains__(self, track: str) -> bool:
+        return track in self.tracks
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.tracks)
+
+    def __len__(self) -> int:
+        return len(self.tracks)
 
-    return current_track_map
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, CompactTrackMap):
+            return NotImplemented
+        return self.tracks == other.tracks
 
 
 def channel_map_item_to_track_revision_details(
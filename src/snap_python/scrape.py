@@ -1,9 +1,21 @@
+import asyncio
+import hashlib
+import logging
 import pathlib
+import time
+from typing import Callable, Mapping
+
+import httpx
+from pydantic import BaseModel, Field
 
 from snap_python.client import SnapClient
-from snap_python.schemas.store.info import ChannelMapItem
+from snap_python.delta import DeltaApplyError, apply_delta, delta_formats_available
+from snap_python.retry_policy import RetryPolicy
+from snap_python.schemas.store.info import ChannelMapItem, Delta, Download
 from snap_python.schemas.store.refresh import VALID_SNAP_REFRESH_FIELDS
 
+logger = logging.getLogger("snap_python.scrape")
+
 
 def get_highest_revision(channel_map: list[ChannelMapItem]) -> ChannelMapItem:
     """Find the ChannelMapItem with the highest revision number from a list of ChannelMapItems.
@@ -28,33 +40,343 @@ def get_highest_revision(channel_map: list[ChannelMapItem]) -> ChannelMapItem:
     return max(channel_map, key=lambda x: x.revision)
 
 
+DEFAULT_DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+# every retry resumes the .part file, so a transfer keeps going as long as it makes attempts;
+# a total time budget would give up on large files that simply take long
+DEFAULT_DOWNLOAD_RETRY_POLICY = RetryPolicy(
+    tries=10, delay=1.0, max_delay=30.0, max_elapsed=None
+)
+
+
+class DownloadVerificationError(Exception):
+    """Raised when a downloaded snap does not match the SHA3-384 digest published by the store."""
+
+    def __init__(self, path: pathlib.Path, expected: str, actual: str):
+        self.path = path
+        self.expected = expected
+        self.actual = actual
+        super().__init__(
+            f"SHA3-384 mismatch for {path.name}: expected {expected}, got {actual}"
+        )
+
+
+def _hash_file(path: pathlib.Path, hasher, chunk_size: int) -> int:
+    """Feed the contents of ``path`` into ``hasher`` and return the number of bytes read."""
+    size = 0
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            hasher.update(chunk)
+            size += len(chunk)
+    return size
+
+
+def _write_chunk(f, hasher, chunk: bytes) -> None:
+    f.write(chunk)
+    hasher.update(chunk)
+
+
+async def _is_valid_download(
+    path: pathlib.Path,
+    sha3_384: str | None,
+    size: int | None,
+    chunk_size: int,
+) -> bool:
+    if not path.exists():
+        return False
+    if size is not None and path.stat().st_size != size:
+        return False
+    if sha3_384 is None:
+        # without a digest, a file of the right size is the best we can check
+        return size is not None
+    hasher = hashlib.sha3_384()
+    await asyncio.to_thread(_hash_file, path, hasher, chunk_size)
+    return hasher.hexdigest() == sha3_384
+
+
+async def _download_to_part_file(
+    store_client: httpx.AsyncClient,
+    url: str,
+    part_path: pathlib.Path,
+    size: int | None,
+    chunk_size: int,
+    on_chunk: Callable[[int], None],
+):
+    """Download ``url`` into ``part_path``, resuming from whatever is already there.
+
+    ``on_chunk`` is called with the size of every chunk written. Returns the hash of the
+    whole file.
+    """
+    hasher = hashlib.sha3_384()
+    offset = 0
+    if part_path.exists():
+        if size is not None and part_path.stat().st_size > size:
+            part_path.unlink()
+        else:
+            offset = await asyncio.to_thread(_hash_file, part_path, hasher, chunk_size)
+
+    if size is not None and offset == size:
+        return hasher
+
+    headers = {"Range": f"bytes={offset}-"} if offset else {}
+    async with store_client.stream(
+        "GET", url, headers=headers, follow_redirects=True
+    ) as response:
+        if offset and response.status_code == 416:
+            # the server has nothing past offset: the part file is already complete
+            return hasher
+        response.raise_for_status()
+        if offset and response.status_code != 206:
+            logger.debug("Server ignored range request for %s, restarting", url)
+            hasher = hashlib.sha3_384()
+            offset = 0
+
+        f = await asyncio.to_thread(open, part_path, "ab" if offset else "wb")
+        try:
+            async for chunk in response.aiter_bytes(chunk_size):
+                await asyncio.to_thread(_write_chunk, f, hasher, chunk)
+                on_chunk(len(chunk))
+        finally:
+            await asyncio.to_thread(f.close)
+    return hasher
+
+
 async def download_snap_file(
     snap_client: SnapClient,
     snap_revision_download: str,
     snap_revision_download_path: pathlib.Path,
-):
+    sha3_384: str | None = None,
+    size: int | None = None,
+    chunk_size: int = DEFAULT_DOWNLOAD_CHUNK_SIZE,
+    retry_policy: RetryPolicy | None = None,
+) -> int:
     """Asynchronously downloads a snap file from the Snap Store.
 
-    This function streams the snap file from the specified URL and writes it to
-    the specified path on disk.
+    This function streams the snap file from the specified URL into a ``.part`` file next to
+    ``snap_revision_download_path``, and renames it into place once complete. If a ``.part``
+    file is left over from an interrupted download, the download resumes from where it
+    stopped using an HTTP Range request. Disk writes and hashing run in a worker thread so
+    the event loop is not blocked.
+
+    When ``sha3_384`` is given, the file is hashed while it streams and compared with the
+    expected digest. A file that already exists and matches is not downloaded again.
 
     Parameters:
         snap_client (SnapClient): The client for interacting with the Snap Store.
         snap_revision_download (str): The URL to download the snap file from.
         snap_revision_download_path (pathlib.Path): The path where the downloaded snap file will be saved.
+        sha3_384 (str, optional): Expected SHA3-384 hex digest of the file.
+        size (int, optional): Expected size of the file in bytes.
+        chunk_size (int, optional): Size of the chunks read from the network. Defaults to 1 MiB.
+        retry_policy (RetryPolicy, optional): Policy used to retry (and resume) failed
+            transfers. Defaults to ``DEFAULT_DOWNLOAD_RETRY_POLICY``, which has no total
+            time budget.
 
     Returns:
-        None
+        int: The number of bytes transferred over the network, 0 if the file was already present.
 
-    """
+    Raises:
+        DownloadVerificationError: If the downloaded file does not match ``sha3_384``.
+        httpx.HTTPError: If the download fails.
 
+    """
+    snap_revision_download_path = pathlib.Path(snap_revision_download_path)
+    if await _is_valid_download(
+        snap_revision_download_path, sha3_384, size, chunk_size
+    ):
+        logger.debug("%s is already downloaded", snap_revision_download_path)
+        return 0
+
+    part_path = snap_revision_download_path.with_name(
+        snap_revision_download_path.name + ".part"
+    )
     store_client = snap_client.store.store_client
-    async with store_client.stream(
-        "GET", snap_revision_download, follow_redirects=True
-    ) as response:
-        with open(snap_revision_download_path, "wb") as f:
-            async for chunk in response.aiter_bytes():
-                f.write(chunk)
+    retry_policy = retry_policy or DEFAULT_DOWNLOAD_RETRY_POLICY
+
+    transferred = 0
+
+    def count(chunk_length: int) -> None:
+        nonlocal transferred
+        transferred += chunk_length
+
+    # a failed attempt leaves the part file behind, so the next attempt (or the next
+    # run) picks up where it stopped
+    hasher = await retry_policy.call(
+        _download_to_part_file,
+        store_client,
+        snap_revision_download,
+        part_path,
+        size,
+        chunk_size,
+        count,
+    )
+
+    digest = hasher.hexdigest()
+    if sha3_384 is not None and digest != sha3_384:
+        part_path.unlink()
+        raise DownloadVerificationError(snap_revision_download_path, sha3_384, digest)
+
+    part_path.replace(snap_revision_download_path)
+    return transferred
+
+
+def _pick_delta(
+    download: Download, local_revisions: Mapping[int, pathlib.Path]
+) -> Delta | None:
+    """Return the smallest applicable delta whose source revision is held locally."""
+    if download.sha3_384 is None:
+        # the rebuilt file could not be verified
+        return None
+    formats = delta_formats_available()
+    candidates = [
+        delta
+        for delta in download.deltas
+        if delta.format in formats
+        and int(delta.source) in local_revisions
+        and local_revisions[int(delta.source)].exists()
+    ]
+    return min(candidates, key=lambda delta: delta.size, default=None)
+
+
+async def _download_with_delta(
+    snap_client: SnapClient,
+    download: Download,
+    delta: Delta,
+    source_path: pathlib.Path,
+    snap_revision_download_path: pathlib.Path,
+    chunk_size: int,
+    retry_policy: RetryPolicy | None,
+) -> int:
+    delta_path = snap_revision_download_path.with_name(
+        f"{snap_revision_download_path.name}.delta-{int(delta.source)}"
+    )
+    target_path = snap_revision_download_path.with_name(
+        f"{snap_revision_download_path.name}.from-delta"
+    )
+    transferred = await download_snap_file(
+        snap_client,
+        delta.url,
+        delta_path,
+        sha3_384=delta.sha3_384,
+        size=int(delta.size),
+        chunk_size=chunk_size,
+        retry_policy=retry_policy,
+    )
+    try:
+        await apply_delta(delta.format, source_path, delta_path, target_path)
+        hasher = hashlib.sha3_384()
+        await asyncio.to_thread(_hash_file, target_path, hasher, chunk_size)
+        if hasher.hexdigest() != download.sha3_384:
+            raise DownloadVerificationError(
+                snap_revision_download_path, download.sha3_384, hasher.hexdigest()
+            )
+        target_path.replace(snap_revision_download_path)
+    finally:
+        delta_path.unlink(missing_ok=True)
+        target_path.unlink(missing_ok=True)
+    return transferred
+
+
+async def download_snap_revision(
+    snap_client: SnapClient,
+    download: Download,
+    snap_revision_download_path: pathlib.Path,
+    local_revisions: Mapping[int, pathlib.Path] | None = None,
+    chunk_size: int = DEFAULT_DOWNLOAD_CHUNK_SIZE,
+    retry_policy: RetryPolicy | None = None,
+) -> int:
+    """Download a snap revision, using a delta against a locally held revision when possible.
+
+    If ``download.deltas`` lists a delta in a format that can be applied here (see
+    :func:`snap_python.delta.delta_formats_available`) whose source revision is in
+    ``local_revisions``, only the delta is fetched. It is applied to the local file and the
+    result is checked against ``download.sha3_384``. If anything goes wrong on the delta path,
+    the full snap is downloaded with :func:`download_snap_file` instead.
+
+    Parameters:
+        snap_client (SnapClient): The client for interacting with the Snap Store.
+        download (Download): Download information of the revision, from a store response.
+        snap_revision_download_path (pathlib.Path): The path where the snap file will be saved.
+        local_revisions (Mapping[int, pathlib.Path], optional): Snap files already held locally, by revision.
+        chunk_size (int, optional): Size of the chunks read from the network. Defaults to 1 MiB.
+        retry_policy (RetryPolicy, optional): Policy used to retry failed transfers.
+
+    Returns:
+        int: The number of bytes transferred over the network, 0 if the file was already present.
+
+    Raises:
+        DownloadVerificationError: If the full download does not match ``download.sha3_384``.
+        httpx.HTTPError: If the full download fails.
+
+    """
+    snap_revision_download_path = pathlib.Path(snap_revision_download_path)
+    size = int(download.size)
+    if await _is_valid_download(
+        snap_revision_download_path, download.sha3_384, size, chunk_size
+    ):
+        return 0
+
+    delta = _pick_delta(download, local_revisions or {})
+    if delta is not None:
+        try:
+            return await _download_with_delta(
+                snap_client,
+                download,
+                delta,
+                local_revisions[int(delta.source)],
+                snap_revision_download_path,
+                chunk_size,
+                retry_policy,
+            )
+        except (httpx.HTTPError, DeltaApplyError, DownloadVerificationError) as e:
+            logger.warning(
+                "Delta download of %s failed, downloading the full snap: %s",
+                download.url,
+                e,
+            )
+
+    return await download_snap_file(
+        snap_client,
+        download.url,
+        snap_revision_download_path,
+        sha3_384=download.sha3_384,
+        size=size,
+        chunk_size=chunk_size,
+        retry_policy=retry_policy,
+    )
+
+
+class ScrapeStats(BaseModel):
+    """Progress and throughput of :func:`get_all_snap_content`."""
+
+    revisions_total: int = 0
+    revisions_done: int = 0
+    revisions_failed: int = 0
+    files_downloaded: int = 0
+    downloads_failed: int = 0
+    bytes_downloaded: int = 0
+    started_at: float = Field(default_factory=time.monotonic)
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started_at
+
+    @property
+    def revisions_per_second(self) -> float:
+        return self.revisions_done / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def bytes_per_second(self) -> float:
+        return self.bytes_downloaded / self.elapsed if self.elapsed > 0 else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.revisions_done}/{self.revisions_total} revisions "
+            f"({self.revisions_failed} failed, {self.revisions_per_second:.1f}/s), "
+            f"{self.files_downloaded} files ({self.downloads_failed} failed), "
+            f"{self.bytes_downloaded / 1e6:.1f} MB "
+            f"({self.bytes_per_second / 1e6:.1f} MB/s)"
+        )
 
 
 async def get_all_snap_content(
@@ -63,27 +385,49 @@ async def get_all_snap_content(
     output_dir: pathlib.Path | str,
     start_revision: int = 1,
     with_snap_files: bool = False,
-):
+    arch: str = "amd64",
+    batch_size: int = 50,
+    max_concurrency: int = 4,
+    max_downloads: int = 4,
+    progress: Callable[[ScrapeStats], None] | None = None,
+    use_deltas: bool = False,
+) -> ScrapeStats:
     """
     Asynchronously fetches and downloads all content for a specified snap package across multiple revisions.
 
     This function retrieves metadata for each revision of a snap package and optionally downloads
     the snap files themselves. All content is organized into directories by revision number.
 
+    Revision metadata is requested in batches of ``batch_size`` revisions, with up to
+    ``max_concurrency`` batches in flight. Downloads run in a separate pool of
+    ``max_downloads`` workers, so metadata for later revisions is fetched while earlier
+    revisions are still downloading.
+
+    With ``use_deltas``, the store is asked for deltas and a revision is rebuilt from a delta
+    against an already downloaded revision when one is available (see
+    :func:`download_snap_revision`).
+
     Parameters:
         snap_client (SnapClient): Initialized Snap client instance for API interactions.
         snap_name (str): Name of the snap package to process.
         output_dir (pathlib.Path | str): Directory where snap content will be saved.
         start_revision (int, optional): First revision to process. Defaults to 1.
         with_snap_files (bool, optional): Whether to download the actual snap package files. Defaults to False.
+        arch (str, optional): Architecture to retrieve revisions for. Defaults to "amd64".
+        batch_size (int, optional): Number of revisions requested from the store at once. Defaults to 50.
+        max_concurrency (int, optional): Maximum number of metadata requests in flight. Defaults to 4.
+        max_downloads (int, optional): Maximum number of concurrent snap file downloads. Defaults to 4.
+        progress (Callable[[ScrapeStats], None], optional): Called after every metadata batch and download.
+        use_deltas (bool, optional): Whether to download deltas between revisions when possible. Defaults to False.
 
     Returns:
-        None
+        ScrapeStats: Counters and throughput for the run.
 
     Notes:
         - Creates a directory structure where each revision has its own subdirectory
         - Saves metadata as data.json in each revision directory
         - When with_snap_files=True, also downloads the snap package file for each revision
+        - Revisions that are not available for ``arch`` are counted as failed
 
     """
     if not isinstance(output_dir, pathlib.Path):
@@ -96,34 +440,111 @@ async def get_all_snap_content(
         snap_name, fields=["name", "channel-map", "revision"]
     )
     current_snap_channel = get_highest_revision(current_snap_info.channel_map)
+    last_revision = current_snap_channel.revision
 
-    print(
-        f"Processing snap {snap_name} from revision {start_revision} to {current_snap_channel.revision}"
+    logger.info(
+        "Processing snap %s from revision %s to %s",
+        snap_name,
+        start_revision,
+        last_revision,
     )
 
-    for revision in range(1, current_snap_channel.revision + 1):
-        print(f"Processing revision {revision}")
-        revision_dir = output_dir / str(revision)
-        revision_dir.mkdir(exist_ok=True)
-        # get snap revision info
-        snap_revision_info = await snap_client.store.get_snap_revision_info(
-            snap_name, revision, arch="amd64", fields=VALID_SNAP_REFRESH_FIELDS
-        )
-
-        snap_revision_data = snap_revision_info.results[0]
-
-        with open(revision_dir / "data.json", "w") as f:
-            f.write(snap_revision_data.model_dump_json(indent=2))
-
-        # download snap revision
-        snap_revision_download = snap_revision_data.snap.download.url
-
-        # download the file
-        snap_revision_download_path = (
-            revision_dir / snap_revision_download.split("/")[-1]
-        )
+    stats = ScrapeStats(revisions_total=max(0, last_revision - start_revision + 1))
+
+    def report() -> None:
+        if progress is not None:
+            progress(stats)
+
+    metadata_limit = asyncio.Semaphore(max_concurrency)
+    downloads: asyncio.Queue = asyncio.Queue(maxsize=max_downloads * 2)
+    # snap files held locally, by revision, used as delta sources
+    local_revisions: dict[int, pathlib.Path] = {}
+    accept_delta_formats = delta_formats_available() if use_deltas else None
+
+    async def fetch_batch(from_revision: int, to_revision: int) -> None:
+        async with metadata_limit:
+            snap_revision_info = await snap_client.store.get_many_snap_revision_info(
+                snap_name,
+                from_revision,
+                to_revision,
+                arch=arch,
+                fields=VALID_SNAP_REFRESH_FIELDS,
+                accept_delta_formats=accept_delta_formats,
+            )
 
-        if with_snap_files:
-            await download_snap_file(
-                snap_client, snap_revision_download, snap_revision_download_path
+        for snap_revision_data in snap_revision_info.results:
+            if snap_revision_data.is_error or snap_revision_data.snap is None:
+                stats.revisions_failed += 1
+                continue
+
+            revision_dir = output_dir / str(snap_revision_data.snap.revision)
+            revision_dir.mkdir(exist_ok=True)
+            with open(revision_dir / "data.json", "w") as f:
+                f.write(snap_revision_data.model_dump_json(indent=2))
+            stats.revisions_done += 1
+
+            download = snap_revision_data.snap.download
+            if with_snap_files and download is not None:
+                # download the file
+                snap_revision_download_path = revision_dir / download.url.split("/")[-1]
+                await downloads.put(
+                    (
+                        snap_revision_data.snap.revision,
+                        download,
+                        snap_revision_download_path,
+                    )
+                )
+
+        logger.debug("Processed revisions %s-%s: %s", from_revision, to_revision, stats)
+        report()
+
+    async def download_worker() -> None:
+        while True:
+            revision, download, snap_revision_download_path = await downloads.get()
+            try:
+                stats.bytes_downloaded += await download_snap_revision(
+                    snap_client,
+                    download,
+                    snap_revision_download_path,
+                    local_revisions=local_revisions if use_deltas else None,
+                )
+                stats.files_downloaded += 1
+                local_revisions[revision] = snap_revision_download_path
+            except (httpx.HTTPError, DownloadVerificationError) as e:
+                logger.warning("Failed to download %s: %s", download.url, e)
+                stats.downloads_failed += 1
+            finally:
+                downloads.task_done()
+            report()
+
+    async def fetch_all() -> None:
+        await asyncio.gather(
+            *(
+                fetch_batch(
+                    from_revision, min(from_revision + batch_size - 1, last_revision)
+                )
+                for from_revision in range(
+                    start_revision, last_revision + 1, batch_size
+                )
             )
+        )
+        await downloads.join()
+
+    workers = [asyncio.create_task(download_worker()) for _ in range(max_downloads)]
+    main = asyncio.create_task(fetch_all())
+    try:
+        # a worker only exits on an unexpected error; surface it instead of waiting
+        # forever on a queue nobody drains
+        await asyncio.wait([main, *workers], return_when=asyncio.FIRST_COMPLETED)
+        for worker in workers:
+            if worker.done():
+                worker.result()
+        await main
+    finally:
+        main.cancel()
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(main, *workers, return_exceptions=True)
+
+    logger.info("Finished snap %s: %s", snap_name, stats)
+    return stats
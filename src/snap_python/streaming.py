@@ -0,0 +1,94 @@
+import codecs
+import json
+from typing import Any, AsyncIterable, AsyncIterator
+
+_WHITESPACE = " \t\n\r"
+
+
+class StreamingJSONError(ValueError):
+    """Raised when a streamed JSON document does not have the expected shape."""
+
+
+async def iter_json_array_items(
+    chunks: AsyncIterable[bytes], key: str
+) -> AsyncIterator[Any]:
+    """Incrementally decode the items of the JSON array stored under ``key``.
+
+    Items are yielded as soon as they are complete in the byte stream, so only the item
+    being decoded (plus one chunk) is held in memory, instead of the whole document.
+
+    The array is located by the first occurrence of ``"<key>":`` in the document, which is
+    sufficient for API responses with a known layout, such as the
+    ``_embedded.clickindex:package`` list of the store's ``/api/v1/snaps/names`` endpoint.
+    Everything after the array is ignored.
+
+    :param chunks: The raw bytes of the JSON document, e.g. ``response.aiter_bytes()``.
+    :type chunks: AsyncIterable[bytes]
+    :param key: The object key whose array value should be iterated.
+    :type key: str
+
+    :returns: An async iterator over the decoded array items.
+    :rtype: AsyncIterator[Any]
+
+    :raises StreamingJSONError: If the key is not found or its value is not a valid array.
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    marker = json.dumps(key)
+    buffer = ""
+    pos = 0
+    in_array = False
+    expect_item = True
+
+    async for chunk in chunks:
+        buffer = buffer[pos:] + utf8.decode(chunk)
+        pos = 0
+
+        if not in_array:
+            start = buffer.find(marker)
+            if start == -1:
+                # keep enough of the tail to match a marker split across chunks
+                pos = max(0, len(buffer) - len(marker))
+                continue
+            pos = start + len(marker)
+            while pos < len(buffer) and buffer[pos] in _WHITESPACE + ":":
+                pos += 1
+            if pos == len(buffer):
+                # the opening bracket has not arrived yet
+                pos = start
+                continue
+            if buffer[pos] != "[":
+                raise StreamingJSONError(f"Value of {key!r} is not an array")
+            pos += 1
+            in_array = True
+
+        while True:
+            while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+                pos += 1
+            if pos == len(buffer):
+                break
+            if buffer[pos] == "]":
+                return
+            if not expect_item:
+                if buffer[pos] != ",":
+                    raise StreamingJSONError(f"Malformed array under {key!r}")
+                pos += 1
+                expect_item = True
+                continue
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # the item is incomplete, wait for more bytes
+                break
+            if not isinstance(item, (dict, list, str)) and (
+                end == len(buffer) or buffer[end] not in _WHITESPACE + ",]"
+            ):
+                # a number may continue in the next chunk (e.g. "-0" then ".5")
+                break
+            yield item
+            pos = end
+            expect_item = False
+
+    if not in_array:
+        raise StreamingJSONError(f"Key {key!r} not found in document")
+    raise StreamingJSONError(f"Document ended inside the array under {key!r}")
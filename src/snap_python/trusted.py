@@ -0,0 +1,308 @@
+import contextvars
+import functools
+import inspect
+import types
+import typing
+from contextlib import contextmanager
+from typing import Annotated, Any, Iterator, Type
+
+import pydantic_core
+from pydantic import AliasChoices, AliasPath, BaseModel, TypeAdapter
+from pydantic.fields import FieldInfo
+
+_trusted_parsing: contextvars.ContextVar[bool] = contextvars.ContextVar(
+    "snap_python_trusted_parsing", default=False
+)
+
+
+@contextmanager
+def trusted_parsing(enabled: bool = True) -> Iterator[None]:
+    """Parse the responses of calls made inside the ``with`` block in trusted mode.
+
+    >>> with trusted_parsing():
+    ...     installed = await client.snaps.list_installed_snaps()
+
+    See :func:`view_json` for what trusted mode changes.
+    """
+    token = _trusted_parsing.set(enabled)
+    try:
+        yield
+    finally:
+        _trusted_parsing.reset(token)
+
+
+def trusted_parsing_enabled() -> bool:
+    """Return whether :func:`trusted_parsing` is active in the current context."""
+    return _trusted_parsing.get()
+
+
+# how a field's raw value is turned into its attribute value
+_VIEW = 0  # a nested model, wrapped in a ModelView
+_VIEW_LIST = 1  # a list of nested models, each wrapped in a ModelView
+_ADAPTER = 2  # anything else, validated with the field's TypeAdapter
+
+
+_JSON_SCALARS = (str, int, float, bool)
+
+_MISSING = object()
+
+
+class _FieldPlan:
+    __slots__ = ("paths", "kind", "model", "adapter", "field", "passthrough")
+
+    def __init__(
+        self,
+        paths: tuple[tuple[str | int, ...], ...],
+        kind: int,
+        model,
+        adapter,
+        field,
+        passthrough=(),
+    ):
+        self.paths = paths
+        self.kind = kind
+        self.model = model
+        self.adapter = adapter
+        self.field: FieldInfo = field
+        # decoded JSON values of exactly these types are already valid as they are
+        self.passthrough: tuple[type, ...] = passthrough
+
+
+def _input_paths(name: str, field: FieldInfo) -> tuple[tuple[str | int, ...], ...]:
+    """Return the paths pydantic looks the field up at, in order of preference."""
+    alias = field.validation_alias
+    choices = alias.choices if isinstance(alias, AliasChoices) else [alias]
+    paths = []
+    for choice in choices:
+        if isinstance(choice, AliasPath):
+            paths.append(tuple(choice.path))
+        elif isinstance(choice, str):
+            paths.append((choice,))
+    if paths:
+        return tuple(paths)
+    if field.alias is not None:
+        return ((field.alias,),)
+    return ((name,),)
+
+
+def _lookup(data: Any, path: tuple[str | int, ...]) -> Any:
+    """Walk ``path`` through decoded JSON like ``AliasPath`` does, or return _MISSING."""
+    for key in path:
+        if isinstance(data, dict) and isinstance(key, str):
+            if key not in data:
+                return _MISSING
+        elif isinstance(data, list) and isinstance(key, int):
+            if not -len(data) <= key < len(data):
+                return _MISSING
+        else:
+            return _MISSING
+        data = data[key]
+    return data
+
+
+def _single_model(annotation: Any) -> Type[BaseModel] | None:
+    """Return ``M`` if ``annotation`` is a model class ``M`` or ``M | None``."""
+    if typing.get_origin(annotation) in (typing.Union, types.UnionType):
+        args = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+        if len(args) != 1:
+            return None
+        annotation = args[0]
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation
+    return None
+
+
+def _passthrough_types(field: FieldInfo) -> tuple[type, ...]:
+    if field.metadata:
+        return ()
+    annotation = field.annotation
+    if typing.get_origin(annotation) in (typing.Union, types.UnionType):
+        args = typing.get_args(annotation)
+    else:
+        args = (annotation,)
+    args = tuple(arg for arg in args if arg is not type(None))
+    if not all(arg in _JSON_SCALARS for arg in args):
+        return ()
+    return args
+
+
+@functools.cache
+def _field_plans(model: Type[BaseModel]) -> dict[str, _FieldPlan]:
+    plans = {}
+    for name, field in model.model_fields.items():
+        paths = _input_paths(name, field)
+        nested = _single_model(field.annotation)
+        if nested is not None:
+            plans[name] = _FieldPlan(paths, _VIEW, nested, None, field)
+            continue
+        if typing.get_origin(field.annotation) is list:
+            item = _single_model(typing.get_args(field.annotation)[0])
+            if item is not None:
+                plans[name] = _FieldPlan(paths, _VIEW_LIST, item, None, field)
+                continue
+        annotation = field.annotation
+        if field.metadata:
+            annotation = Annotated[(annotation, *field.metadata)]
+        plans[name] = _FieldPlan(
+            paths,
+            _ADAPTER,
+            None,
+            TypeAdapter(annotation),
+            field,
+            _passthrough_types(field),
+        )
+    return plans
+
+
+class ModelView:
+    """Read-only stand-in for a pydantic model, built from already decoded JSON.
+
+    A field is only converted when it is first read, and the result is kept. Nested models
+    are views too, so reading ``view.result[0].name`` converts one string instead of the
+    whole document. Properties and methods of the model class work on the view, and
+    ``model_*`` attributes (``model_dump``, ``model_copy``, ...) use the full model from
+    :meth:`to_model`.
+
+    Custom field and model validators are not run, so views must only be built from
+    payloads that a well-behaved snapd or store produced.
+    """
+
+    # resolved fields are stored in __dict__, so reading them again skips __getattr__
+    __slots__ = ("_model", "_data", "_plans", "__dict__")
+
+    def __init__(self, model: Type[BaseModel], data: dict):
+        self._model = model
+        self._data = data
+        self._plans = _field_plans(model)
+
+    @property
+    def model_class(self) -> Type[BaseModel]:
+        return self._model
+
+    def to_model(self) -> BaseModel:
+        """Validate the underlying data into a real instance of the model."""
+        return self._model.model_validate(self._data)
+
+    def _resolve_missing(self, name: str, plan: _FieldPlan) -> Any:
+        if plan.field.is_required():
+            # pydantic raises the same error the full validation would, or finds the value
+            # somewhere the paths above do not cover
+            return getattr(self.to_model(), name)
+        return plan.field.get_default(call_default_factory=True)
+
+    def __getattr__(self, name: str) -> Any:
+        if name[0] == "_":
+            # fields are never private, and copy/pickle probe dunders before slots are set
+            raise AttributeError(name)
+        plan = self._plans.get(name)
+        if plan is not None:
+            data = self._data
+            for path in plan.paths:
+                if len(path) == 1:
+                    # plain (alias) keys, by far the most common case
+                    raw = data.get(path[0], _MISSING)
+                else:
+                    raw = _lookup(data, path)
+                if raw is not _MISSING:
+                    break
+            else:
+                value = self.__dict__[name] = self._resolve_missing(name, plan)
+                return value
+
+            if raw is None or type(raw) in plan.passthrough:
+                value = raw
+            elif plan.kind == _VIEW:
+                value = ModelView(plan.model, raw)
+            elif plan.kind == _VIEW_LIST:
+                model = plan.model
+                value = [ModelView(model, item) for item in raw]
+            else:
+                value = plan.adapter.validate_python(raw)
+            self.__dict__[name] = value
+            return value
+
+        if name.startswith("model_"):
+            return getattr(self.to_model(), name)
+        attribute = inspect.getattr_static(self._model, name)
+        if isinstance(attribute, property):
+            return attribute.fget(self)
+        if isinstance(attribute, types.FunctionType):
+            return types.MethodType(attribute, self)
+        return getattr(self._model, name)
+
+    def __len__(self) -> int:
+        length = getattr(self._model, "__len__", None)
+        if length is None:
+            raise TypeError(f"object of type {self._model.__name__} has no len()")
+        return length(self)
+
+    def __bool__(self) -> bool:
+        # like a model instance: truthy unless the model class defines its own length
+        length = getattr(self._model, "__len__", None)
+        return True if length is None else bool(length(self))
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, ModelView):
+            return self._model is other._model and self._data == other._data
+        if isinstance(other, BaseModel):
+            return self.to_model() == other
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"ModelView[{self._model.__name__}]"
+
+
+def view_json(model: Type[BaseModel], data: bytes | str) -> ModelView:
+    """Decode ``data`` and return a lazily validated :class:`ModelView` of ``model``.
+
+    This is the trusted counterpart of ``model.model_validate_json``: decoding is done once
+    by pydantic-core, and each field is validated on first access with a cached
+    ``TypeAdapter``. It is fastest when callers only read a few fields of large responses.
+
+    :param model: The model the data is expected to match.
+    :type model: Type[BaseModel]
+    :param data: The raw JSON document.
+    :type data: bytes | str
+
+    :returns: A view that behaves like a read-only instance of ``model``.
+    :rtype: ModelView
+    """
+    return ModelView(model, pydantic_core.from_json(data))
+
+
+def as_model(value: Any) -> Any:
+    """Return the real model behind ``value`` if it is a :class:`ModelView`, else ``value``.
+
+    Lists of views, as read from list fields of a view, are converted item by item. Use this
+    before storing a parsed value in a model or other long-lived structure: pydantic
+    constructors do not accept views in place of models.
+
+    :param value: A model, a view of one, a list of either, or any other value.
+    :type value: Any
+
+    :returns: ``value``, with views validated into models.
+    :rtype: Any
+    """
+    if isinstance(value, ModelView):
+        return value.to_model()
+    if isinstance(value, list) and any(isinstance(item, ModelView) for item in value):
+        return [as_model(item) for item in value]
+    return value
+
+
+def is_model_instance(
+    value: Any, model: Type[BaseModel] | tuple[Type[BaseModel], ...]
+) -> bool:
+    """Return whether ``value`` is an instance of ``model``, or a view of one.
+
+    :param value: The value to check.
+    :type value: Any
+    :param model: The model class, or a tuple of model classes.
+    :type model: Type[BaseModel] | tuple[Type[BaseModel], ...]
+
+    :returns: True if ``value`` is, or stands in for, an instance of ``model``.
+    :rtype: bool
+    """
+    if isinstance(value, ModelView):
+        return issubclass(value.model_class, model)
+    return isinstance(value, model)
@@ -0,0 +1,157 @@
+import asyncio
+import mmap
+import os
+import uuid
+from pathlib import Path
+from typing import IO, AsyncIterator, Callable
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+UploadProgressCallback = Callable[[int, int], None]
+
+
+def _form_value(value) -> str:
+    # match how httpx encodes form data
+    if value is True:
+        return "true"
+    if value is False:
+        return "false"
+    if value is None:
+        return ""
+    return str(value)
+
+
+class SnapUpload:
+    """Streaming ``multipart/form-data`` body for sideloading one or more snap files.
+
+    Files are read in ``chunk_size`` pieces while the request is sent, so memory use does
+    not grow with the size of the snap. Each iteration re-opens the files from the start,
+    which makes the body safe to resend when the request is retried. Call :meth:`close`
+    (or use the upload as a context manager) to release any file descriptors that are
+    still open if a request is abandoned part way through.
+
+    :param filenames: Paths of the snap files to upload. Each file is sent as a ``snap`` part.
+    :type filenames: list[str | os.PathLike]
+    :param fields: Form fields to send before the files (e.g. action, dangerous).
+    :type fields: dict, optional
+    :param chunk_size: Number of bytes read from disk at a time.
+    :type chunk_size: int, optional
+    :param use_mmap: Read the files through ``mmap`` instead of buffered reads.
+    :type use_mmap: bool, optional
+    :param progress: Called with ``(bytes_sent, total_bytes)`` after every chunk.
+    :type progress: Callable[[int, int], None], optional
+
+    :raises FileNotFoundError: If one of the files does not exist.
+    """
+
+    def __init__(
+        self,
+        filenames: list[str | os.PathLike],
+        fields: dict | None = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        use_mmap: bool = False,
+        progress: UploadProgressCallback | None = None,
+    ) -> None:
+        self.paths = [Path(filename) for filename in filenames]
+        for path in self.paths:
+            if not path.exists():
+                raise FileNotFoundError(f"File {path} does not exist")
+        self.fields = fields or {}
+        self.chunk_size = chunk_size
+        self.use_mmap = use_mmap
+        self.progress = progress
+        self.boundary = uuid.uuid4().hex
+        self._open_files: list[IO[bytes]] = []
+
+        self._preamble = b"".join(
+            self._part_header(f'Content-Disposition: form-data; name="{name}"')
+            + _form_value(value).encode()
+            + b"\r\n"
+            for name, value in self.fields.items()
+        )
+        self._file_headers = [
+            self._part_header(
+                f'Content-Disposition: form-data; name="snap"; filename="{path.name}"',
+                "Content-Type: application/octet-stream",
+            )
+            for path in self.paths
+        ]
+        self._epilogue = f"--{self.boundary}--\r\n".encode()
+
+    def _part_header(self, *lines: str) -> bytes:
+        return (
+            f"--{self.boundary}\r\n" + "".join(f"{line}\r\n" for line in lines) + "\r\n"
+        ).encode()
+
+    @property
+    def content_type(self) -> str:
+        return f"multipart/form-data; boundary={self.boundary}"
+
+    @property
+    def content_length(self) -> int:
+        """Size of the whole request body, in bytes."""
+        return (
+            len(self._preamble)
+            + sum(len(header) + 2 for header in self._file_headers)
+            + sum(path.stat().st_size for path in self.paths)
+            + len(self._epilogue)
+        )
+
+    @property
+    def headers(self) -> dict[str, str]:
+        return {
+            "Content-Type": self.content_type,
+            "Content-Length": str(self.content_length),
+        }
+
+    async def _read_file(self, path: Path) -> AsyncIterator[bytes]:
+        f = open(path, "rb")
+        self._open_files.append(f)
+        try:
+            if self.use_mmap and path.stat().st_size > 0:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    for offset in range(0, len(mapped), self.chunk_size):
+                        # slicing copies the pages into bytes and may fault them in from
+                        # disk, so it runs off the event loop like the buffered reads
+                        yield await asyncio.to_thread(
+                            mapped.__getitem__, slice(offset, offset + self.chunk_size)
+                        )
+            else:
+                while chunk := await asyncio.to_thread(f.read, self.chunk_size):
+                    yield chunk
+        finally:
+            f.close()
+            if f in self._open_files:
+                self._open_files.remove(f)
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        total = self.content_length
+        sent = 0
+
+        def report(chunk: bytes) -> bytes:
+            nonlocal sent
+            sent += len(chunk)
+            if self.progress is not None:
+                self.progress(sent, total)
+            return chunk
+
+        if self._preamble:
+            yield report(self._preamble)
+        for path, header in zip(self.paths, self._file_headers):
+            yield report(header)
+            async for chunk in self._read_file(path):
+                yield report(chunk)
+            yield report(b"\r\n")
+        yield report(self._epilogue)
+
+    def close(self) -> None:
+        """Close any file still open by an interrupted upload."""
+        for f in self._open_files:
+            f.close()
+        self._open_files.clear()
+
+    def __enter__(self) -> "SnapUpload":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
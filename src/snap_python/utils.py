@@ -1,8 +1,10 @@
 from abc import ABC, abstractmethod
 
 import httpx
+from pydantic import BaseModel
 
-from snap_python.schemas.changes import ChangesResponse
+from snap_python.schemas.changes import ChangesListResponse, ChangesResponse
+from snap_python.trusted import is_model_instance
 
 
 class SnapdAPIError(Exception):
@@ -22,23 +24,37 @@ class AbstractSnapsClient(ABC):  # pragma: no cover
     async def request_raw(self, method: str, endpoint: str, **kwargs) -> httpx.Response:
         pass
 
+    @abstractmethod
+    def parse_json(self, model: type[BaseModel], data: bytes | str) -> BaseModel:
+        pass
+
     @abstractmethod
     async def get_changes_by_id(self, change_id: str) -> ChangesResponse:
         pass
 
+    @abstractmethod
+    async def wait_for_change(
+        self, change_id: str, action: str | None = None
+    ) -> ChangesResponse:
+        pass
+
 
-def going_to_reload_daemon(changes: ChangesResponse | None) -> bool:
+def going_to_reload_daemon(
+    changes: ChangesResponse | ChangesListResponse | None,
+) -> bool:
     """
     Determines if a daemon reload is required based on the provided changes.
 
-    :param changes: An instance of ChangesResponse or None.
-    :type changes: ChangesResponse | None
+    :param changes: An instance of ChangesResponse, ChangesListResponse or None.
+    :type changes: ChangesResponse | ChangesListResponse | None
 
     :returns: True if a daemon reload or restart is required, False otherwise.
     :rtype: bool
     """
 
-    if changes is None or not isinstance(changes, ChangesResponse):
+    if changes is None or not is_model_instance(
+        changes, (ChangesResponse, ChangesListResponse)
+    ):
         return False
 
     if changes.maintenance and changes.maintenance.kind in [
@@ -0,0 +1,52 @@
+import pytest
+
+from benchmarks.suite import (
+    BENCHMARKS,
+    POLLS_PER_CHANGE,
+    BenchmarkEnvironment,
+    BenchmarkResult,
+    check_thresholds,
+    load_thresholds,
+    run_benchmark,
+)
+
+
+@pytest.mark.asyncio
+async def test_every_benchmark_runs_against_the_fake_servers():
+    async with BenchmarkEnvironment() as env:
+        for name in BENCHMARKS:
+            result = await run_benchmark(env, name, iterations=1, warmup=0)
+            assert result.iterations == 1
+
+        assert env.snapd_uds.requests_served > 0
+        assert env.snapd_tcp.requests_served > 0
+        assert env.store.requests_served > 0
+
+
+@pytest.mark.asyncio
+async def test_fake_snapd_change_becomes_ready():
+    async with BenchmarkEnvironment() as env:
+        change_id = env.next_change_id()
+        polls = [
+            await env.uds_client.get_changes_by_id(change_id)
+            for _ in range(POLLS_PER_CHANGE)
+        ]
+
+    assert [change.ready for change in polls] == [False] * (POLLS_PER_CHANGE - 1) + [
+        True
+    ]
+    assert (
+        polls[0].result.overall_progress.done < polls[-1].result.overall_progress.done
+    )
+
+
+def test_thresholds_cover_every_benchmark():
+    thresholds = load_thresholds()
+
+    assert set(thresholds) == set(BENCHMARKS)
+    slow = BenchmarkResult(
+        name="store_find", iterations=1, total=10.0, mean=10.0, p50=10.0, p95=10.0
+    )
+    assert check_thresholds([slow], thresholds) == [
+        f"store_find: 0.1 ops/s is below the threshold of {thresholds['store_find']:.1f} ops/s"
+    ]
@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+
+from snap_python.cache import SingleFlight, TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_ttl_cache_expires():
+    clock = FakeClock()
+    cache = TTLCache(ttl=10, clock=clock)
+    cache.set("a", 1)
+
+    assert cache.get("a") == 1
+    clock.now = 10
+    assert cache.get("a") is None
+    assert "a" not in cache
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(ttl=10, maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert "a" in cache
+    assert "b" not in cache
+    assert "c" in cache
+    assert len(cache) == 2
+
+
+def test_ttl_cache_invalidate():
+    cache = TTLCache(ttl=10)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.invalidate("a")
+    assert "a" not in cache
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_ttl_cache_rejects_bad_arguments():
+    with pytest.raises(ValueError):
+        TTLCache(ttl=0)
+    with pytest.raises(ValueError):
+        TTLCache(ttl=1, maxsize=0)
+
+
+@pytest.mark.asyncio
+async def test_single_flight_shares_in_flight_fetch():
+    single_flight = SingleFlight()
+    calls = 0
+    release = asyncio.Event()
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return calls
+
+    tasks = [asyncio.create_task(single_flight.do("key", fetch)) for _ in range(5)]
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(*tasks) == [1] * 5
+    assert len(single_flight) == 0
+    assert await single_flight.do("key", fetch) == 2
+
+
+@pytest.mark.asyncio
+async def test_single_flight_propagates_errors():
+    single_flight = SingleFlight()
+
+    async def fetch():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        await single_flight.do("key", fetch)
+    assert len(single_flight) == 0
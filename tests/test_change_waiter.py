@@ -0,0 +1,282 @@
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock
+
+import httpx
+import pytest
+
+from snap_python.components.changes import ChangeWaiter
+from snap_python.schemas.changes import ChangesResponse, ChangesResult
+from snap_python.trusted import view_json
+from snap_python.utils import SnapdAPIError
+
+
+def make_change(ready: bool, err: str | None = None) -> ChangesResponse:
+    return ChangesResponse.model_validate(
+        {
+            "type": "sync",
+            "status-code": 200,
+            "status": "OK",
+            "result": {
+                "id": "42",
+                "kind": "install-snap",
+                "summary": 'Install "hello-world" snap',
+                "status": "Done" if ready else "Doing",
+                "tasks": [],
+                "ready": ready,
+                "spawn-time": "2024-11-01T12:00:00.000000000Z",
+                "err": err,
+            },
+        }
+    )
+
+
+def make_notices_response(*last_repeated: str) -> MagicMock:
+    notices = [
+        {
+            "id": str(i),
+            "user-id": None,
+            "type": "change-update",
+            "key": "42",
+            "first-occurred": "2024-11-01T12:00:00.000000001Z",
+            "last-occurred": value,
+            "last-repeated": value,
+            "occurrences": 1,
+            "last-data": {"kind": "install-snap"},
+        }
+        for i, value in enumerate(last_repeated)
+    ]
+    response = MagicMock()
+    response.content = json.dumps(
+        {"type": "sync", "status-code": 200, "status": "OK", "result": notices}
+    ).encode()
+    return response
+
+
+@pytest.fixture
+def snapd_client():
+    client = MagicMock()
+    client.request = AsyncMock()
+    client.get_changes_by_id = AsyncMock()
+    client.parse_json = lambda model, data: model.model_validate_json(data)
+    return client
+
+
+@pytest.mark.asyncio
+async def test_wait_uses_notices(snapd_client):
+    snapd_client.request.side_effect = [
+        make_notices_response("2024-11-01T12:00:00.000000001Z"),
+        make_notices_response("2024-11-01T12:00:01.123456789Z"),
+    ]
+    snapd_client.get_changes_by_id.side_effect = [
+        make_change(ready=False),
+        make_change(ready=True),
+    ]
+    waiter = ChangeWaiter(snapd_client)
+
+    changes = await waiter.wait("42")
+
+    assert changes.ready
+    assert waiter.notices_supported
+    _, kwargs = snapd_client.request.call_args
+    assert kwargs["params"] == {
+        "types": "change-update",
+        "keys": "42",
+        "after": "2024-11-01T12:00:00.000000001Z",
+        "timeout": "30s",
+    }
+
+
+@pytest.mark.asyncio
+async def test_watch_follows_progress_without_notices(snapd_client):
+    # snapd records no notice while tasks make progress, so every long-poll times out
+    snapd_client.request.side_effect = [
+        make_notices_response("2024-11-01T12:00:00.000000001Z"),
+        make_notices_response(),
+        make_notices_response(),
+    ]
+    snapd_client.get_changes_by_id.side_effect = [
+        make_change(ready=False),
+        make_change(ready=False),
+        make_change(ready=True),
+    ]
+    waiter = ChangeWaiter(snapd_client, min_poll_interval=0.05, poll_backoff=2)
+
+    changes = [change async for change in waiter.watch("42")]
+
+    assert [change.ready for change in changes] == [False, False, True]
+    timeouts = [
+        call.kwargs["params"]["timeout"]
+        for call in snapd_client.request.call_args_list[1:]
+    ]
+    assert timeouts == ["0.05s", "0.1s"]
+
+
+@pytest.mark.asyncio
+async def test_wait_falls_back_to_polling(snapd_client):
+    not_found = httpx.Response(
+        status_code=404, request=httpx.Request("GET", "http://localhost/v2/notices")
+    )
+    snapd_client.request.side_effect = httpx.HTTPStatusError(
+        "Not Found", request=not_found.request, response=not_found
+    )
+    snapd_client.get_changes_by_id.side_effect = [
+        make_change(ready=False),
+        make_change(ready=False),
+        make_change(ready=True),
+    ]
+    waiter = ChangeWaiter(snapd_client, min_poll_interval=0)
+
+    changes = await waiter.wait("42")
+
+    assert changes.ready
+    assert not waiter.notices_supported
+    assert snapd_client.request.await_count == 1
+    assert snapd_client.get_changes_by_id.await_count == 3
+
+
+def make_status_error(status_code: int) -> httpx.HTTPStatusError:
+    response = httpx.Response(
+        status_code=status_code,
+        request=httpx.Request("GET", "http://localhost/v2/notices"),
+    )
+    return httpx.HTTPStatusError("error", request=response.request, response=response)
+
+
+@pytest.mark.asyncio
+async def test_transient_notice_error_keeps_notices(snapd_client):
+    snapd_client.request.side_effect = [
+        make_status_error(503),
+        make_notices_response("2024-11-01T12:00:01.123456789Z"),
+    ]
+    snapd_client.get_changes_by_id.side_effect = [
+        make_change(ready=False),
+        make_change(ready=True),
+    ]
+    waiter = ChangeWaiter(snapd_client, min_poll_interval=0)
+
+    changes = await waiter.wait("42")
+
+    assert changes.ready
+    assert waiter.notices_supported
+    assert snapd_client.request.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_wait_raises_change_error(snapd_client):
+    snapd_client.get_changes_by_id.return_value = make_change(
+        ready=False, err="cannot install"
+    )
+    waiter = ChangeWaiter(snapd_client, use_notices=False)
+
+    with pytest.raises(SnapdAPIError, match="Error in snap install: cannot install"):
+        await waiter.wait("42", action="install")
+
+
+@pytest.mark.asyncio
+async def test_watch_yields_until_ready(snapd_client):
+    snapd_client.get_changes_by_id.side_effect = [
+        make_change(ready=False),
+        make_change(ready=True),
+    ]
+    waiter = ChangeWaiter(snapd_client, use_notices=False, min_poll_interval=0)
+
+    changes = [change async for change in waiter.watch("42")]
+
+    assert [change.ready for change in changes] == [False, True]
+
+
+def make_changes_list_response(*changes: tuple[str, bool]) -> MagicMock:
+    results = []
+    for change_id, ready in changes:
+        result = make_change(ready=ready).result.model_dump(by_alias=True, mode="json")
+        result["id"] = change_id
+        results.append(result)
+    response = MagicMock()
+    response.content = json.dumps(
+        {"type": "sync", "status-code": 200, "status": "OK", "result": results}
+    ).encode()
+    return response
+
+
+@pytest.mark.asyncio
+async def test_wait_many_uses_one_request_per_tick(snapd_client):
+    snapd_client.request.side_effect = [
+        make_changes_list_response(("1", False), ("2", True), ("3", False)),
+        make_changes_list_response(("1", True), ("2", True), ("3", False)),
+        make_changes_list_response(("1", True), ("2", True), ("3", True)),
+    ]
+    waiter = ChangeWaiter(snapd_client, use_notices=False, min_poll_interval=0)
+
+    changes = await waiter.wait_many(["1", "2", "3"])
+
+    assert [change.result.id for change in changes] == ["1", "2", "3"]
+    assert all(change.ready for change in changes)
+    assert snapd_client.request.await_count == 3
+    snapd_client.get_changes_by_id.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_wait_many_with_trusted_views(snapd_client):
+    snapd_client.parse_json = view_json
+    response = make_changes_list_response(("1", False), ("2", True))
+    body = json.loads(response.content)
+    body["maintenance"] = {"kind": "daemon-restart", "message": "daemon is restarting"}
+    response.content = json.dumps(body).encode()
+    snapd_client.request.side_effect = [
+        response,
+        make_changes_list_response(("1", True), ("2", True)),
+    ]
+    waiter = ChangeWaiter(snapd_client, use_notices=False, min_poll_interval=0)
+
+    changes = await waiter.wait_many(["1", "2"])
+
+    assert all(isinstance(change, ChangesResponse) for change in changes)
+    assert all(isinstance(change.result, ChangesResult) for change in changes)
+    assert changes[1].maintenance.kind == "daemon-restart"
+
+
+@pytest.mark.asyncio
+async def test_as_completed_yields_in_completion_order(snapd_client):
+    snapd_client.request.side_effect = [
+        make_changes_list_response(("1", False), ("2", True)),
+        make_changes_list_response(("1", True), ("2", True)),
+    ]
+    waiter = ChangeWaiter(snapd_client, use_notices=False, min_poll_interval=0)
+
+    completed = [change.result.id async for change in waiter.as_completed(["1", "2"])]
+
+    assert completed == ["2", "1"]
+
+
+@pytest.mark.asyncio
+async def test_wait_many_unknown_change(snapd_client):
+    snapd_client.request.return_value = make_changes_list_response(("1", True))
+    snapd_client.get_changes_by_id.return_value = ChangesResponse.model_validate(
+        {
+            "type": "error",
+            "status-code": 404,
+            "status": "Not Found",
+            "result": {"message": 'cannot find change with id "99"'},
+        }
+    )
+    waiter = ChangeWaiter(snapd_client, use_notices=False)
+
+    changes = await waiter.wait_many(["1", "99"])
+
+    assert changes[1].status_code == 404
+    snapd_client.get_changes_by_id.assert_awaited_once_with("99")
+
+
+@pytest.mark.asyncio
+async def test_wait_many_fails_when_snapd_is_unreachable(snapd_client):
+    snapd_client.request.side_effect = httpx.ConnectError("socket gone")
+    waiter = ChangeWaiter(snapd_client, min_poll_interval=0)
+
+    with pytest.raises(httpx.ConnectError):
+        await asyncio.wait_for(waiter.wait_many(["1", "2"]), timeout=5)
+    with pytest.raises(httpx.ConnectError):
+        await asyncio.wait_for(
+            waiter.as_completed(["1"]).__anext__(),
+            timeout=5,
+        )
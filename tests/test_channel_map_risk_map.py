@@ -4,8 +4,11 @@ import pytest
 
 from snap_python.schemas.store.info import InfoResponse
 from snap_python.schemas.store.track import (
+    CompactRiskMap,
+    CompactTrackMap,
     SnapTrackInfo,
     TrackRiskMap,
+    channel_map_to_arch_track_map,
     channel_map_to_current_track_map,
 )
 
@@ -38,3 +41,156 @@ async def test_get_categories_success():
                 assert details.created_at is not None
                 assert details.released_at is not None
                 assert details.name is not None
+
+
+def reference_track_map(channel_map) -> dict[str, dict[str, TrackRiskMap]]:
+    """Build the track map by fully validating every model."""
+    track_map: dict[str, dict[str, dict]] = {}
+    for item in channel_map:
+        risks = track_map.setdefault(item.channel.track, {})
+        if not item.architectures:
+            continue
+        risks.setdefault(item.channel.risk, {})[item.channel.architecture] = (
+            SnapTrackInfo(
+                name=item.channel.name,
+                architecture=item.channel.architecture,
+                base=item.base or "unset",
+                confinement=item.confinement,
+                created_at=item.created_at,
+                released_at=item.channel.released_at,
+                revision=item.revision,
+                risk=item.channel.risk,
+                track=item.channel.track,
+                version=item.version or "unset",
+            )
+        )
+    return {
+        track: {
+            risk: TrackRiskMap.model_validate(arches) for risk, arches in risks.items()
+        }
+        for track, risks in track_map.items()
+    }
+
+
+@pytest.fixture
+def large_channel_map():
+    info_response = InfoResponse.model_validate_json(CONVERTERMULTI_JSON.read_bytes())
+    items = []
+    for track in ["latest", "1.0", "2.0"]:
+        for arch in ["amd64", "arm64", "riscv64"]:
+            for template in info_response.channel_map:
+                channel = template.channel.model_copy(
+                    update={"track": track, "architecture": arch}
+                )
+                items.append(template.model_copy(update={"channel": channel}))
+    return items
+
+
+def test_track_map_matches_validated_models(large_channel_map):
+    track_map = channel_map_to_current_track_map(large_channel_map)
+
+    assert track_map == reference_track_map(large_channel_map)
+    assert list(track_map) == ["latest", "1.0", "2.0"]
+    for risks in track_map.values():
+        for risk_map in risks.values():
+            assert risk_map.model_fields_set == {"amd64", "arm64", "riscv64"}
+            assert risk_map.architectures == ["amd64", "arm64", "riscv64"]
+
+
+def test_arch_track_map_is_the_reverse_index(large_channel_map):
+    track_map = channel_map_to_current_track_map(large_channel_map)
+    arch_map = channel_map_to_arch_track_map(large_channel_map)
+
+    assert list(arch_map) == ["amd64", "arm64", "riscv64"]
+    for arch, tracks in arch_map.items():
+        for track, risks in tracks.items():
+            for risk, details in risks.items():
+                assert details == getattr(track_map[track][risk], arch)
+
+
+def test_track_map_rejects_invalid_architectures(large_channel_map):
+    item = large_channel_map[0]
+    bad_item = item.model_copy(
+        update={"channel": item.channel.model_copy(update={"architecture": "m68k"})}
+    )
+
+    with pytest.raises(ValueError, match="Invalid architecture: m68k"):
+        channel_map_to_current_track_map([bad_item])
+
+
+def test_track_map_skips_items_without_architectures(large_channel_map):
+    items = [
+        large_channel_map[0].model_copy(update={"architectures": []}),
+        *large_channel_map[1:],
+    ]
+
+    track_map = channel_map_to_current_track_map(items)
+
+    assert track_map == reference_track_map(items)
+
+
+def test_track_map_keeps_tracks_without_architectures():
+    info_response = InfoResponse.model_validate_json(
+        (DATA_DIR / "snap_info_response_success.json").read_bytes()
+    )
+
+    assert channel_map_to_current_track_map(info_response.channel_map) == {"latest": {}}
+    compact = CompactTrackMap.from_channel_map(info_response.channel_map)
+    assert compact.to_track_map() == {"latest": {}}
+    assert "latest" in compact
+
+
+def test_risk_map_architectures_match_model_dump(large_channel_map):
+    track_map = channel_map_to_current_track_map(large_channel_map)
+    risk_map = track_map["latest"]["stable"]
+    risk_map.amd64 = None
+
+    assert risk_map.architectures == [
+        arch for arch, details in risk_map.model_dump().items() if details is not None
+    ]
+    assert risk_map.has_architecture("arm64")
+    assert not risk_map.has_architecture("amd64")
+    assert not risk_map.has_architecture("m68k")
+
+
+def test_compact_track_map_round_trip(large_channel_map):
+    track_map = channel_map_to_current_track_map(large_channel_map)
+
+    compact = CompactTrackMap.from_channel_map(large_channel_map)
+    assert compact == CompactTrackMap.from_track_map(track_map)
+    assert list(compact) == list(track_map)
+
+    exported = compact.to_track_map()
+    assert exported == track_map
+    for track, risks in track_map.items():
+        for risk, risk_map in risks.items():
+            assert exported[track][risk].model_fields_set == risk_map.model_fields_set
+            assert TrackRiskMap.from_compact(risk_map.to_compact()) == risk_map
+
+
+def test_compact_risk_map_queries(large_channel_map):
+    compact = CompactTrackMap.from_channel_map(large_channel_map)
+    risk_map = compact.get("latest", "stable")
+
+    assert risk_map.architectures == ["amd64", "arm64", "riscv64"]
+    assert risk_map.mask == 0b1000011
+    assert len(risk_map) == 3
+    assert "arm64" in risk_map
+    assert "s390x" not in risk_map
+    assert risk_map.get("arm64").to_model() == getattr(
+        channel_map_to_current_track_map(large_channel_map)["latest"]["stable"], "arm64"
+    )
+    assert risk_map.get("s390x") is None
+    assert compact.has_architecture("2.0", "stable", "riscv64")
+    assert not compact.has_architecture("3.0", "stable", "riscv64")
+    assert compact.get("latest", "not-a-risk") is None
+
+
+def test_compact_risk_map_rejects_invalid_architectures(large_channel_map):
+    info = CompactTrackMap.from_channel_map(large_channel_map)["latest"]["stable"].get(
+        "amd64"
+    )
+    info.architecture = "m68k"
+
+    with pytest.raises(ValueError, match="Invalid architecture: m68k"):
+        CompactRiskMap().add(info)
@@ -0,0 +1,35 @@
+import pytest
+
+from snap_python import delta
+
+
+@pytest.mark.asyncio
+async def test_apply_delta_unsupported_format(tmp_path):
+    with pytest.raises(delta.DeltaApplyError):
+        await delta.apply_delta(
+            "bsdiff", tmp_path / "a.snap", tmp_path / "a.delta", tmp_path / "b.snap"
+        )
+
+
+@pytest.mark.asyncio
+async def test_apply_delta_without_xdelta3(tmp_path, monkeypatch):
+    monkeypatch.setattr(delta, "find_xdelta3", lambda: None)
+
+    assert delta.delta_formats_available() == []
+    with pytest.raises(delta.DeltaApplyError):
+        await delta.apply_delta(
+            "xdelta3", tmp_path / "a.snap", tmp_path / "a.delta", tmp_path / "b.snap"
+        )
+
+
+@pytest.mark.asyncio
+async def test_apply_delta_reports_xdelta3_failure(tmp_path, monkeypatch):
+    fake_xdelta3 = tmp_path / "xdelta3"
+    fake_xdelta3.write_text("#!/bin/sh\necho 'bad delta' >&2\nexit 1\n")
+    fake_xdelta3.chmod(0o755)
+    monkeypatch.setattr(delta, "find_xdelta3", lambda: str(fake_xdelta3))
+
+    with pytest.raises(delta.DeltaApplyError, match="bad delta"):
+        await delta.apply_delta(
+            "xdelta3", tmp_path / "a.snap", tmp_path / "a.delta", tmp_path / "b.snap"
+        )
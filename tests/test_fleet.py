@@ -0,0 +1,101 @@
+import asyncio
+import pathlib
+
+import httpx
+import pytest
+
+from snap_python.client import SnapClient
+from snap_python.fleet import SnapFleet
+from snap_python.retry_policy import RetryPolicy
+
+TEST_DIR = pathlib.Path(__file__).parent
+DATA_DIR = TEST_DIR / "data"
+
+
+def make_fleet(hosts, max_concurrency=10, host_timeout=1.0, delays=None):
+    installed_snaps = (DATA_DIR / "installed_snaps.json").read_bytes()
+    delays = delays or {}
+    state = {"in_flight": 0, "max_in_flight": 0, "clients_created": 0}
+    store_client = httpx.AsyncClient()
+
+    def client_factory(host: str) -> SnapClient:
+        state["clients_created"] += 1
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            state["in_flight"] += 1
+            state["max_in_flight"] = max(state["max_in_flight"], state["in_flight"])
+            try:
+                await asyncio.sleep(delays.get(host, 0.01))
+            finally:
+                state["in_flight"] -= 1
+            if host == "http://broken:8181":
+                return httpx.Response(500, json={"result": {"message": "boom"}})
+            return httpx.Response(200, content=installed_snaps)
+
+        return SnapClient(
+            tcp_location=host,
+            retry_policy=RetryPolicy.disabled(),
+            store_client=store_client,
+            snapd_transport=httpx.MockTransport(handler),
+        )
+
+    fleet = SnapFleet(
+        hosts,
+        max_concurrency=max_concurrency,
+        host_timeout=host_timeout,
+        client_factory=client_factory,
+    )
+    return fleet, state
+
+
+@pytest.mark.asyncio
+async def test_fleet_runs_on_every_host_with_concurrency_cap():
+    hosts = [f"http://host-{i}:8181" for i in range(25)]
+    fleet, state = make_fleet(hosts, max_concurrency=4)
+
+    async with fleet:
+        results = [result async for result in fleet.list_installed_snaps()]
+
+    assert sorted(result.host for result in results) == sorted(hosts)
+    assert all(result.ok for result in results)
+    assert all(len(result.result) > 0 for result in results)
+    assert state["max_in_flight"] == 4
+    assert state["clients_created"] == 25
+
+
+@pytest.mark.asyncio
+async def test_fleet_reports_failures_and_timeouts():
+    hosts = ["http://ok:8181", "http://broken:8181", "http://slow:8181"]
+    fleet, _ = make_fleet(hosts, host_timeout=0.2, delays={"http://slow:8181": 5})
+
+    summary = await fleet.gather(lambda client: client.snaps.list_installed_snaps())
+    await fleet.aclose()
+
+    assert summary.succeeded == ["http://ok:8181"]
+    assert sorted(summary.failed) == ["http://broken:8181", "http://slow:8181"]
+    assert summary.failures["http://broken:8181"].startswith("HTTPStatusError")
+    assert summary.failures["http://slow:8181"].startswith("TimeoutError")
+
+
+@pytest.mark.asyncio
+async def test_fleet_results_stream_in_completion_order():
+    hosts = ["http://slow:8181", "http://fast:8181"]
+    fleet, _ = make_fleet(hosts, delays={"http://slow:8181": 0.2})
+
+    results = [result.host async for result in fleet.list_installed_snaps()]
+    await fleet.aclose()
+
+    assert results == ["http://fast:8181", "http://slow:8181"]
+
+
+@pytest.mark.asyncio
+async def test_fleet_reuses_clients_and_shares_store_client():
+    fleet = SnapFleet(["http://a:8181", "http://b:8181"])
+
+    assert fleet.client("http://a:8181") is fleet.client("http://a:8181")
+    assert (
+        fleet.client("http://a:8181").store.store_client
+        is fleet.client("http://b:8181").store.store_client
+    )
+
+    await fleet.aclose()
@@ -0,0 +1,107 @@
+import dataclasses
+import pathlib
+
+import httpx
+import pytest
+
+from snap_python.client import SnapClient
+from snap_python.schemas.snaps import (
+    InstalledSnapListResponse,
+    InstalledSnapRecordListResponse,
+    installed_snap_record_type,
+)
+from snap_python.trusted import ModelView
+
+TEST_DIR = pathlib.Path(__file__).parent
+DATA_DIR = TEST_DIR / "data"
+
+SUMMARY_FIELDS = ["name", "revision", "tracking_channel", "status"]
+
+
+def make_client(snapd_requests: list, **kwargs) -> SnapClient:
+    installed_snaps = (DATA_DIR / "installed_snaps_long.json").read_bytes()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        snapd_requests.append(f"{request.method} {request.url.path}")
+        return httpx.Response(200, content=installed_snaps)
+
+    return SnapClient(snapd_transport=httpx.MockTransport(handler), **kwargs)
+
+
+@pytest.mark.parametrize(
+    "fields",
+    [
+        SUMMARY_FIELDS,
+        ["name", "apps", "health", "publisher", "install_date"],
+        ["id", "ignore_validation", "installed_size", "mounted_from", "confinement"],
+    ],
+)
+@pytest.mark.asyncio
+async def test_records_match_full_models(fields):
+    client = make_client([])
+
+    records = await client.snaps.list_installed_snaps(fields=fields)
+    installed = await client.snaps.list_installed_snaps()
+
+    assert isinstance(records, InstalledSnapRecordListResponse)
+    assert records.status_code == installed.status_code
+    assert len(records) == len(installed)
+    for record, snap in zip(records.result, installed.result):
+        assert dataclasses.astuple(record) == tuple(
+            getattr(snap, field) for field in fields
+        )
+
+
+@pytest.mark.asyncio
+async def test_records_are_compact():
+    client = make_client([])
+
+    records = await client.snaps.list_installed_snaps(fields=SUMMARY_FIELDS)
+
+    record = records.result[0]
+    assert not hasattr(record, "__dict__")
+    assert [field.name for field in dataclasses.fields(record)] == SUMMARY_FIELDS
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        record.name = "other"
+    assert installed_snap_record_type(tuple(SUMMARY_FIELDS)) is type(record)
+
+
+@pytest.mark.asyncio
+async def test_invalid_fields_are_rejected_before_requesting():
+    snapd_requests = []
+    client = make_client(snapd_requests)
+
+    with pytest.raises(ValueError):
+        await client.snaps.list_installed_snaps(fields=["name", "not-a-field"])
+
+    assert snapd_requests == []
+
+
+@pytest.mark.asyncio
+async def test_records_are_built_from_the_cache():
+    snapd_requests = []
+    client = make_client(snapd_requests, snaps_cache_ttl=60)
+
+    installed = await client.snaps.list_installed_snaps()
+    records = await client.snaps.list_installed_snaps(fields=SUMMARY_FIELDS)
+
+    assert isinstance(installed, InstalledSnapListResponse)
+    assert snapd_requests == ["GET /v2/snaps"]
+    assert [record.name for record in records.result] == [
+        snap.name for snap in installed.result
+    ]
+
+
+@pytest.mark.asyncio
+async def test_records_from_a_trusted_cache_hold_models():
+    fields = ["name", "apps", "publisher"]
+    client = make_client([], snaps_cache_ttl=60, trusted_parsing=True)
+    validated = await make_client([]).snaps.list_installed_snaps(fields=fields)
+
+    await client.snaps.list_installed_snaps()
+    records = await client.snaps.list_installed_snaps(fields=fields)
+
+    assert records.result == validated.result
+    for record in records.result:
+        assert not isinstance(record.publisher, ModelView)
+        assert not any(isinstance(app, ModelView) for app in record.apps)
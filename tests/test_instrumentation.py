@@ -0,0 +1,180 @@
+import pathlib
+
+import httpx
+import pytest
+
+from snap_python.client import SnapClient
+from snap_python.instrumentation import (
+    NO_INSTRUMENTATION,
+    HistogramCollector,
+    Instrumentation,
+    MultiInstrumentation,
+    RequestEvent,
+    endpoint_template,
+)
+from snap_python.retry_policy import RetryPolicy
+
+TEST_DIR = pathlib.Path(__file__).parent
+DATA_DIR = TEST_DIR / "data"
+
+
+@pytest.mark.parametrize(
+    "url, expected",
+    [
+        ("http://localhost/v2/snaps", "/v2/snaps"),
+        ("http://localhost/v2/snaps/lpci", "/v2/snaps/{name}"),
+        ("http://localhost/v2/snaps/lpci/conf", "/v2/snaps/{name}/conf"),
+        ("http://localhost/v2/snaps/find?q=lpci", "/v2/snaps/find"),
+        ("http://localhost/v2/changes/42", "/v2/changes/{id}"),
+        ("https://api.snapcraft.io/v2/snaps/info/lpci", "/v2/snaps/info/{name}"),
+        ("https://api.snapcraft.io/v2/snaps/refresh", "/v2/snaps/refresh"),
+    ],
+)
+def test_endpoint_template(url, expected):
+    assert endpoint_template(url) == expected
+
+
+def make_client(handler, instrumentation, **kwargs) -> SnapClient:
+    return SnapClient(
+        snapd_transport=httpx.MockTransport(handler),
+        instrumentation=instrumentation,
+        **kwargs,
+    )
+
+
+@pytest.mark.asyncio
+async def test_snapd_requests_are_recorded_per_endpoint():
+    installed_snaps = (DATA_DIR / "installed_snaps.json").read_bytes()
+    collector = HistogramCollector()
+    client = make_client(
+        lambda request: httpx.Response(200, content=installed_snaps), collector
+    )
+
+    await client.snaps.list_installed_snaps()
+
+    stats = collector.requests[("snapd", "GET", "/v2/snaps")]
+    assert stats.duration.count == 1
+    assert stats.time_to_first_byte.count == 1
+    assert stats.status_codes == {200: 1}
+    assert stats.response_bytes == len(installed_snaps)
+    assert stats.retries == 0
+    assert collector.validations["InstalledSnapListResponse"].count == 1
+
+
+@pytest.mark.asyncio
+async def test_retries_are_counted_in_one_event():
+    events: list[RequestEvent] = []
+
+    class Recorder(Instrumentation):
+        enabled = True
+
+        def on_request(self, event: RequestEvent) -> None:
+            events.append(event)
+
+    responses = iter(
+        [
+            httpx.Response(503),
+            httpx.Response(200, json={"type": "sync", "result": {}}),
+        ]
+    )
+    client = make_client(
+        lambda request: next(responses),
+        Recorder(),
+        retry_policy=RetryPolicy(tries=2, delay=0, jitter=False, max_elapsed=None),
+    )
+
+    await client.request("GET", "snaps/lpci/conf")
+
+    assert len(events) == 1
+    assert events[0].endpoint == "/v2/snaps/{name}/conf"
+    assert events[0].attempts == 2
+    assert events[0].retries == 1
+    assert events[0].status_code == 200
+    assert events[0].error is None
+
+
+@pytest.mark.asyncio
+async def test_failed_requests_record_the_error():
+    collector = HistogramCollector()
+    client = make_client(
+        lambda request: httpx.Response(404, json={"result": {}}),
+        MultiInstrumentation([collector]),
+        retry_policy=RetryPolicy.disabled(),
+    )
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await client.request("GET", "changes/7")
+
+    stats = collector.requests[("snapd", "GET", "/v2/changes/{id}")]
+    assert stats.errors == 1
+    assert stats.status_codes == {404: 1}
+
+
+@pytest.mark.asyncio
+async def test_store_requests_are_recorded():
+    info = (DATA_DIR / "store_tui_info_response.json").read_bytes()
+    collector = HistogramCollector()
+    client = SnapClient(
+        store_client=httpx.AsyncClient(
+            transport=httpx.MockTransport(
+                lambda request: httpx.Response(200, content=info)
+            )
+        ),
+        instrumentation=collector,
+    )
+
+    await client.store.get_snap_info("store-tui")
+
+    stats = collector.requests[("store", "GET", "/v2/snaps/info/{name}")]
+    assert stats.duration.count == 1
+    assert stats.response_bytes == len(info)
+    # the store client was passed in, so no event hooks measure time to first byte
+    assert stats.time_to_first_byte.count == 0
+    assert collector.validations["InfoResponse"].count == 1
+
+
+@pytest.mark.asyncio
+async def test_broken_instrumentation_does_not_fail_requests():
+    class Broken(Instrumentation):
+        enabled = True
+
+        def on_request(self, event: RequestEvent) -> None:
+            raise RuntimeError("boom")
+
+    client = make_client(
+        lambda request: httpx.Response(200, json={"type": "sync", "result": {}}),
+        Broken(),
+    )
+
+    response = await client.request("GET", "snaps/lpci")
+
+    assert response.status_code == 200
+
+
+def test_default_instrumentation_is_a_no_op():
+    client = SnapClient()
+
+    assert client.instrumentation is NO_INSTRUMENTATION
+    assert client.store.instrumentation is NO_INSTRUMENTATION
+    assert not client.snapd_client.event_hooks["request"]
+    assert not client.snapd_client.event_hooks["response"]
+
+
+def test_histogram_percentiles():
+    collector = HistogramCollector(buckets=(0.01, 0.1, 1.0))
+    for duration in [0.005] * 90 + [0.5] * 10:
+        collector.on_request(
+            RequestEvent(
+                source="snapd",
+                method="GET",
+                endpoint="/v2/snaps",
+                duration=duration,
+                start_time_ns=0,
+            )
+        )
+
+    histogram = collector.requests[("snapd", "GET", "/v2/snaps")].duration
+    assert histogram.percentile(50) == 0.01
+    assert histogram.percentile(99) == 0.5
+    assert histogram.max == 0.5
+    assert collector.slowest(1)[0][0] == ("snapd", "GET", "/v2/snaps")
@@ -0,0 +1,173 @@
+import copy
+import json
+import pathlib
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from snap_python.components.changes import ChangeWaiter
+from snap_python.progress import ProgressTracker
+from snap_python.schemas.changes import ChangesListResponse, ChangesResponse
+from snap_python.trusted import view_json
+
+TEST_DIR = pathlib.Path(__file__).parent
+DATA_DIR = TEST_DIR / "data"
+
+
+@pytest.fixture
+def done_change() -> dict:
+    return json.loads((DATA_DIR / "install_change_response.json").read_bytes())
+
+
+def snapshot(change: dict, tasks_done: int) -> ChangesResponse:
+    """Return ``change`` with only its first ``tasks_done`` tasks done."""
+    change = copy.deepcopy(change)
+    result = change["result"]
+    ready = tasks_done >= len(result["tasks"])
+    result.update(status="Done" if ready else "Doing", ready=ready)
+    for task in result["tasks"][tasks_done:]:
+        task["status"] = "Do"
+        task["progress"]["done"] = 0
+    return ChangesResponse.model_validate(change)
+
+
+def test_updates_match_overall_progress(done_change):
+    tracker = ProgressTracker()
+    task_count = len(done_change["result"]["tasks"])
+
+    for tasks_done in range(task_count + 1):
+        changes = snapshot(done_change, tasks_done)
+        update = tracker.update(changes, timestamp=float(tasks_done))
+
+        overall = changes.result.overall_progress
+        assert (update.done, update.total) == (overall.done, overall.total)
+        assert update.ready == changes.ready
+        if tasks_done:
+            assert [task.task_id for task in update.tasks] == [
+                changes.result.tasks[tasks_done - 1].id
+            ]
+            assert (
+                update.done_delta == changes.result.tasks[tasks_done - 1].progress.done
+            )
+
+    assert "42" not in tracker
+
+
+def test_unchanged_snapshots_are_skipped(done_change):
+    tracker = ProgressTracker()
+    changes = snapshot(done_change, 3)
+
+    first = tracker.update(changes, timestamp=0.0)
+
+    assert first is not None
+    assert len(first.tasks) == len(changes.result.tasks)
+    assert tracker.update(changes, timestamp=1.0) is None
+
+
+def test_rate_and_eta(done_change):
+    tracker = ProgressTracker(smoothing=1)
+    changes = snapshot(done_change, 0)
+    tracker.update(changes, timestamp=0.0)
+    changes.result.tasks[0].progress.done = 1
+    changes.result.tasks[1].progress.done = 1
+
+    update = tracker.update(changes, timestamp=2.0)
+
+    assert update.done_delta == 2
+    assert update.rate == pytest.approx(1.0)
+    assert update.eta == pytest.approx(update.total - update.done)
+    assert update.fraction == pytest.approx(update.done / update.total)
+
+
+def test_error_results_are_ignored():
+    error = ChangesResponse.model_validate(
+        {
+            "type": "error",
+            "status-code": 404,
+            "status": "Not Found",
+            "result": {"message": "cannot find change with id 42"},
+        }
+    )
+
+    assert ProgressTracker().update(error) is None
+
+
+def test_update_many(done_change):
+    other = copy.deepcopy(done_change)
+    other["result"]["id"] = "43"
+    changes = ChangesListResponse.model_validate(
+        {
+            "type": "sync",
+            "status-code": 200,
+            "status": "OK",
+            "result": [
+                snapshot(done_change, 2).result.model_dump(by_alias=True),
+                snapshot(other, 5).result.model_dump(by_alias=True),
+            ],
+        }
+    )
+    tracker = ProgressTracker(clock=lambda: 0.0)
+
+    updates = tracker.update_many(changes)
+
+    assert [update.change_id for update in updates] == ["42", "43"]
+    assert tracker.update_many(changes) == []
+    assert len(tracker) == 2
+
+
+def test_trusted_views(done_change):
+    changes = snapshot(done_change, 2)
+    view = view_json(ChangesResponse, changes.model_dump_json(by_alias=True))
+    list_view = view_json(
+        ChangesListResponse,
+        ChangesListResponse(
+            status_code=200, type="sync", status="OK", result=[changes.result]
+        ).model_dump_json(by_alias=True),
+    )
+
+    expected = ProgressTracker().update(changes, timestamp=0.0)
+
+    assert ProgressTracker().update(view, timestamp=0.0) == expected
+    assert ProgressTracker().update_many(list_view, timestamp=0.0) == [expected]
+
+
+def test_invalid_smoothing():
+    with pytest.raises(ValueError):
+        ProgressTracker(smoothing=0)
+
+
+@pytest.mark.asyncio
+async def test_watch_progress_only_yields_progress(done_change):
+    client = MagicMock()
+    client.get_changes_by_id = AsyncMock(
+        side_effect=[
+            snapshot(done_change, 1),
+            snapshot(done_change, 1),
+            snapshot(done_change, 4),
+            snapshot(done_change, len(done_change["result"]["tasks"])),
+        ]
+    )
+    waiter = ChangeWaiter(client, use_notices=False, min_poll_interval=0)
+
+    updates = [update async for update in waiter.watch_progress("42")]
+
+    assert [len(update.tasks) for update in updates] == [
+        len(done_change["result"]["tasks"]),
+        3,
+        len(done_change["result"]["tasks"]) - 4,
+    ]
+    assert updates[-1].ready
+    assert updates[-1].done == updates[-1].total
+
+
+def test_removed_tasks_no_longer_count(done_change):
+    tracker = ProgressTracker()
+    changes = snapshot(done_change, 3)
+    tracker.update(changes, timestamp=0.0)
+    del changes.result.tasks[0]
+
+    update = tracker.update(changes, timestamp=1.0)
+
+    overall = changes.result.overall_progress
+    assert (update.done, update.total) == (overall.done, overall.total)
+    assert update.tasks == []
@@ -0,0 +1,155 @@
+import json
+import pathlib
+
+import httpx
+import pytest
+
+from snap_python.client import SnapClient
+from snap_python.retry_policy import RetryPolicy
+from snap_python.schemas.snaps import InstalledSnapListResponse
+from snap_python.schemas.store.refresh import RefreshPlan
+from snap_python.trusted import trusted_parsing
+
+TEST_DIR = pathlib.Path(__file__).parent
+DATA_DIR = TEST_DIR / "data"
+
+
+@pytest.fixture
+def installed_snaps() -> InstalledSnapListResponse:
+    with open(DATA_DIR / "installed_snaps.json") as f:
+        installed = json.load(f)
+    # a sideloaded snap cannot be refreshed from the store
+    local_snap = dict(installed["result"][0], name="local-snap", revision="x1", id="")
+    installed["result"].append(local_snap)
+    return InstalledSnapListResponse.model_validate(installed)
+
+
+def make_store_handler(refresh_requests, updates, fail_snap=None, error_snap=None):
+    def handler(request: httpx.Request) -> httpx.Response:
+        payload = json.loads(request.content)
+        refresh_requests.append(payload)
+        actions = payload["actions"]
+        names = [action["instance-key"] for action in actions]
+        if fail_snap in names:
+            return httpx.Response(500, json={"error-list": []})
+        results = []
+        for action in actions:
+            name = action["instance-key"]
+            if name == error_snap:
+                results.append(
+                    {
+                        "instance-key": name,
+                        "name": name,
+                        "result": "error",
+                        "error": {"code": "id-not-found", "message": "not found"},
+                    }
+                )
+            elif name in updates:
+                results.append(
+                    {
+                        "instance-key": name,
+                        "name": name,
+                        "result": "refresh",
+                        "snap-id": action["snap-id"],
+                        "snap": {
+                            "name": name,
+                            "revision": updates[name],
+                            "version": "new",
+                        },
+                    }
+                )
+        return httpx.Response(200, json={"results": results})
+
+    return handler
+
+
+@pytest.mark.asyncio
+async def test_plan_refreshes(installed_snaps: InstalledSnapListResponse):
+    refresh_requests = []
+    handler = make_store_handler(
+        refresh_requests, updates={"lpci": 300, "store-tui": 30}, error_snap="bw"
+    )
+    client = SnapClient(
+        store_client=httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    )
+
+    plan = await client.store.plan_refreshes(installed_snaps, "amd64", batch_size=10)
+
+    refreshable = len(installed_snaps) - 1
+    assert len(refresh_requests) == -(-refreshable // 10)
+    first_context = refresh_requests[0]["context"][0]
+    assert first_context == {
+        "snap-id": "b96UJ4vttpNhpbaCWctVzfduQcPwQ5wn",
+        "instance-key": "canonical-livepatch",
+        "revision": 286,
+        "tracking-channel": "latest/stable",
+    }
+    assert refresh_requests[0]["actions"][0] == {
+        "action": "refresh",
+        "instance-key": "canonical-livepatch",
+        "snap-id": "b96UJ4vttpNhpbaCWctVzfduQcPwQ5wn",
+    }
+
+    assert {candidate.name: candidate.revision for candidate in plan.candidates} == {
+        "lpci": 300,
+        "store-tui": 30,
+    }
+    lpci = next(c for c in plan.candidates if c.name == "lpci")
+    assert lpci.installed_revision == 278
+    assert lpci.tracking_channel == "latest/stable"
+    assert plan.skipped == ["local-snap"]
+    assert plan.errors["bw"].code == "id-not-found"
+    assert len(plan.up_to_date) == refreshable - 3
+    assert "lpci" not in plan.up_to_date
+    assert plan.error_list == []
+
+
+@pytest.mark.asyncio
+async def test_plan_refreshes_trusted(installed_snaps: InstalledSnapListResponse):
+    handler = make_store_handler([], updates={"lpci": 300}, error_snap="bw")
+    client = SnapClient(
+        store_client=httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    )
+
+    with trusted_parsing():
+        plan = await client.store.plan_refreshes(
+            installed_snaps, "amd64", batch_size=10
+        )
+
+    assert [candidate.name for candidate in plan.candidates] == ["lpci"]
+    assert plan.errors["bw"].code == "id-not-found"
+    # the plan only holds real models, so it round-trips
+    assert RefreshPlan.model_validate(plan.model_dump()) == plan
+
+
+@pytest.mark.asyncio
+async def test_plan_refreshes_failed_batch(installed_snaps: InstalledSnapListResponse):
+    refresh_requests = []
+    handler = make_store_handler(
+        refresh_requests, updates={"store-tui": 30}, fail_snap="lpci"
+    )
+    client = SnapClient(
+        store_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        store_retry_policy=RetryPolicy.disabled(),
+    )
+
+    plan = await client.store.plan_refreshes(installed_snaps, "amd64", batch_size=5)
+
+    failed_batch = next(
+        [action["instance-key"] for action in request["actions"]]
+        for request in refresh_requests
+        if any(action["instance-key"] == "lpci" for action in request["actions"])
+    )
+    assert len(plan.error_list) == 1
+    assert plan.error_list[0].code == "refresh-batch-failed"
+    assert not set(failed_batch) & set(plan.up_to_date)
+    assert [candidate.name for candidate in plan.candidates] == ["store-tui"]
+
+
+@pytest.mark.asyncio
+async def test_plan_refreshes_invalid_fields(
+    installed_snaps: InstalledSnapListResponse,
+):
+    client = SnapClient()
+    with pytest.raises(ValueError):
+        await client.store.plan_refreshes(installed_snaps, "amd64", fields=["bogus"])
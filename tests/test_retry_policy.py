@@ -0,0 +1,165 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import httpx
+import pytest
+
+from snap_python.client import SnapClient
+from snap_python.retry_policy import RetryPolicy, parse_retry_after
+
+
+def make_response(status_code: int, headers: dict[str, str] | None = None):
+    return httpx.Response(
+        status_code=status_code,
+        headers=headers,
+        request=httpx.Request("GET", "http://localhost/v2/snaps"),
+    )
+
+
+@pytest.fixture
+def fast_policy():
+    return RetryPolicy(tries=3, delay=0, jitter=False, max_elapsed=None)
+
+
+@pytest.mark.asyncio
+async def test_retry_on_transport_error(fast_policy: RetryPolicy):
+    func = AsyncMock(side_effect=[httpx.ConnectError("boom"), make_response(200)])
+
+    response = await fast_policy.call(func)
+
+    assert response.status_code == 200
+    assert func.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_retry_gives_up_after_tries(fast_policy: RetryPolicy):
+    func = AsyncMock(side_effect=httpx.ConnectError("boom"))
+
+    with pytest.raises(httpx.ConnectError):
+        await fast_policy.call(func)
+    assert func.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_retry_on_status_returns_last_response(fast_policy: RetryPolicy):
+    func = AsyncMock(return_value=make_response(503))
+
+    response = await fast_policy.call(func)
+
+    assert response.status_code == 503
+    assert func.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_no_retry_on_client_error(fast_policy: RetryPolicy):
+    response = make_response(404)
+    func = AsyncMock(
+        side_effect=httpx.HTTPStatusError(
+            "Not Found", request=response.request, response=response
+        )
+    )
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await fast_policy.call(func)
+    assert func.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_retry_after_is_honoured(monkeypatch: pytest.MonkeyPatch):
+    sleeps = []
+
+    async def fake_sleep(delay):
+        sleeps.append(delay)
+
+    monkeypatch.setattr("snap_python.retry_policy.asyncio.sleep", fake_sleep)
+    policy = RetryPolicy(tries=2, delay=5, max_delay=60, max_elapsed=None)
+    func = AsyncMock(
+        side_effect=[make_response(429, {"Retry-After": "7"}), make_response(200)]
+    )
+
+    response = await policy.call(func)
+
+    assert response.status_code == 200
+    assert sleeps == [7.0]
+
+
+@pytest.mark.asyncio
+async def test_max_elapsed_budget(monkeypatch: pytest.MonkeyPatch):
+    sleep = AsyncMock()
+    monkeypatch.setattr("snap_python.retry_policy.asyncio.sleep", sleep)
+    policy = RetryPolicy(tries=10, delay=5, jitter=False, max_elapsed=1)
+    func = AsyncMock(side_effect=httpx.ReadTimeout("slow"))
+
+    with pytest.raises(httpx.ReadTimeout):
+        await policy.call(func)
+    assert func.await_count == 1
+    sleep.assert_not_awaited()
+
+
+def test_parse_retry_after():
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after("not-a-date") is None
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+
+
+@pytest.mark.asyncio
+async def test_snap_client_request_retries(fast_policy: RetryPolicy):
+    client = SnapClient(retry_policy=fast_policy)
+    client.snapd_client.request = AsyncMock(
+        side_effect=[httpx.ConnectError("socket gone"), make_response(200)]
+    )
+
+    response = await client.request("GET", "snaps")
+
+    assert response.status_code == 200
+    assert client.snapd_client.request.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_store_get_retries(fast_policy: RetryPolicy):
+    client = SnapClient(store_retry_policy=fast_policy)
+    client.store.store_client.get = AsyncMock(
+        side_effect=[make_response(502), MagicMock(content=b'{"categories":[]}')]
+    )
+
+    response = await client.store.get_categories()
+
+    assert response.categories == []
+    assert client.store.store_client.get.await_count == 2
+
+
+def test_for_method_restricts_non_idempotent_retries(fast_policy: RetryPolicy):
+    assert fast_policy.for_method("get") is fast_policy
+
+    post_policy = fast_policy.for_method("POST")
+
+    assert post_policy.retry_exceptions == (httpx.ConnectError, httpx.ConnectTimeout)
+    assert post_policy.retry_statuses == {429, 503}
+    assert fast_policy.retry_exceptions == (httpx.TransportError,)
+
+
+@pytest.mark.asyncio
+async def test_snap_client_post_not_retried_after_sending(fast_policy: RetryPolicy):
+    client = SnapClient(retry_policy=fast_policy)
+    client.snapd_client.request = AsyncMock(
+        side_effect=[httpx.ReadTimeout("no answer"), make_response(202)]
+    )
+
+    with pytest.raises(httpx.ReadTimeout):
+        await client.request("POST", "snaps/hello-world", json={"action": "install"})
+    assert client.snapd_client.request.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_snap_client_post_retried_on_connect_error(fast_policy: RetryPolicy):
+    client = SnapClient(retry_policy=fast_policy)
+    client.snapd_client.request = AsyncMock(
+        side_effect=[httpx.ConnectError("socket gone"), make_response(202)]
+    )
+
+    response = await client.request(
+        "POST", "snaps/hello-world", json={"action": "install"}
+    )
+
+    assert response.status_code == 202
+    assert client.snapd_client.request.await_count == 2
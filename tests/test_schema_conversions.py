@@ -4,8 +4,10 @@ import tempfile
 from pathlib import Path
 
 import pydantic
+import pytest
 
-from snap_python.schemas.snaps import InstalledSnapListResponse
+from snap_python.schemas.common import Revision
+from snap_python.schemas.snaps import InstalledSnapListResponse, StoreSnap
 from snap_python.schemas.store.info import (
     InfoResponse,
 )
@@ -13,6 +15,7 @@ from snap_python.schemas.store.search import (
     SearchResponse,
     SearchResult,
 )
+from snap_python.trusted import view_json
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 CODE_DIR = BASE_DIR / "src" / "snap_python"
@@ -51,6 +54,96 @@ def test_convert_store_snap():
     assert len(search_response.results) == len(response.result)
 
 
+def search_result_through_json(installed_snap) -> SearchResult:
+    """Convert an installed snap by dumping it to JSON and validating a SearchResult."""
+    snap_info = installed_snap.model_dump(mode="json")
+    revision_info = {
+        field: snap_info.pop(field)
+        for field in Revision.model_fields
+        if field in snap_info
+    }
+    return SearchResult.model_validate(
+        {
+            "snap": {
+                key: value
+                for key, value in snap_info.items()
+                if key in StoreSnap.model_fields
+            },
+            "snap-id": snap_info["id"],
+            "name": snap_info["name"],
+            "revision": revision_info,
+        }
+    )
+
+
+def fields_set_tree(value):
+    if isinstance(value, pydantic.BaseModel):
+        return (
+            value.model_fields_set,
+            [
+                fields_set_tree(getattr(value, field))
+                for field in type(value).model_fields
+            ],
+        )
+    if isinstance(value, list):
+        return [fields_set_tree(item) for item in value]
+    return None
+
+
+@pytest.fixture
+def installed_snaps():
+    with open(INSTALLED_SNAP_RESPONSE_FILE, "r") as f:
+        return InstalledSnapListResponse.model_validate_json(f.read()).result
+
+
+def test_from_installed_snap_matches_json_round_trip(installed_snaps):
+    for snap in installed_snaps:
+        expected = search_result_through_json(snap)
+        converted = SearchResult.from_installed_snap(snap)
+
+        assert converted == expected
+        assert converted.model_dump_json() == expected.model_dump_json()
+        assert fields_set_tree(converted) == fields_set_tree(expected)
+
+
+def test_from_installed_snap_copies_mutable_values(installed_snaps):
+    snap = next(snap for snap in installed_snaps if snap.media and snap.publisher)
+    converted = SearchResult.from_installed_snap(snap)
+
+    converted.snap.media[0].url = "changed"
+    converted.snap.media.clear()
+    converted.snap.publisher.username = "changed"
+
+    assert snap.media and snap.media[0].url != "changed"
+    assert snap.publisher.username != "changed"
+
+
+def test_from_installed_snaps(installed_snaps):
+    converted = SearchResult.from_installed_snaps(installed_snaps)
+
+    assert converted == [
+        SearchResult.from_installed_snap(snap) for snap in installed_snaps
+    ]
+    assert SearchResult.from_installed_snaps([]) == []
+
+
+def test_from_installed_snap_accepts_views(installed_snaps):
+    view = view_json(
+        InstalledSnapListResponse, INSTALLED_SNAP_RESPONSE_FILE.read_bytes()
+    )
+
+    converted = SearchResult.from_installed_snaps(view.result)
+
+    assert converted == SearchResult.from_installed_snaps(installed_snaps)
+
+
+def test_from_installed_snap_requires_an_id(installed_snaps):
+    snap = installed_snaps[0].model_copy(update={"id": None})
+
+    with pytest.raises(pydantic.ValidationError):
+        SearchResult.from_installed_snap(snap)
+
+
 def test_serdes_info_response():
     INFO_RESPONSE_FILE = TEST_DATA_DIR / "snap_info_response_success.json"
 
@@ -0,0 +1,350 @@
+import hashlib
+import json
+import pathlib
+from unittest.mock import AsyncMock
+
+import httpx
+import pytest
+
+from snap_python import scrape
+from snap_python.client import SnapClient
+from snap_python.delta import DeltaApplyError
+from snap_python.retry_policy import RetryPolicy
+from snap_python.schemas.store.info import Download, InfoResponse
+from snap_python.schemas.store.refresh import RefreshRevisionResponse
+
+TEST_DIR = pathlib.Path(__file__).parent
+DATA_DIR = TEST_DIR / "data"
+
+
+def make_refresh_response(from_revision: int, to_revision: int):
+    with open(DATA_DIR / "store_tui_refresh_response.json") as f:
+        template = json.load(f)["results"][0]
+    results = []
+    for revision in range(from_revision, to_revision + 1):
+        if revision == 3:
+            results.append(
+                {
+                    "name": "store-tui",
+                    "instance-key": "key",
+                    "result": "error",
+                    "snap": None,
+                    "error": {"code": "revision-not-found", "message": "nope"},
+                }
+            )
+            continue
+        result = json.loads(json.dumps(template))
+        result["snap"]["revision"] = revision
+        result["snap"]["download"]["url"] = (
+            f"https://example.com/store-tui_{revision}.snap"
+        )
+        results.append(result)
+    return RefreshRevisionResponse.model_validate({"results": results})
+
+
+@pytest.fixture
+def scrape_client():
+    client = SnapClient()
+    with open(DATA_DIR / "store_tui_info_response.json") as f:
+        client.store.get_snap_info = AsyncMock(
+            return_value=InfoResponse.model_validate_json(f.read())
+        )
+    client.store.get_many_snap_revision_info = AsyncMock(
+        side_effect=lambda snap_name, from_revision, to_revision, **kwargs: (
+            make_refresh_response(from_revision, to_revision)
+        )
+    )
+    return client
+
+
+@pytest.mark.asyncio
+async def test_get_all_snap_content_batches(
+    scrape_client: SnapClient, tmp_path, monkeypatch
+):
+    downloaded = []
+
+    async def fake_download(snap_client, url, path, **kwargs):
+        downloaded.append(url)
+        path.write_bytes(b"x" * 10)
+        return 10
+
+    monkeypatch.setattr(scrape, "download_snap_file", fake_download)
+    highest = scrape.get_highest_revision(
+        scrape_client.store.get_snap_info.return_value.channel_map
+    ).revision
+
+    stats = await scrape.get_all_snap_content(
+        scrape_client,
+        "store-tui",
+        tmp_path,
+        start_revision=2,
+        with_snap_files=True,
+        batch_size=5,
+        max_concurrency=2,
+        max_downloads=2,
+    )
+
+    expected_revisions = [r for r in range(2, highest + 1) if r != 3]
+    assert stats.revisions_total == highest - 1
+    assert stats.revisions_done == len(expected_revisions)
+    assert stats.revisions_failed == 1
+    assert stats.files_downloaded == len(expected_revisions)
+    assert stats.bytes_downloaded == 10 * len(expected_revisions)
+    assert sorted(int(path.name) for path in tmp_path.iterdir()) == expected_revisions
+    assert not (tmp_path / "1").exists()
+
+    batches = [
+        call.args[1:3]
+        for call in scrape_client.store.get_many_snap_revision_info.call_args_list
+    ]
+    assert sorted(batches)[0] == (2, 6)
+    assert all(to - start < 5 for start, to in batches)
+
+
+SNAP_CONTENT = bytes(range(256)) * 40
+SNAP_SHA3_384 = hashlib.sha3_384(SNAP_CONTENT).hexdigest()
+
+
+def make_download_client(store_requests, fail_after: int | None = None):
+    def handler(request: httpx.Request) -> httpx.Response:
+        range_header = request.headers.get("Range")
+        store_requests.append(range_header)
+        if range_header:
+            offset = int(range_header.removeprefix("bytes=").rstrip("-"))
+            if offset >= len(SNAP_CONTENT):
+                return httpx.Response(416)
+            content = SNAP_CONTENT[offset:]
+            status = 206
+        else:
+            content = SNAP_CONTENT
+            status = 200
+        if fail_after is not None and len(store_requests) == 1:
+
+            async def broken_stream():
+                yield content[:fail_after]
+                raise httpx.ReadError("connection reset", request=request)
+
+            return httpx.Response(status, content=broken_stream())
+        return httpx.Response(status, content=content)
+
+    return SnapClient(
+        store_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        # downloads have their own retry policy, the store's must not matter
+        store_retry_policy=RetryPolicy.disabled(),
+    )
+
+
+@pytest.mark.asyncio
+async def test_download_snap_file_verifies_hash(tmp_path):
+    store_requests = []
+    client = make_download_client(store_requests)
+    path = tmp_path / "store-tui_1.snap"
+
+    transferred = await scrape.download_snap_file(
+        client,
+        "https://example.com/store-tui_1.snap",
+        path,
+        sha3_384=SNAP_SHA3_384,
+        size=len(SNAP_CONTENT),
+        chunk_size=1000,
+    )
+
+    assert transferred == len(SNAP_CONTENT)
+    assert path.read_bytes() == SNAP_CONTENT
+    assert not (tmp_path / "store-tui_1.snap.part").exists()
+
+    # already downloaded and valid: nothing is requested
+    assert (
+        await scrape.download_snap_file(
+            client,
+            "https://example.com/store-tui_1.snap",
+            path,
+            sha3_384=SNAP_SHA3_384,
+        )
+        == 0
+    )
+    assert store_requests == [None]
+
+
+@pytest.mark.asyncio
+async def test_download_snap_file_resumes_part_file(tmp_path):
+    store_requests = []
+    client = make_download_client(store_requests)
+    path = tmp_path / "store-tui_1.snap"
+    (tmp_path / "store-tui_1.snap.part").write_bytes(SNAP_CONTENT[:3000])
+
+    transferred = await scrape.download_snap_file(
+        client,
+        "https://example.com/store-tui_1.snap",
+        path,
+        sha3_384=SNAP_SHA3_384,
+    )
+
+    assert store_requests == ["bytes=3000-"]
+    assert transferred == len(SNAP_CONTENT) - 3000
+    assert path.read_bytes() == SNAP_CONTENT
+
+
+@pytest.mark.asyncio
+async def test_download_snap_file_resumes_after_connection_drop(tmp_path):
+    store_requests = []
+    client = make_download_client(store_requests, fail_after=4000)
+    path = tmp_path / "store-tui_1.snap"
+
+    transferred = await scrape.download_snap_file(
+        client,
+        "https://example.com/store-tui_1.snap",
+        path,
+        sha3_384=SNAP_SHA3_384,
+        chunk_size=1000,
+    )
+
+    assert store_requests == [None, "bytes=4000-"]
+    assert transferred == len(SNAP_CONTENT)
+    assert path.read_bytes() == SNAP_CONTENT
+
+
+def test_default_download_retry_policy_has_no_time_budget():
+    # a large transfer failing after minutes must still be resumed
+    assert scrape.DEFAULT_DOWNLOAD_RETRY_POLICY.max_elapsed is None
+    assert scrape.DEFAULT_DOWNLOAD_RETRY_POLICY.tries > RetryPolicy().tries
+
+
+@pytest.mark.asyncio
+async def test_download_snap_file_hash_mismatch(tmp_path):
+    client = make_download_client([])
+    path = tmp_path / "store-tui_1.snap"
+
+    with pytest.raises(scrape.DownloadVerificationError):
+        await scrape.download_snap_file(
+            client,
+            "https://example.com/store-tui_1.snap",
+            path,
+            sha3_384="0" * 96,
+        )
+
+    assert not path.exists()
+    assert not (tmp_path / "store-tui_1.snap.part").exists()
+
+
+@pytest.mark.asyncio
+async def test_get_all_snap_content_surfaces_worker_errors(
+    scrape_client: SnapClient, tmp_path, monkeypatch
+):
+    async def broken_download(*args, **kwargs):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(scrape, "download_snap_file", broken_download)
+
+    with pytest.raises(RuntimeError):
+        await scrape.get_all_snap_content(
+            scrape_client,
+            "store-tui",
+            tmp_path,
+            with_snap_files=True,
+            max_downloads=1,
+        )
+
+
+DELTA_BYTES = b"delta"
+TARGET_CONTENT = SNAP_CONTENT + DELTA_BYTES
+
+
+def make_target_download(delta_sha3_384: str | None = None):
+    return Download.model_validate(
+        {
+            "deltas": [
+                {
+                    "format": "xdelta3",
+                    "sha3-384": delta_sha3_384
+                    or hashlib.sha3_384(DELTA_BYTES).hexdigest(),
+                    "size": len(DELTA_BYTES),
+                    "source": 1,
+                    "target": 2,
+                    "url": "https://example.com/store-tui_1_2.delta",
+                }
+            ],
+            "sha3-384": hashlib.sha3_384(TARGET_CONTENT).hexdigest(),
+            "size": len(TARGET_CONTENT),
+            "url": "https://example.com/store-tui_2.snap",
+        }
+    )
+
+
+@pytest.fixture
+def delta_store():
+    store_requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        store_requests.append(request.url.path)
+        if request.url.path.endswith(".delta"):
+            return httpx.Response(200, content=DELTA_BYTES)
+        return httpx.Response(200, content=TARGET_CONTENT)
+
+    client = SnapClient(
+        store_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+    return client, store_requests
+
+
+async def fake_apply_delta(delta_format, source_path, delta_path, target_path):
+    target_path.write_bytes(source_path.read_bytes() + delta_path.read_bytes())
+
+
+@pytest.mark.asyncio
+async def test_download_snap_revision_uses_delta(delta_store, tmp_path, monkeypatch):
+    client, store_requests = delta_store
+    monkeypatch.setattr(scrape, "delta_formats_available", lambda: ["xdelta3"])
+    monkeypatch.setattr(scrape, "apply_delta", fake_apply_delta)
+    source = tmp_path / "store-tui_1.snap"
+    source.write_bytes(SNAP_CONTENT)
+    target = tmp_path / "store-tui_2.snap"
+
+    transferred = await scrape.download_snap_revision(
+        client, make_target_download(), target, local_revisions={1: source}
+    )
+
+    assert store_requests == ["/store-tui_1_2.delta"]
+    assert transferred == len(DELTA_BYTES)
+    assert target.read_bytes() == TARGET_CONTENT
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "store-tui_1.snap",
+        "store-tui_2.snap",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_download_snap_revision_falls_back_to_full_download(
+    delta_store, tmp_path, monkeypatch
+):
+    client, store_requests = delta_store
+    monkeypatch.setattr(scrape, "delta_formats_available", lambda: ["xdelta3"])
+
+    async def broken_apply_delta(*args):
+        raise DeltaApplyError("xdelta3 exited with 1")
+
+    monkeypatch.setattr(scrape, "apply_delta", broken_apply_delta)
+    source = tmp_path / "store-tui_1.snap"
+    source.write_bytes(SNAP_CONTENT)
+    target = tmp_path / "store-tui_2.snap"
+
+    transferred = await scrape.download_snap_revision(
+        client, make_target_download(), target, local_revisions={1: source}
+    )
+
+    assert store_requests == ["/store-tui_1_2.delta", "/store-tui_2.snap"]
+    assert transferred == len(TARGET_CONTENT)
+    assert target.read_bytes() == TARGET_CONTENT
+
+
+@pytest.mark.asyncio
+async def test_download_snap_revision_without_local_source(
+    delta_store, tmp_path, monkeypatch
+):
+    client, store_requests = delta_store
+    monkeypatch.setattr(scrape, "delta_formats_available", lambda: ["xdelta3"])
+    target = tmp_path / "store-tui_2.snap"
+
+    await scrape.download_snap_revision(client, make_target_download(), target)
+
+    assert store_requests == ["/store-tui_2.snap"]
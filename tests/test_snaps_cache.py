@@ -0,0 +1,98 @@
+import json
+import pathlib
+
+import httpx
+import pytest
+
+from snap_python.client import SnapClient
+
+TEST_DIR = pathlib.Path(__file__).parent
+DATA_DIR = TEST_DIR / "data"
+
+
+@pytest.fixture
+def snapd_requests():
+    return []
+
+
+@pytest.fixture
+def cached_client(snapd_requests) -> SnapClient:
+    installed_snaps = (DATA_DIR / "installed_snaps.json").read_bytes()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        snapd_requests.append(f"{request.method} {request.url.path}")
+        if request.method == "GET" and request.url.path == "/v2/snaps":
+            return httpx.Response(200, content=installed_snaps)
+        if request.method == "POST":
+            return httpx.Response(
+                202,
+                json={
+                    "type": "async",
+                    "status-code": 202,
+                    "status": "Accepted",
+                    "change": "1",
+                },
+            )
+        return httpx.Response(404, json={"message": "not found"})
+
+    client = SnapClient(snaps_cache_ttl=60)
+    client.snapd_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return client
+
+
+@pytest.mark.asyncio
+async def test_list_installed_snaps_is_cached(
+    cached_client: SnapClient, snapd_requests
+):
+    first = await cached_client.snaps.list_installed_snaps()
+    second = await cached_client.snaps.list_installed_snaps()
+
+    assert first is second
+    assert snapd_requests == ["GET /v2/snaps"]
+
+
+@pytest.mark.asyncio
+async def test_is_snap_installed_uses_snapshot(
+    cached_client: SnapClient, snapd_requests
+):
+    await cached_client.snaps.list_installed_snaps()
+
+    assert await cached_client.snaps.is_snap_installed("lpci")
+    assert not await cached_client.snaps.is_snap_installed("not-a-snap")
+    assert snapd_requests == ["GET /v2/snaps"]
+
+
+@pytest.mark.asyncio
+async def test_change_invalidates_cache(cached_client: SnapClient, snapd_requests):
+    await cached_client.snaps.list_installed_snaps()
+    await cached_client.snaps.remove_snap("lpci")
+    await cached_client.snaps.list_installed_snaps()
+
+    assert snapd_requests == ["GET /v2/snaps", "POST /v2/snaps/lpci", "GET /v2/snaps"]
+
+
+@pytest.mark.asyncio
+async def test_ready_change_invalidates_cache(
+    cached_client: SnapClient, snapd_requests
+):
+    await cached_client.snaps.list_installed_snaps()
+    cached_client.change_waiter._notify_ready(None)
+    await cached_client.snaps.list_installed_snaps()
+
+    assert snapd_requests == ["GET /v2/snaps", "GET /v2/snaps"]
+
+
+@pytest.mark.asyncio
+async def test_cache_disabled_by_default(snapd_requests):
+    installed_snaps = json.loads((DATA_DIR / "installed_snaps.json").read_bytes())
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        snapd_requests.append(f"{request.method} {request.url.path}")
+        return httpx.Response(200, json=installed_snaps)
+
+    client = SnapClient()
+    client.snapd_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    await client.snaps.list_installed_snaps()
+    await client.snaps.list_installed_snaps()
+
+    assert len(snapd_requests) == 2
@@ -303,3 +303,35 @@ async def test_snap_disabled_get_info(module_scope_client: SnapClient):
     )
     assert removal_response.status_code == 200
     assert removal_response.result.status == "Done"
+
+
+@pytest.mark.asyncio
+async def test_install_and_remove_many_snaps(module_scope_client: SnapClient):
+    snap_names = ["hello-world", "usconstitution"]
+
+    install_response = await module_scope_client.snaps.install_snaps(
+        snap_names, wait=True
+    )
+    assert install_response.result.status == "Done"
+    assert sorted(install_response.result.data["snap-names"]) == sorted(snap_names)
+
+    installed_snaps = await module_scope_client.snaps.list_installed_snaps()
+    installed_names = [snap.name for snap in installed_snaps.result]
+    for snap_name in snap_names:
+        assert snap_name in installed_names
+
+    removal_response = await module_scope_client.snaps.remove_snaps(
+        snap_names, purge=True, wait=True
+    )
+    assert removal_response.result.status == "Done"
+
+    installed_snaps = await module_scope_client.snaps.list_installed_snaps()
+    installed_names = [snap.name for snap in installed_snaps.result]
+    for snap_name in snap_names:
+        assert snap_name not in installed_names
+
+
+@pytest.mark.asyncio
+async def test_install_many_snaps_requires_snaps(module_scope_client: SnapClient):
+    with pytest.raises(ValueError):
+        await module_scope_client.snaps.install_snaps([])
@@ -1,10 +1,19 @@
+import asyncio
 import json
 import pathlib
 from unittest.mock import AsyncMock, MagicMock
 
 import pydantic
 import pytest
-from httpx import HTTPError, HTTPStatusError, Response
+from httpx import (
+    AsyncClient,
+    HTTPError,
+    HTTPStatusError,
+    Limits,
+    MockTransport,
+    Response,
+    Timeout,
+)
 
 from snap_python.client import StoreEndpoints
 from snap_python.schemas.store.categories import (
@@ -18,6 +27,7 @@ from snap_python.schemas.store.refresh import (
     RefreshRevisionResponse,
 )
 from snap_python.schemas.store.search import ArchSearchItem, ArchSearchResponse
+from snap_python.trusted import ModelView, trusted_parsing
 
 TEST_DIR = pathlib.Path(__file__).parent
 DATA_DIR = TEST_DIR / "data"
@@ -250,3 +260,475 @@ async def test_get_track_risk_map(setup_snaps_api: StoreEndpoints):
     assert track_risk_map["latest"]["stable"].amd64 is not None
     assert track_risk_map["latest"]["stable"].amd64.revision == 29
     assert track_risk_map["latest"]["stable"].amd64.base == "core24"
+
+
+@pytest.mark.asyncio
+async def test_store_client_pool_configuration():
+    limits = Limits(max_connections=7, max_keepalive_connections=3)
+    store = StoreEndpoints(
+        base_url="http://localhost:8000",
+        version="v1",
+        headers={"Snap-Device-Series": "16"},
+        limits=limits,
+        timeout=Timeout(2.0, connect=1.0),
+    )
+    assert store.store_client.timeout.connect == 1.0
+    assert store.store_client.timeout.read == 2.0
+    assert store.store_client.headers["Snap-Device-Series"] == "16"
+    await store.aclose()
+    assert store.store_client.is_closed
+
+
+@pytest.mark.asyncio
+async def test_store_shared_client_is_not_modified():
+    shared_client = AsyncClient()
+    store = StoreEndpoints(
+        base_url="http://localhost:8000",
+        version="v1",
+        headers={"Snap-Device-Series": "16"},
+        client=shared_client,
+    )
+    assert store.store_client is shared_client
+    assert "Snap-Device-Series" not in shared_client.headers
+
+    shared_client.get = AsyncMock()
+    shared_client.get.return_value.content = b'{"category":{"name":"games"}}\n'
+    shared_client.get.return_value.raise_for_status = MagicMock()
+    await store.get_category_by_name(name="games")
+    _, kwargs = shared_client.get.call_args
+    assert kwargs["headers"] == {"Snap-Device-Series": "16"}
+
+    await store.aclose()
+    assert not shared_client.is_closed
+    await shared_client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_get_snap_info_cache_and_single_flight():
+    store = StoreEndpoints(
+        base_url="http://localhost:8000", version="v1", info_cache_ttl=60
+    )
+    with open(DATA_DIR / "store_tui_info_response.json", "rb") as f:
+        response_content = f.read()
+
+    async def fake_get(*args, **kwargs):
+        await asyncio.sleep(0)
+        response = MagicMock()
+        response.content = response_content
+        return response
+
+    store.store_client.get = AsyncMock(side_effect=fake_get)
+
+    responses = await asyncio.gather(
+        *(store.get_snap_info("store-tui") for _ in range(5))
+    )
+    assert all(response is responses[0] for response in responses)
+    assert store.store_client.get.await_count == 1
+
+    # cached by snap and field set
+    await store.get_snap_info("store-tui")
+    assert store.store_client.get.await_count == 1
+    await store.get_snap_info("store-tui", fields=["revision"])
+    assert store.store_client.get.await_count == 2
+
+    # snap-id -> name is learnt from the info response
+    snap_id = responses[0].snap_id
+    assert await store.get_snap_name_from_snap_id(snap_id) == "store-tui"
+    assert store.store_client.get.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_get_many_snap_revision_info_reuses_refresh_context(
+    setup_snaps_api: StoreEndpoints,
+):
+    with open(DATA_DIR / "store_tui_info_response.json", "rb") as f:
+        info_content = f.read()
+    with open(DATA_DIR / "store_tui_refresh_response.json", "rb") as f:
+        refresh_content = f.read()
+    setup_snaps_api.store_client.get = AsyncMock()
+    setup_snaps_api.store_client.get.return_value.content = info_content
+    setup_snaps_api.store_client.get.return_value.raise_for_status = MagicMock()
+    setup_snaps_api.store_client.post = AsyncMock()
+    setup_snaps_api.store_client.post.return_value.content = refresh_content
+    setup_snaps_api.store_client.post.return_value.raise_for_status = MagicMock()
+
+    for _ in range(3):
+        await setup_snaps_api.get_many_snap_revision_info("store-tui", 1, 3, "amd64")
+
+    assert setup_snaps_api.store_client.get.await_count == 1
+    _, kwargs = setup_snaps_api.store_client.get.call_args
+    assert kwargs["params"] == {"fields": "revision"}
+    assert setup_snaps_api.store_client.post.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_get_many_snap_revision_info_accepts_deltas(
+    setup_snaps_api: StoreEndpoints,
+):
+    with open(DATA_DIR / "store_tui_info_response.json", "rb") as f:
+        info_content = f.read()
+    with open(DATA_DIR / "store_tui_refresh_response.json", "rb") as f:
+        refresh_content = f.read()
+    setup_snaps_api.store_client.get = AsyncMock()
+    setup_snaps_api.store_client.get.return_value.content = info_content
+    setup_snaps_api.store_client.get.return_value.raise_for_status = MagicMock()
+    setup_snaps_api.store_client.post = AsyncMock()
+    setup_snaps_api.store_client.post.return_value.content = refresh_content
+    setup_snaps_api.store_client.post.return_value.raise_for_status = MagicMock()
+
+    await setup_snaps_api.get_many_snap_revision_info("store-tui", 1, 3, "amd64")
+    _, kwargs = setup_snaps_api.store_client.post.call_args
+    assert "Snap-Accept-Delta-Format" not in kwargs["headers"]
+
+    await setup_snaps_api.get_many_snap_revision_info(
+        "store-tui", 1, 3, "amd64", accept_delta_formats=["xdelta3"]
+    )
+    _, kwargs = setup_snaps_api.store_client.post.call_args
+    assert kwargs["headers"]["Snap-Accept-Delta-Format"] == "xdelta3"
+    assert kwargs["headers"]["Snap-Device-Architecture"] == "amd64"
+
+
+@pytest.mark.asyncio
+async def test_iter_snap_search_prefetches_pages_in_order():
+    total = 23
+    limit = 5
+    in_flight = 0
+    max_in_flight = 0
+    requested_pages = []
+
+    async def handler(request):
+        nonlocal in_flight, max_in_flight
+        page = int(request.url.params["page"])
+        requested_pages.append(page)
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        # later pages answer first, so ordering has to come from the iterator
+        await asyncio.sleep(0.01 * (10 - page))
+        in_flight -= 1
+        start = (page - 1) * limit
+        items = [
+            {
+                "aliases": None,
+                "apps": [],
+                "package_name": f"snap-{i}",
+                "summary": "",
+                "title": "",
+                "version": "1.0",
+            }
+            for i in range(start, min(start + limit, total))
+        ]
+        return Response(
+            200, json={"_embedded": {"clickindex:package": items}, "total": total}
+        )
+
+    store = StoreEndpoints(
+        base_url="http://localhost:8000",
+        version="v1",
+        client=AsyncClient(transport=MockTransport(handler)),
+    )
+
+    names = [
+        item.package_name async for item in store.iter_snap_search(limit=5, prefetch=2)
+    ]
+
+    assert names == [f"snap-{i}" for i in range(total)]
+    assert sorted(requested_pages) == [1, 2, 3, 4, 5]
+    assert max_in_flight == 2
+
+
+@pytest.mark.asyncio
+async def test_iter_snap_search_only_fetches_on_demand():
+    store = StoreEndpoints(base_url="http://localhost:8000", version="v1")
+    calls = []
+
+    async def fake_page(**kwargs):
+        calls.append(kwargs["page"])
+        if kwargs["page"] > 1:
+            await asyncio.sleep(10)
+        return MagicMock(results=["first"], total=1000)
+
+    store.get_snap_search_paginated = fake_page
+
+    search = store.iter_snap_search(limit=10, prefetch=3)
+    assert await search.__anext__() == "first"
+    await search.aclose()
+
+    assert calls == [1]
+
+
+@pytest.mark.asyncio
+async def test_get_all_snaps_for_arches_merges_catalog():
+    def item(name):
+        return {
+            "aliases": None,
+            "apps": [],
+            "package_name": name,
+            "summary": "",
+            "title": name,
+            "version": "1.0",
+        }
+
+    published = {
+        "amd64": ["hello", "amd64-only"],
+        "arm64": ["hello"],
+        "riscv64": ["hello", "riscv64-only"],
+    }
+    requested_arches = []
+
+    def handler(request):
+        arch = request.headers["X-Ubuntu-Architecture"]
+        requested_arches.append(arch)
+        items = [item(name) for name in published[arch]]
+        return Response(200, json={"_embedded": {"clickindex:package": items}})
+
+    store = StoreEndpoints(
+        base_url="http://localhost:8000",
+        version="v1",
+        client=AsyncClient(transport=MockTransport(handler)),
+    )
+
+    catalog = await store.get_all_snaps_for_arches(["amd64", "arm64", "riscv64"])
+
+    assert sorted(requested_arches) == ["amd64", "arm64", "riscv64"]
+    assert catalog.architectures == ["amd64", "arm64", "riscv64"]
+    assert len(catalog) == 3
+    assert catalog.architectures_for("hello") == ["amd64", "arm64", "riscv64"]
+    assert catalog.architectures_for("riscv64-only") == ["riscv64"]
+    assert catalog.architectures_for("missing") == []
+    assert catalog.has_arch("amd64-only", "amd64")
+    assert not catalog.has_arch("amd64-only", "arm64")
+    assert sorted(catalog.packages_for_arch("amd64")) == ["amd64-only", "hello"]
+    assert "hello" in catalog
+    assert catalog.items["hello"].title == "hello"
+
+
+@pytest.mark.asyncio
+async def test_get_all_snaps_for_arches_invalid_arch(setup_snaps_api: StoreEndpoints):
+    with pytest.raises(ValueError):
+        await setup_snaps_api.get_all_snaps_for_arches(["amd64", "invalid"])
+
+
+@pytest.fixture
+def chunked_refresh_store():
+    with open(DATA_DIR / "store_tui_info_response.json", "rb") as f:
+        info_content = f.read()
+    with open(DATA_DIR / "store_tui_refresh_response.json") as f:
+        template = json.load(f)["results"][0]
+    refresh_requests = []
+
+    async def handler(request):
+        if request.method == "GET":
+            return Response(200, content=info_content)
+        actions = json.loads(request.content)["actions"]
+        revisions = [action["revision"] for action in actions]
+        refresh_requests.append(revisions)
+        if 7 in revisions:
+            return Response(400, json={"error-list": []})
+        # later chunks answer first
+        await asyncio.sleep(0.001 * (20 - revisions[0]))
+        results = []
+        for action in actions:
+            result = json.loads(json.dumps(template))
+            result["snap"]["revision"] = action["revision"]
+            result["instance-key"] = action["instance-key"]
+            results.append(result)
+        return Response(200, json={"results": results})
+
+    store = StoreEndpoints(
+        base_url="http://localhost:8000",
+        version="v1",
+        client=AsyncClient(transport=MockTransport(handler)),
+    )
+    return store, refresh_requests
+
+
+@pytest.mark.asyncio
+async def test_get_many_snap_revision_info_chunks_and_merges(chunked_refresh_store):
+    store, refresh_requests = chunked_refresh_store
+
+    response = await store.get_many_snap_revision_info(
+        "store-tui", 1, 12, "amd64", batch_size=3, max_concurrency=2
+    )
+
+    assert sorted(refresh_requests) == [[1, 2, 3], [4, 5, 6], [7, 8, 9], [10, 11, 12]]
+    assert [result.snap.revision for result in response.results] == [
+        1,
+        2,
+        3,
+        4,
+        5,
+        6,
+        10,
+        11,
+        12,
+    ]
+    assert len(response.error_list) == 1
+    assert response.error_list[0].code == "revision-range-failed"
+    assert "7-9" in response.error_list[0].message
+
+
+@pytest.mark.asyncio
+async def test_get_many_snap_revision_info_trusted(chunked_refresh_store):
+    store, _ = chunked_refresh_store
+
+    with trusted_parsing():
+        response = await store.get_many_snap_revision_info(
+            "store-tui", 1, 6, "amd64", batch_size=3
+        )
+
+    assert isinstance(response, RefreshRevisionResponse)
+    assert [result.snap.revision for result in response.results] == [1, 2, 3, 4, 5, 6]
+
+
+@pytest.mark.asyncio
+async def test_iter_many_snap_revision_info_yields_chunks(chunked_refresh_store):
+    store, _ = chunked_refresh_store
+
+    chunks = [
+        chunk
+        async for chunk in store.iter_many_snap_revision_info(
+            "store-tui", 1, 6, "amd64", batch_size=3
+        )
+    ]
+
+    assert len(chunks) == 2
+    # the second chunk answers first
+    assert [result.snap.revision for result in chunks[0].results] == [4, 5, 6]
+    assert [result.snap.revision for result in chunks[1].results] == [1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_get_many_snap_revision_info_invalid_fields(chunked_refresh_store):
+    store, refresh_requests = chunked_refresh_store
+
+    with pytest.raises(ValueError):
+        await store.get_many_snap_revision_info(
+            "store-tui", 1, 3, "amd64", fields=["not-a-field"]
+        )
+    assert refresh_requests == []
+
+
+def trusted_store_handler(request):
+    path = request.url.path
+    if path.startswith("/v2/snaps/info/"):
+        return Response(
+            200, content=(DATA_DIR / "store_tui_info_response.json").read_bytes()
+        )
+    if path == "/v1/snaps/categories":
+        return Response(
+            200, content=(DATA_DIR / "categories_response.json").read_bytes()
+        )
+    if path.startswith("/v1/snaps/category/"):
+        name = path.rsplit("/", 1)[1]
+        return Response(
+            200,
+            json={
+                "category": {
+                    "name": name,
+                    "media": {"type": "banner", "url": "https://example.com/a.png"},
+                }
+            },
+        )
+    if path == "/v1/snaps/find":
+        return Response(
+            200, content=(DATA_DIR / "featured_snaps_response.json").read_bytes()
+        )
+    if path == "/v1/snaps/refresh":
+        return Response(
+            200, content=(DATA_DIR / "store_tui_refresh_response.json").read_bytes()
+        )
+    if path == "/api/v1/snaps/names":
+        return Response(
+            200, content=(DATA_DIR / "arch_search_response.json").read_bytes()
+        )
+    if path == "/api/v1/snaps/search":
+        page = int(request.url.params["page"])
+        items = [
+            {
+                "aliases": None,
+                "apps": [],
+                "package_name": f"snap-{page}-{i}",
+                "summary": "",
+                "title": "",
+                "version": "1.0",
+            }
+            for i in range(2)
+        ]
+        return Response(
+            200, json={"_embedded": {"clickindex:package": items}, "total": 4}
+        )
+    return Response(404, json={"error-list": []})
+
+
+async def collect(items):
+    return [item async for item in items]
+
+
+TRUSTED_STORE_CALLS = {
+    "get_snap_info": lambda store: store.get_snap_info("store-tui"),
+    "get_categories": lambda store: store.get_categories(),
+    "get_category_by_name": lambda store: store.get_category_by_name("featured"),
+    "find": lambda store: store.find("store"),
+    "get_top_snaps_from_category": lambda store: store.get_top_snaps_from_category(
+        "featured"
+    ),
+    "get_all_snaps_for_arch": lambda store: store.get_all_snaps_for_arch("amd64"),
+    "get_all_snaps_for_arches": lambda store: store.get_all_snaps_for_arches(
+        ["amd64", "arm64"]
+    ),
+    "stream_all_snaps_for_arch": lambda store: collect(
+        store.stream_all_snaps_for_arch("amd64")
+    ),
+    "get_snap_revision_info": lambda store: store.get_snap_revision_info(
+        "store-tui", 20, "amd64"
+    ),
+    "get_snap_search_paginated": lambda store: store.get_snap_search_paginated(limit=2),
+    "iter_snap_search": lambda store: collect(store.iter_snap_search(limit=2)),
+    "get_track_risk_map": lambda store: store.get_track_risk_map("store-tui"),
+}
+
+
+def assert_same_result(trusted, validated, views_allowed=True):
+    """Compare a trusted result with the validated one, reading every field.
+
+    Views may only appear where the endpoint returned a view: anything the library built
+    itself (catalogs, merged responses, track maps) must hold real models.
+    """
+    if isinstance(trusted, ModelView):
+        assert views_allowed, f"{trusted!r} leaked into a model"
+        assert trusted.model_class is type(validated)
+    elif isinstance(validated, pydantic.BaseModel):
+        assert type(trusted) is type(validated)
+        views_allowed = False
+    if isinstance(validated, pydantic.BaseModel):
+        for name in type(validated).model_fields:
+            assert_same_result(
+                getattr(trusted, name), getattr(validated, name), views_allowed
+            )
+    elif isinstance(validated, list):
+        assert len(trusted) == len(validated)
+        for trusted_item, validated_item in zip(trusted, validated):
+            assert_same_result(trusted_item, validated_item, views_allowed)
+    elif isinstance(validated, dict):
+        assert list(trusted) == list(validated)
+        for key, value in validated.items():
+            assert_same_result(trusted[key], value, views_allowed)
+    else:
+        assert trusted == validated
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("call", TRUSTED_STORE_CALLS.values(), ids=TRUSTED_STORE_CALLS)
+async def test_trusted_parsing_matches_validation(call):
+    def make_store(trusted: bool) -> StoreEndpoints:
+        return StoreEndpoints(
+            base_url="http://localhost:8000",
+            version="v1",
+            client=AsyncClient(transport=MockTransport(trusted_store_handler)),
+            trusted_parsing=trusted,
+        )
+
+    validated = await call(make_store(False))
+    trusted = await call(make_store(True))
+
+    assert_same_result(trusted, validated)
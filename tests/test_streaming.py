@@ -0,0 +1,103 @@
+import json
+import pathlib
+
+import pytest
+from httpx import AsyncClient, MockTransport, Response
+
+from snap_python.client import StoreEndpoints
+from snap_python.streaming import StreamingJSONError, iter_json_array_items
+
+TEST_DIR = pathlib.Path(__file__).parent
+DATA_DIR = TEST_DIR / "data"
+
+
+async def chunked(data: bytes, size: int):
+    for start in range(0, len(data), size):
+        yield data[start : start + size]
+
+
+async def collect(data: bytes, key: str, size: int) -> list:
+    return [item async for item in iter_json_array_items(chunked(data, size), key)]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("chunk_size", [1, 7, 4096, 10_000_000])
+async def test_iter_json_array_items_matches_json_load(chunk_size):
+    data = (DATA_DIR / "arch_search_response.json").read_bytes()
+    if chunk_size == 1:
+        # keep the byte-at-a-time run short
+        data = json.dumps(
+            {
+                "_embedded": {
+                    "clickindex:package": json.loads(data)["_embedded"][
+                        "clickindex:package"
+                    ][:20]
+                },
+                "ünïcode": "ŝnap",
+            }
+        ).encode()
+    expected = json.loads(data)["_embedded"]["clickindex:package"]
+
+    assert await collect(data, "clickindex:package", chunk_size) == expected
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("chunk_size", [1, 2, 100])
+async def test_iter_json_array_items_scalars(chunk_size):
+    data = b'{"total": 3, "items" : [ 12345, true, "a]b", null, [1, 2], -0.5 ] }'
+
+    assert await collect(data, "items", chunk_size) == [
+        12345,
+        True,
+        "a]b",
+        None,
+        [1, 2],
+        -0.5,
+    ]
+
+
+@pytest.mark.asyncio
+async def test_iter_json_array_items_empty_array():
+    assert await collect(b'{"items": []}', "items", 3) == []
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "data",
+    [b'{"other": []}', b'{"items": {}}', b'{"items": [1 2]}', b'{"items": [1, 2'],
+)
+async def test_iter_json_array_items_errors(data):
+    with pytest.raises(StreamingJSONError):
+        await collect(data, "items", 4)
+
+
+@pytest.mark.asyncio
+async def test_stream_all_snaps_for_arch():
+    data = (DATA_DIR / "arch_search_response.json").read_bytes()
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return Response(200, content=data)
+
+    store = StoreEndpoints(
+        base_url="http://localhost:8000",
+        version="v1",
+        client=AsyncClient(transport=MockTransport(handler)),
+    )
+
+    items = [item async for item in store.stream_all_snaps_for_arch("amd64")]
+
+    assert len(items) == len(json.loads(data)["_embedded"]["clickindex:package"])
+    assert items[0].package_name == "0ad"
+    assert requests[0].headers["X-Ubuntu-Architecture"] == "amd64"
+    assert requests[0].url.path == "/api/v1/snaps/names"
+
+
+@pytest.mark.asyncio
+async def test_stream_all_snaps_for_arch_invalid_arch():
+    store = StoreEndpoints(base_url="http://localhost:8000", version="v1")
+
+    with pytest.raises(ValueError):
+        async for _ in store.stream_all_snaps_for_arch("invalid"):
+            pass
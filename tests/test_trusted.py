@@ -0,0 +1,167 @@
+import copy
+import json
+import pathlib
+
+import httpx
+import pytest
+from pydantic import BaseModel, ValidationError
+
+from snap_python.client import SnapClient
+from snap_python.instrumentation import HistogramCollector
+from snap_python.schemas.changes import ChangesResponse
+from snap_python.schemas.snaps import InstalledSnapListResponse
+from snap_python.schemas.store.info import InfoResponse
+from snap_python.schemas.store.refresh import RefreshRevisionResponse
+from snap_python.schemas.store.search import ArchSearchResponse
+from snap_python.trusted import (
+    ModelView,
+    as_model,
+    is_model_instance,
+    trusted_parsing,
+    view_json,
+)
+
+TEST_DIR = pathlib.Path(__file__).parent
+DATA_DIR = TEST_DIR / "data"
+
+
+def assert_view_matches(view, model):
+    if isinstance(model, BaseModel) and isinstance(view, ModelView):
+        for name in type(model).model_fields:
+            assert_view_matches(getattr(view, name), getattr(model, name))
+    elif isinstance(model, list):
+        assert len(view) == len(model)
+        for view_item, model_item in zip(view, model):
+            assert_view_matches(view_item, model_item)
+    else:
+        assert view == model
+
+
+@pytest.mark.parametrize(
+    "model, fixture",
+    [
+        (InstalledSnapListResponse, "installed_snaps.json"),
+        (InstalledSnapListResponse, "installed_snaps_long.json"),
+        (InfoResponse, "store_tui_info_response.json"),
+        (InfoResponse, "convertermulti_info_response.json"),
+        (RefreshRevisionResponse, "store_tui_refresh_response.json"),
+        (ChangesResponse, "install_change_response.json"),
+    ],
+)
+def test_view_matches_validated_model(model, fixture):
+    data = (DATA_DIR / fixture).read_bytes()
+
+    assert_view_matches(view_json(model, data), model.model_validate_json(data))
+
+
+def test_view_supports_model_properties_and_methods():
+    data = (DATA_DIR / "install_change_response.json").read_bytes()
+    view = view_json(ChangesResponse, data)
+    model = ChangesResponse.model_validate_json(data)
+
+    assert view.ready is True
+    assert view.result.overall_progress == model.result.overall_progress
+    assert view.model_dump() == model.model_dump()
+    assert view == model
+    assert view.to_model() == model
+
+    installed = view_json(
+        InstalledSnapListResponse, (DATA_DIR / "installed_snaps.json").read_bytes()
+    )
+    assert len(installed) == len(installed.result)
+    with pytest.raises(TypeError):
+        len(view)
+    assert view
+    with pytest.raises(AttributeError):
+        view.not_a_field
+
+
+def test_as_model_and_is_model_instance():
+    data = (DATA_DIR / "install_change_response.json").read_bytes()
+    view = view_json(ChangesResponse, data)
+    model = ChangesResponse.model_validate_json(data)
+
+    assert as_model(view) == model
+    assert isinstance(as_model(view), ChangesResponse)
+    assert as_model(model) is model
+    assert as_model(None) is None
+    assert is_model_instance(view, ChangesResponse)
+    assert is_model_instance(model, (InfoResponse, ChangesResponse))
+    assert not is_model_instance(view, InfoResponse)
+    assert not is_model_instance(None, ChangesResponse)
+
+
+def test_view_only_validates_what_is_read():
+    data = json.loads((DATA_DIR / "installed_snaps.json").read_bytes())
+    # a field that is never read is never validated
+    data["result"][0]["install-date"] = "not a date"
+    view = view_json(InstalledSnapListResponse, json.dumps(data))
+
+    assert view.result[0].name == data["result"][0]["name"]
+    with pytest.raises(ValidationError):
+        view.result[0].install_date
+
+
+def test_missing_required_field_raises_validation_error():
+    data = json.loads((DATA_DIR / "installed_snaps.json").read_bytes())
+    del data["result"][0]["status"]
+    view = view_json(InstalledSnapListResponse, json.dumps(data))
+
+    with pytest.raises(ValidationError):
+        view.result[0].status
+
+
+def test_view_follows_alias_paths():
+    items = [{"package_name": "hello", "summary": "", "title": "", "version": "1"}]
+    view = view_json(
+        ArchSearchResponse, json.dumps({"_embedded": {"clickindex:package": items}})
+    )
+
+    assert [item.package_name for item in view.results] == ["hello"]
+    with pytest.raises(ValidationError):
+        view_json(ArchSearchResponse, json.dumps({"_embedded": {}})).results
+
+
+def test_view_can_be_copied():
+    view = view_json(
+        ChangesResponse, (DATA_DIR / "install_change_response.json").read_bytes()
+    )
+
+    assert copy.deepcopy(view).result.id == view.result.id
+
+
+def make_client(**kwargs) -> SnapClient:
+    installed_snaps = (DATA_DIR / "installed_snaps.json").read_bytes()
+    return SnapClient(
+        snapd_transport=httpx.MockTransport(
+            lambda request: httpx.Response(200, content=installed_snaps)
+        ),
+        **kwargs,
+    )
+
+
+@pytest.mark.asyncio
+async def test_trusted_client_returns_views():
+    collector = HistogramCollector()
+    client = make_client(trusted_parsing=True, instrumentation=collector)
+
+    installed = await client.snaps.list_installed_snaps()
+
+    assert isinstance(installed, ModelView)
+    assert installed.model_class is InstalledSnapListResponse
+    assert collector.validations["InstalledSnapListResponse"].count == 1
+
+
+@pytest.mark.asyncio
+async def test_trusted_parsing_per_call():
+    client = make_client()
+
+    with trusted_parsing():
+        trusted = await client.snaps.list_installed_snaps()
+    validated = await client.snaps.list_installed_snaps()
+
+    assert isinstance(trusted, ModelView)
+    assert isinstance(validated, InstalledSnapListResponse)
+    assert [snap.name for snap in trusted.result] == [
+        snap.name for snap in validated.result
+    ]
@@ -0,0 +1,131 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from snap_python import upload as upload_module
+from snap_python.client import SnapClient
+from snap_python.retry_policy import RetryPolicy
+from snap_python.upload import SnapUpload
+
+
+@pytest.fixture
+def snap_files(tmp_path):
+    first = tmp_path / "first_1.0_amd64.snap"
+    first.write_bytes(b"a" * 2500)
+    second = tmp_path / "second_2.0_amd64.snap"
+    second.write_bytes(b"b" * 10)
+    return [first, second]
+
+
+async def read_body(upload: SnapUpload) -> bytes:
+    return b"".join([chunk async for chunk in upload])
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("use_mmap", [False, True])
+async def test_upload_body_matches_httpx_multipart(snap_files, use_mmap):
+    fields = {"action": "install", "dangerous": True, "devmode": False}
+    upload = SnapUpload(snap_files, fields=fields, chunk_size=1000, use_mmap=use_mmap)
+
+    body = await read_body(upload)
+
+    expected = httpx.Request(
+        "POST",
+        "http://localhost/v2/snaps",
+        data=fields,
+        files=[("snap", (path.name, path.read_bytes())) for path in snap_files],
+        headers={"Content-Type": upload.content_type},
+    )
+    assert body == expected.read()
+    assert len(body) == upload.content_length
+    assert not upload._open_files
+
+
+@pytest.mark.asyncio
+async def test_upload_reports_progress_and_can_be_resent(snap_files):
+    progress = []
+    upload = SnapUpload(
+        snap_files,
+        chunk_size=1000,
+        progress=lambda sent, total: progress.append((sent, total)),
+    )
+
+    first_body = await read_body(upload)
+    assert progress[-1] == (upload.content_length, upload.content_length)
+    assert [sent for sent, _ in progress] == sorted(sent for sent, _ in progress)
+
+    assert await read_body(upload) == first_body
+
+
+def test_upload_missing_file(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        SnapUpload([tmp_path / "missing.snap"])
+
+
+@pytest.mark.asyncio
+async def test_upload_close_releases_files(snap_files):
+    upload = SnapUpload(snap_files, chunk_size=1000)
+    body = upload.__aiter__()
+    for _ in range(3):
+        await body.__anext__()
+    assert len(upload._open_files) == 1
+
+    upload.close()
+
+    assert not upload._open_files
+    await body.aclose()
+
+
+@pytest.mark.asyncio
+async def test_sideload_snaps_resends_body_on_retry(snap_files):
+    bodies = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        bodies.append(await request.aread())
+        if len(bodies) == 1:
+            raise httpx.ConnectError("socket closed", request=request)
+        return httpx.Response(
+            202,
+            content=json.dumps(
+                {
+                    "type": "async",
+                    "status-code": 202,
+                    "status": "Accepted",
+                    "change": "7",
+                }
+            ),
+        )
+
+    client = SnapClient(
+        retry_policy=RetryPolicy(tries=2, delay=0, jitter=False, max_elapsed=None)
+    )
+    client.snapd_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    response = await client.snaps.sideload_snaps(snap_files, chunk_size=100)
+
+    assert response.change == "7"
+    assert len(bodies) == 2
+    assert bodies[0] == bodies[1]
+    assert b'filename="second_2.0_amd64.snap"' in bodies[1]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("use_mmap", [False, True])
+async def test_upload_reads_files_off_the_event_loop(snap_files, use_mmap, monkeypatch):
+    threaded_reads = []
+    to_thread = asyncio.to_thread
+
+    async def recording_to_thread(func, /, *args, **kwargs):
+        result = await to_thread(func, *args, **kwargs)
+        threaded_reads.append(result)
+        return result
+
+    monkeypatch.setattr(upload_module.asyncio, "to_thread", recording_to_thread)
+    upload = SnapUpload(snap_files, chunk_size=1000, use_mmap=use_mmap)
+
+    await read_body(upload)
+
+    file_data = b"".join(path.read_bytes() for path in snap_files)
+    assert b"".join(threaded_reads) == file_data